@@ -1,7 +1,12 @@
 # app/__init__.py
-from flask import Flask
+import time
+
+from flask import Flask, Response, g, request
 from flask_cors import CORS
 from .api import api_bp # Import the blueprint
+from .utils.timing import (
+    REQUEST_DURATION, start_request_timing, finish_request_timing, server_timing_header, render_metrics
+)
 
 def create_app(config_class):
     """
@@ -21,4 +26,26 @@ def create_app(config_class):
     # All routes defined in the blueprint will be prefixed with /api
     app.register_blueprint(api_bp, url_prefix='/api')
 
+    # Per-stage timings: collected during the request, sent back as a
+    # Server-Timing header and aggregated into the /metrics histograms
+    @app.before_request
+    def start_timing():
+        g.timing_token = start_request_timing()
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def add_server_timing(response):
+        token = g.pop('timing_token', None)
+        if token is None:
+            return response
+        total = time.perf_counter() - g.pop('request_start')
+        stages = finish_request_timing(token)
+        response.headers['Server-Timing'] = server_timing_header(stages, total)
+        REQUEST_DURATION.observe(total, request.url_rule.rule if request.url_rule else 'unmatched', str(response.status_code))
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
     return app
\ No newline at end of file
@@ -1,14 +1,81 @@
 # app/api/routes.py
-from flask import request, jsonify
+import json
+import logging
+import time
+
+from flask import request, jsonify, current_app, Response, stream_with_context
 from . import api_bp
 from ..services.optimization_service import calculate_opportunity_scores, calculate_score_for_coordinate
-from ..utils.data_loader import load_all_data
+from ..utils.data_loader import load_all_data, get_dataset_version
 import pandas as pd
 
 from ..services.reasoning_agent import get_reasoning_for_data
 
 from ..services.optimization_service import analyze_power_supply_for_coordinate
 from ..services.reasoning_agent import get_reasoning_for_power_supply
+from ..services.reasoning_agent import stream_reasoning_for_data, stream_reasoning_for_power_supply
+from ..services.reasoning_agent import get_reasoning_for_sites
+
+from ..services.scenario_service import calculate_scenario_scores
+from ..services.zonal_service import calculate_zone_summaries
+from ..services.tile_service import get_tile_cache, quantize_weights, calculate_tile_scores
+from ..services.job_queue import get_job_queue, QueueFullError
+from ..services.admission import (
+    AdmissionRejected, get_concurrency_limiter, plan_grid_request, plan_radius_request
+)
+from ..utils.timing import timed, record_stage
+from ..utils.profiling import profiled, is_authorized, profile_path, TOKEN_HEADER, TOKEN_QUERY_PARAM
+from ..utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Concurrent identical requests (e.g. a shared dashboard loading in many
+# browsers) wait on one in-flight computation instead of each repeating it.
+# Results are shared between requests and must not be mutated.
+single_flight = SingleFlight()
+
+
+def load_shared_data():
+    """
+    load_all_data(), coalesced across concurrent requests for the same dataset version.
+    The returned DataFrames are shared: copy before modifying.
+    """
+    data, _ = single_flight.do(('load_all_data', get_dataset_version()), load_all_data)
+    return data
+
+
+def _coalesced(key, fn):
+    """Runs fn() through the single-flight layer, timing any wait on another request."""
+    start = time.perf_counter()
+    result, shared = single_flight.do(key, fn)
+    if shared:
+        record_stage('coalesced_wait', time.perf_counter() - start)
+    return result
+
+
+def _concurrency_slot(endpoint):
+    return get_concurrency_limiter(current_app.config['ENDPOINT_CONCURRENCY']).slot(endpoint)
+
+
+def _rejected_response(e):
+    """JSON error for an AdmissionRejected, with the cost estimate when there is one."""
+    body = {"error": str(e)}
+    if e.estimate:
+        body["estimate"] = e.estimate
+    response = jsonify(body)
+    response.status_code = e.status_code
+    if e.status_code == 429:
+        response.headers['Retry-After'] = '1'
+    return response
+
+
+def _is_positive_number(value):
+    # bool is an int subclass: reject true/false explicitly
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0
+
+
+def _data_point_count(renewable_df, demand_df, logistics_df):
+    return len(renewable_df) + len(demand_df) + len(logistics_df)
 
 
 @api_bp.route('/optimize', methods=['POST'])
@@ -70,59 +137,184 @@ def get_initial_map_data():
     Endpoint to load and format all initial data points for map display.
     """
     try:
-        renewable_df, demand_df, logistics_df = load_all_data()
-
-        # Rename columns for clarity in the frontend properties
-        demand_df.rename(columns={'Name of the Zone': 'name'}, inplace=True)
-        logistics_df.rename(columns={'port_name': 'name'}, inplace=True)
+        def build_map_data():
+            renewable_df, demand_df, logistics_df = load_shared_data()
+
+            # Rename columns for clarity in the frontend properties
+            demand_df = demand_df.rename(columns={'Name of the Zone': 'name'})
+            logistics_df = logistics_df.rename(columns={'port_name': 'name'})
+
+            # Convert dataframes to GeoJSON
+            with timed('geojson'):
+                return {
+                    "renewables": dataframe_to_geojson(renewable_df, 'renewable'),
+                    "demandCenters": dataframe_to_geojson(demand_df, 'demand'),
+                    "hubs": dataframe_to_geojson(logistics_df, 'hub') # Using 'hub' for ports
+                }
 
-        # Convert dataframes to GeoJSON
-        renewables_geojson = dataframe_to_geojson(renewable_df, 'renewable')
-        demand_geojson = dataframe_to_geojson(demand_df, 'demand')
-        hubs_geojson = dataframe_to_geojson(logistics_df, 'hub') # Using 'hub' for ports
+        map_data = _coalesced(('initial-map-data', get_dataset_version()), build_map_data)
 
-        return jsonify({
-            "renewables": renewables_geojson,
-            "demandCenters": demand_geojson,
-            "hubs": hubs_geojson
-        })
+        with timed('serialize'):
+            return jsonify(map_data)
 
     except Exception as e:
-        print(f"Error in get_initial_map_data: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in get_initial_map_data")
         return jsonify({"error": str(e)}), 500
 
 
 @api_bp.route('/optimize-grid', methods=['POST'])
+@profiled
 def optimize_grid():
     """
     Endpoint for grid-based optimization. Takes user weights and returns the top N locations.
+    With an optional 'minSeparationKm', the N best sites at least that far apart.
+    Can be profiled on demand (see /profiles/<profile_id>).
     """
     data = request.get_json()
     if not data or 'weights' not in data:
         return jsonify({"error": "Missing 'weights' in request body"}), 400
+    min_separation_km = data.get('minSeparationKm')
+    if min_separation_km is not None and not _is_positive_number(min_separation_km):
+        return jsonify({"error": "'minSeparationKm' must be a positive number of kilometers"}), 400
 
     try:
         weights = data['weights']
         num_results = data.get('numResults', 10) # Default to 10 results
 
-        # Load data on-demand
-        renewable_df, demand_df, logistics_df = load_all_data()
+        def run_scoring():
+            # Load data on-demand
+            renewable_df, demand_df, logistics_df = load_shared_data()
+            plan = plan_grid_request(
+                current_app.config['GRID_DEFAULT_STEP'],
+                _data_point_count(renewable_df, demand_df, logistics_df),
+                current_app.config['SCORING_MAX_DISTANCE_PAIRS'],
+                current_app.config['GRID_MAX_STEP']
+            )
+
+            # Call the service function
+            with _concurrency_slot('optimize-grid'):
+                result = calculate_opportunity_scores(
+                    weights=weights,
+                    renewable_df=renewable_df,
+                    demand_df=demand_df,
+                    logistics_df=logistics_df,
+                    num_results=num_results,
+                    step=plan['step'],
+                    min_separation_km=min_separation_km
+                )
+            return dict(result, admission=plan)
+
+        key = ('optimize-grid', get_dataset_version(), json.dumps(weights, sort_keys=True), num_results,
+               min_separation_km)
+        top_locations = _coalesced(key, run_scoring)
+        with timed('serialize'):
+            return jsonify(top_locations)
+
+    except AdmissionRejected as e:
+        return _rejected_response(e)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    
 
-        # Call the service function
-        top_locations = calculate_opportunity_scores(
-            weights=weights,
-            renewable_df=renewable_df,
-            demand_df=demand_df,
-            logistics_df=logistics_df,
-            num_results=num_results
+@api_bp.route('/optimize-grid/scenario', methods=['POST'])
+def optimize_grid_scenario():
+    """
+    What-if version of /optimize-grid. Expects 'weights' plus 'add' and/or 'remove'
+    lists of {'layer': 'power'|'market'|'logistics', 'latitude', 'longitude'}.
+    Returns the scenario's top sites (with their baseline score) and the baseline top sites.
+    The grid step and compute budget are planned as for /optimize-grid.
+    """
+    data = request.get_json()
+    if not data or 'weights' not in data:
+        return jsonify({"error": "Missing 'weights' in request body"}), 400
+
+    changes = {'add': data.get('add') or [], 'remove': data.get('remove') or []}
+    max_changes = current_app.config['SCENARIO_MAX_CHANGES']
+    if len(changes['add']) + len(changes['remove']) > max_changes:
+        return jsonify({"error": f"A scenario can add or remove at most {max_changes} facilities"}), 400
+
+    try:
+        renewable_df, demand_df, logistics_df = load_shared_data()
+        # Same admission plan as /optimize-grid, so the baseline matches its results
+        plan = plan_grid_request(
+            current_app.config['GRID_DEFAULT_STEP'],
+            _data_point_count(renewable_df, demand_df, logistics_df),
+            current_app.config['SCORING_MAX_DISTANCE_PAIRS'],
+            current_app.config['GRID_MAX_STEP']
         )
-        return jsonify(top_locations)
+        with _concurrency_slot('optimize-grid'):
+            result = calculate_scenario_scores(
+                weights=data['weights'],
+                changes=changes,
+                dataset_version=get_dataset_version(),
+                renewable_df=renewable_df,
+                demand_df=demand_df,
+                logistics_df=logistics_df,
+                num_results=data.get('numResults', 10),
+                step=plan['step']
+            )
+        result['admission'] = plan
+        with timed('serialize'):
+            return jsonify(result)
+
+    except AdmissionRejected as e:
+        return _rejected_response(e)
+    except KeyError as e:
+        return jsonify({"error": f"Missing {e} in request body"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.exception("Error in optimize_grid_scenario")
+        return jsonify({"error": str(e)}), 500
+
 
+@api_bp.route('/optimize-grid/zones', methods=['POST'])
+def optimize_grid_zones():
+    """
+    Per-state (or per-district) summaries of the national grid for the given 'weights':
+    best cell, mean and quartiles of the overall score and of each sub-score, and the
+    renewable capacity in the zone. Optional 'level': 'state' (default) or 'district'.
+    The grid step and compute budget are planned as for /optimize-grid.
+    """
+    data = request.get_json()
+    if not data or 'weights' not in data:
+        return jsonify({"error": "Missing 'weights' in request body"}), 400
+
+    try:
+        config = current_app.config
+        renewable_df, demand_df, logistics_df = load_shared_data()
+        plan = plan_grid_request(
+            config['GRID_DEFAULT_STEP'],
+            _data_point_count(renewable_df, demand_df, logistics_df),
+            config['SCORING_MAX_DISTANCE_PAIRS'],
+            config['GRID_MAX_STEP']
+        )
+        with _concurrency_slot('optimize-grid'):
+            result = calculate_zone_summaries(
+                weights=data['weights'],
+                level=data.get('level', 'state'),
+                dataset_version=get_dataset_version(),
+                renewable_df=renewable_df,
+                demand_df=demand_df,
+                logistics_df=logistics_df,
+                step=plan['step'],
+                boundaries=config['ZONE_BOUNDARIES'],
+                nearest_max_km=config['ZONE_NEAREST_MAX_KM']
+            )
+        result['admission'] = plan
+        with timed('serialize'):
+            return jsonify(result)
+
+    except AdmissionRejected as e:
+        return _rejected_response(e)
+    except KeyError as e:
+        return jsonify({"error": f"Missing {e} in request body"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
+        logger.exception("Error in optimize_grid_zones")
         return jsonify({"error": str(e)}), 500
-    
+
 
 # --- NEW ENDPOINT 2: SINGLE POINT FEASIBILITY ---
 @api_bp.route('/optimize-point', methods=['POST'])
@@ -144,7 +336,7 @@ def optimize_point():
             return jsonify({"error": "Missing 'latitude' or 'longitude' in coordinate object"}), 400
 
         # Load data on-demand
-        renewable_df, demand_df, logistics_df = load_all_data()
+        renewable_df, demand_df, logistics_df = load_shared_data()
 
         # Call the service function
         result = calculate_score_for_coordinate(
@@ -155,44 +347,176 @@ def optimize_point():
             demand_df=demand_df,
             logistics_df=logistics_df
         )
-        return jsonify(result)
+        with timed('serialize'):
+            return jsonify(result)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 # --- NEW ENDPOINT 3: AI-POWERED REASONING ---
+def _job_queue():
+    config = current_app.config
+    return get_job_queue(
+        max_workers=config['JOB_MAX_WORKERS'],
+        max_pending=config['JOB_MAX_PENDING'],
+        result_ttl=config['JOB_RESULT_TTL']
+    )
+
+
+def _submit_job(kind, fn, *args):
+    """
+    Queues a slow (LLM) job and returns a 202 response with its id,
+    or a 429 if the queue is full.
+    """
+    app = current_app._get_current_object()
+
+    def run_in_app_context(*job_args):
+        # Jobs read app settings (e.g. the reasoning cache) from a worker thread
+        with app.app_context():
+            return fn(*job_args)
+
+    try:
+        job = _job_queue().submit(kind, run_in_app_context, *args)
+    except QueueFullError as e:
+        response = jsonify({"error": str(e)})
+        response.headers['Retry-After'] = '5'
+        return response, 429
+
+    job['statusUrl'] = f"/api/jobs/{job['jobId']}"
+    return jsonify(job), 202
+
+
+def _reasoning_job(weights, scores):
+    return {"reasoning": get_reasoning_for_data(weights, scores)}
+
+
 @api_bp.route('/analyze-reasoning', methods=['POST'])
 def analyze_reasoning():
     """
     Endpoint to generate a textual, AI-powered reasoning for a given score.
+    The LLM call runs in the background; poll /api/jobs/<jobId> for the result.
     """
     data = request.get_json()
     if not data or 'weights' not in data or 'scores' not in data:
         return jsonify({"error": "Missing 'weights' or 'scores' in request body"}), 400
 
-    try:
-        weights = data['weights']
-        scores = data['scores'] # This is the direct JSON output from your other endpoints
+    weights = data['weights']
+    scores = data['scores'] # This is the direct JSON output from your other endpoints
 
-        # Call the reasoning agent service
-        reasoning_text = get_reasoning_for_data(weights, scores)
+    return _submit_job('reasoning', _reasoning_job, weights, scores)
 
-        return jsonify({"reasoning": reasoning_text})
 
-    except Exception as e:
+def _batch_reasoning_job(weights, sites):
+    reasonings = get_reasoning_for_sites(weights, sites)
+    return {
+        "results": [
+            {
+                "latitude": site.get('latitude'),
+                "longitude": site.get('longitude'),
+                "reasoning": reasoning
+            }
+            for site, reasoning in zip(sites, reasonings)
+        ]
+    }
+
+
+@api_bp.route('/analyze-reasoning/batch', methods=['POST'])
+def analyze_reasoning_batch():
+    """
+    Generates reasoning for several sites (e.g. the 'results' of /optimize-grid)
+    with a single LLM call. Runs as a background job like /analyze-reasoning.
+    """
+    data = request.get_json()
+    if not data or 'weights' not in data or 'sites' not in data:
+        return jsonify({"error": "Missing 'weights' or 'sites' in request body"}), 400
+
+    sites = data['sites']
+    max_sites = current_app.config['REASONING_BATCH_MAX_SITES']
+    if not isinstance(sites, list) or not sites:
+        return jsonify({"error": "'sites' must be a non-empty list"}), 400
+    if len(sites) > max_sites:
+        return jsonify({"error": f"At most {max_sites} sites can be analyzed per batch"}), 400
+
+    return _submit_job('reasoning-batch', _batch_reasoning_job, data['weights'], sites)
 
-        # It's good practice to log the error, e.g., print(e) or use a logger
-        return jsonify({"error": "Failed to generate reasoning.", "details": str(e)}), 500
+
+def _sse_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+def _sse_response(chunks, first_events=()):
+    """
+    Wraps a generator of text chunks as a Server-Sent Events stream:
+    any `first_events`, then one 'chunk' event per piece of text and a final
+    'done' event with the full text (or an 'error' event).
+    """
+    def generate():
+        for event, payload in first_events:
+            yield _sse_event(event, payload)
+        parts = []
+        try:
+            for text in chunks:
+                parts.append(text)
+                yield _sse_event('chunk', {"text": text})
+        except Exception as e:
+            yield _sse_event('error', {"error": "Failed to generate reasoning.", "details": str(e)})
+            return
+        yield _sse_event('done', {"reasoning": "".join(parts)})
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Stop proxies from buffering the stream
+    return response
+
+
+@api_bp.route('/analyze-reasoning/stream', methods=['POST'])
+def analyze_reasoning_stream():
+    """
+    Streaming variant of /analyze-reasoning. Sends the reasoning over SSE as it is generated.
+    """
+    data = request.get_json()
+    if not data or 'weights' not in data or 'scores' not in data:
+        return jsonify({"error": "Missing 'weights' or 'scores' in request body"}), 400
+
+    return _sse_response(stream_reasoning_for_data(data['weights'], data['scores']))
+
+
+@api_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Returns the status of a background job, including its result once finished.
+    """
+    job = _job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job '{job_id}'"}), 404
+    return jsonify(job)
+
+
+@api_bp.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """
+    Cancels a queued or running background job.
+    """
+    if not _job_queue().cancel(job_id):
+        return jsonify({"error": f"Unknown job '{job_id}'"}), 404
+    return jsonify(_job_queue().get(job_id))
 
 
 
 # --- NEW ENDPOINT 4: RADIUS-BASED OPTIMIZATION ---
 @api_bp.route('/optimize-radius', methods=['POST'])
+@profiled
 def optimize_radius():
     """
     Endpoint for radius-based optimization. Creates a dense grid within the specified radius
     and returns the top N locations with their scores, regardless of absolute score quality.
+
+    The grid step (optional 'stepKm', default 5 km) is coarsened automatically if the
+    request would exceed the compute budget; requests that cannot fit get a 413
+    with the estimate, and a 429 is returned when too many are already running.
+    With an optional 'minSeparationKm', the N best sites at least that far apart.
+    Can be profiled on demand (see /profiles/<profile_id>).
     """
     data = request.get_json()
     if not data or 'weights' not in data or 'centerPoint' not in data or 'radius' not in data:
@@ -203,42 +527,74 @@ def optimize_radius():
         center_point = data['centerPoint']
         radius_km = data['radius']
         num_results = data.get('numResults', 3)  # Default to 3 results
+        step_km = data.get('stepKm', current_app.config['RADIUS_DEFAULT_STEP_KM'])
+        min_separation_km = data.get('minSeparationKm')
         
         center_lat = center_point.get('latitude')
         center_lng = center_point.get('longitude')
         
         if center_lat is None or center_lng is None:
             return jsonify({"error": "Missing 'latitude' or 'longitude' in centerPoint object"}), 400
+        if not _is_positive_number(radius_km):
+            return jsonify({"error": "'radius' must be a positive number of kilometers"}), 400
+        if not _is_positive_number(step_km):
+            return jsonify({"error": "'stepKm' must be a positive number of kilometers"}), 400
+        if min_separation_km is not None and not _is_positive_number(min_separation_km):
+            return jsonify({"error": "'minSeparationKm' must be a positive number of kilometers"}), 400
 
         # Load data on-demand
-        renewable_df, demand_df, logistics_df = load_all_data()
+        renewable_df, demand_df, logistics_df = load_shared_data()
+
+        # Estimate the work before doing any of it
+        plan = plan_radius_request(
+            radius_km, step_km,
+            _data_point_count(renewable_df, demand_df, logistics_df),
+            current_app.config['RADIUS_MAX_GRID_POINTS'],
+            current_app.config['SCORING_MAX_DISTANCE_PAIRS'],
+            current_app.config['RADIUS_MAX_STEP_KM']
+        )
 
         # Call the new radius optimization service
         from ..services.optimization_service import calculate_radius_optimization
-        result = calculate_radius_optimization(
-            center_lat=center_lat,
-            center_lng=center_lng,
-            radius_km=radius_km,
-            weights=weights,
-            renewable_df=renewable_df,
-            demand_df=demand_df,
-            logistics_df=logistics_df,
-            num_results=num_results
-        )
-        return jsonify(result)
-
+        with _concurrency_slot('optimize-radius'):
+            result = calculate_radius_optimization(
+                center_lat=center_lat,
+                center_lng=center_lng,
+                radius_km=radius_km,
+                weights=weights,
+                renewable_df=renewable_df,
+                demand_df=demand_df,
+                logistics_df=logistics_df,
+                num_results=num_results,
+                step_km=plan['stepKm'],
+                min_separation_km=min_separation_km
+            )
+        result['admission'] = plan
+        with timed('serialize'):
+            return jsonify(result)
+
+    except AdmissionRejected as e:
+        return _rejected_response(e)
     except Exception as e:
-        import traceback
-        print("Error in optimize_radius endpoint:", str(e))
-        traceback.print_exc()
+        logger.exception("Error in optimize_radius endpoint")
         return jsonify({"error": "Failed to optimize radius.", "details": str(e)}), 500
     
 
+def _power_supply_job(power_analysis):
+    return {
+        "analysis": power_analysis,
+        "reasoning": get_reasoning_for_power_supply(power_analysis)
+    }
+
+
 @api_bp.route('/analyze-power-supply', methods=['POST'])
+@profiled
 def analyze_power_supply():
     """
     Analyzes power supply for a coordinate based on required capacity
     and returns both the data and an AI-powered reasoning.
+    The quantitative analysis runs inline; the reasoning is a background job.
+    Can be profiled on demand (see /profiles/<profile_id>); the profile covers the inline part only.
     """
     data = request.get_json()
     if not data or 'coordinate' not in data or 'requiredCapacity' not in data:
@@ -249,7 +605,7 @@ def analyze_power_supply():
         required_capacity = data['requiredCapacity']
         
         # Load the data
-        renewable_df, _, _ = load_all_data()
+        renewable_df, _, _ = load_shared_data()
 
         # Step 1: Get the quantitative analysis
         power_analysis = analyze_power_supply_for_coordinate(
@@ -259,20 +615,211 @@ def analyze_power_supply():
             renewable_df=renewable_df
         )
 
-        # Step 2: Get the qualitative reasoning from the AI agent
-        reasoning_text = get_reasoning_for_power_supply(power_analysis)
+    except Exception as e:
+        return jsonify({"error": "Failed to perform power supply analysis", "details": str(e)}), 500
+
+    # Step 2: Queue the qualitative reasoning from the AI agent; the job result
+    # combines the analysis and the reasoning
+    return _submit_job('power-supply', _power_supply_job, power_analysis)
+
 
-        # Step 3: Combine and return
-        return jsonify({
-            "analysis": power_analysis,
-            "reasoning": reasoning_text
-        })
+@api_bp.route('/analyze-power-supply/stream', methods=['POST'])
+def analyze_power_supply_stream():
+    """
+    Streaming variant of /analyze-power-supply. The quantitative analysis is sent
+    first as an 'analysis' event, followed by the report text over SSE.
+    """
+    data = request.get_json()
+    if not data or 'coordinate' not in data or 'requiredCapacity' not in data:
+        return jsonify({"error": "Missing 'coordinate' or 'requiredCapacity' in request body"}), 400
 
+    try:
+        coordinate = data['coordinate']
+        renewable_df, _, _ = load_shared_data()
+        power_analysis = analyze_power_supply_for_coordinate(
+            user_lat=coordinate['latitude'],
+            user_lon=coordinate['longitude'],
+            required_capacity_mw=data['requiredCapacity'],
+            renewable_df=renewable_df
+        )
     except Exception as e:
         return jsonify({"error": "Failed to perform power supply analysis", "details": str(e)}), 500
 
-        # import traceback
-        # print("Error in analyze_reasoning endpoint:", str(e))
-        # traceback.print_exc()
-        # return jsonify({"error": "Failed to generate reasoning.", "details": str(e)}), 500
+    return _sse_response(
+        stream_reasoning_for_power_supply(power_analysis),
+        first_events=[('analysis', power_analysis)]
+    )
+
+
+@api_bp.route('/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """
+    A stored request profile; needs the profiling token like the profiled request.
+    Default: the CPU profile as folded stacks (flamegraph.pl / speedscope input);
+    '?format=json': duration, sample count, peak traced memory and top allocation sites.
+    """
+    if not is_authorized(request.headers.get(TOKEN_HEADER) or request.args.get(TOKEN_QUERY_PARAM)):
+        return jsonify({"error": "A valid profiling token is required"}), 403
+    kind = 'json' if request.args.get('format') == 'json' else 'folded'
+    path = profile_path(profile_id, kind)
+    if path is None:
+        return jsonify({"error": f"Unknown profile '{profile_id}'"}), 404
+    with open(path) as f:
+        body = f.read()
+    return Response(body, mimetype='application/json' if kind == 'json' else 'text/plain')
+
+
+@api_bp.route('/tiles/<int:z>/<int:x>/<int:y>', methods=['GET'])
+def get_score_tile(z, x, y):
+    """
+    Returns weighted opportunity scores for one web-mercator map tile.
+    Weights are read from the 'power', 'market' and 'logistics' query parameters.
+    """
+    config = current_app.config
+    if z < 0 or z > config['TILE_MAX_ZOOM'] or not (0 <= x < 2 ** z) or not (0 <= y < 2 ** z):
+        return jsonify({"error": f"Tile {z}/{x}/{y} is out of range"}), 400
+
+    try:
+        weights = quantize_weights({
+            'power': request.args.get('power', 0.33, type=float),
+            'market': request.args.get('market', 0.33, type=float),
+            'logistics': request.args.get('logistics', 0.34, type=float)
+        }, step=config['TILE_WEIGHT_STEP'])
+
+        cache = get_tile_cache(
+            directory=config['TILE_CACHE_DIR'],
+            max_items=config['TILE_CACHE_MEMORY_ITEMS'],
+            disk_size_limit=config['TILE_CACHE_DISK_BYTES']
+        )
+        dataset_version = get_dataset_version()
+        cache_key = (dataset_version, weights['power'], weights['market'], weights['logistics'], z, x, y)
+
+        tile = cache.get(cache_key)
+        if tile is None:
+            renewable_df, demand_df, logistics_df = load_shared_data()
+            tile = calculate_tile_scores(
+                z, x, y,
+                weights=weights,
+                dataset_version=dataset_version,
+                renewable_df=renewable_df,
+                demand_df=demand_df,
+                logistics_df=logistics_df,
+                max_cells=config['TILE_MAX_CELLS'],
+                min_cell_km=config['TILE_MIN_CELL_KM']
+            )
+            cache.set(cache_key, tile)
+
+        with timed('serialize'):
+            response = jsonify(tile)
+        response.headers['Cache-Control'] = 'public, max-age=3600'
+        return response
+
+    except Exception as e:
+        return jsonify({"error": "Failed to compute tile.", "details": str(e)}), 500
+
+
+# --- Stateful supply-chain sessions ---
+def _session_service():
+    # Imported on first use: it loads the supply-chain optimizer (scipy's spatial
+    # and MILP modules, and the top-level solver modules), which the scoring API
+    # never needs at boot
+    from ..services import session_service
+    return session_service
+
+
+def _session_store():
+    config = current_app.config
+    return _session_service().get_session_store(
+        max_sessions=config['SUPPLY_CHAIN_MAX_SESSIONS'],
+        max_bytes=config['SUPPLY_CHAIN_MEMORY_BYTES'],
+        idle_ttl=config['SUPPLY_CHAIN_SESSION_TTL'],
+        matrix_bytes=config['SUPPLY_CHAIN_MATRIX_BYTES']
+    )
+
+
+def _with_session(session_id, fn, *args):
+    """Runs fn(session, *args) under the session's lock: 404 for unknown sessions, 400 for bad input."""
+    try:
+        with _session_store().use(session_id) as session:
+            return jsonify(fn(session, *args))
+    except _session_service().SessionNotFound:
+        return jsonify({"error": f"Unknown or expired session '{session_id}'"}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.exception("Supply-chain session %s failed", session_id)
+        return jsonify({"error": "Supply-chain operation failed.", "details": str(e)}), 500
+
+
+@api_bp.route('/supply-chain/sessions', methods=['POST'])
+def create_supply_chain_session():
+    """
+    Creates a supply-chain session. The body may already contain 'locations',
+    'facilities' and 'demands' (same format as POST .../<session_id>/network).
+    """
+    data = request.get_json(silent=True) or {}
+    session_id = _session_store().create()
+    response = _with_session(session_id, _session_service().add_entities, data)
+    if isinstance(response, tuple):
+        _session_store().delete(session_id)
+        return response
+    return response, 201
+
+
+@api_bp.route('/supply-chain/sessions/<session_id>', methods=['GET'])
+def get_supply_chain_session(session_id):
+    return _with_session(session_id, _session_service().summary)
+
+
+@api_bp.route('/supply-chain/sessions/<session_id>', methods=['DELETE'])
+def delete_supply_chain_session(session_id):
+    if not _session_store().delete(session_id):
+        return jsonify({"error": f"Unknown or expired session '{session_id}'"}), 404
+    return jsonify({"sessionId": session_id, "deleted": True})
+
+
+@api_bp.route('/supply-chain/sessions/<session_id>/network', methods=['POST'])
+def add_to_supply_chain_session(session_id):
+    """
+    Adds to the session's network. Body: any of
+    'locations': [{id, name, latitude, longitude, costIndex}],
+    'facilities': [{id, locationId, type ('production'/'storage'), capacity, currentUtilization}],
+    'demands': [{id, locationId, volume, priority}].
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object with 'locations', 'facilities' or 'demands'"}), 400
+    return _with_session(session_id, _session_service().add_entities, data)
+
+
+@api_bp.route('/supply-chain/sessions/<session_id>/evaluate', methods=['POST'])
+def evaluate_supply_chain_demand(session_id):
+    """
+    Evaluates a new demand against the session's network without adding it.
+    Body: {'demand': {id, volume, and either locationId or latitude/longitude/costIndex}}.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or 'demand' not in data:
+        return jsonify({"error": "Missing 'demand' in request body"}), 400
+    return _with_session(session_id, _session_service().evaluate_demand, data['demand'])
+
+
+@api_bp.route('/supply-chain/sessions/<session_id>/routes', methods=['POST'])
+def optimize_supply_chain_routes(session_id):
+    """
+    Re-solves the session's supply routes, warm-started from its last solution.
+    Optional body: {'mode': 'greedy'} for the fast priority-order allocation
+    ('compareWithLp': true also reports its cost gap to the LP).
+    """
+    options = request.get_json(silent=True) or {}
+    return _with_session(session_id, _session_service().optimize_routes, options)
+
+
+@api_bp.route('/supply-chain/sessions/<session_id>/execute', methods=['POST'])
+def execute_supply_chain_plan(session_id):
+    """Applies a fulfillment plan (as returned by .../evaluate) to the session's facilities."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or 'plan' not in data:
+        return jsonify({"error": "Missing 'plan' in request body"}), 400
+    return _with_session(session_id, _session_service().execute_plan, data['plan'])
 
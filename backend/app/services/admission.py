@@ -0,0 +1,141 @@
+# In app/services/admission.py
+"""
+Cost-based admission control for the scoring endpoints.
+
+Every request's grid size and distance work is estimated before anything is
+computed. Requests over budget are first coarsened (a larger grid step) and
+only rejected if even the coarsest allowed grid would not fit. Per-endpoint
+concurrency limits stop a burst of heavy requests from occupying every worker.
+"""
+
+import math
+import threading
+from contextlib import contextmanager
+
+KM_PER_DEGREE = 111.0
+
+# Bounding box used by create_india_grid
+INDIA_LAT_SPAN = 37.0 - 8.0
+INDIA_LON_SPAN = 98.0 - 68.0
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted. Carries an HTTP status and the estimate."""
+
+    def __init__(self, message, status_code, estimate=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.estimate = estimate or {}
+
+
+def estimate_radius_grid_points(radius_km, step_km):
+    """Approximate number of points create_radius_grid builds: disc area / cell area."""
+    return int(math.ceil(math.pi * (radius_km / step_km) ** 2))
+
+
+def estimate_india_grid_points(step):
+    """Number of points create_india_grid builds for a step in degrees."""
+    return int(math.ceil(INDIA_LAT_SPAN / step) * math.ceil(INDIA_LON_SPAN / step))
+
+
+def plan_radius_request(radius_km, step_km, n_data_points, max_grid_points, max_distance_pairs, max_step_km):
+    """
+    Picks the grid step for a radius request so it fits the budget.
+
+    Returns a dict with the step to use and the estimated grid points and
+    distance pairs. Raises AdmissionRejected (413) if even `max_step_km` is too fine.
+    """
+    # Smallest step that keeps both the grid and the grid x data distance matrix in budget
+    step_for_points = radius_km * math.sqrt(math.pi / max_grid_points)
+    step_for_pairs = radius_km * math.sqrt(math.pi * max(n_data_points, 1) / max_distance_pairs)
+    # Rounded up so the reported step never falls back over budget
+    planned_step = max(step_km, math.ceil(max(step_for_points, step_for_pairs) * 1000) / 1000)
+
+    estimate = {
+        'requestedStepKm': step_km,
+        'stepKm': planned_step,
+        'estimatedGridPoints': estimate_radius_grid_points(radius_km, planned_step),
+        'estimatedDistancePairs': estimate_radius_grid_points(radius_km, planned_step) * n_data_points,
+        'coarsened': planned_step > step_km
+    }
+
+    if planned_step > max_step_km:
+        estimate['estimatedGridPoints'] = estimate_radius_grid_points(radius_km, step_km)
+        estimate['estimatedDistancePairs'] = estimate['estimatedGridPoints'] * n_data_points
+        raise AdmissionRejected(
+            f"A {radius_km} km radius needs a grid step of {planned_step:.1f} km to fit the compute budget, "
+            f"coarser than the {max_step_km} km limit. Use a smaller radius.",
+            413, estimate
+        )
+    return estimate
+
+
+def plan_grid_request(step, n_data_points, max_distance_pairs, max_step):
+    """
+    Same as plan_radius_request for the national grid; steps are in degrees.
+    """
+    planned_step = step
+    if estimate_india_grid_points(step) * n_data_points > max_distance_pairs:
+        # Largest cells-per-degree t with (lat_span * t + 1) * (lon_span * t + 1) cells in
+        # budget; the +1s bound the ceil() in estimate_india_grid_points
+        max_cells = max(max_distance_pairs / max(n_data_points, 1), 1.0)
+        a = INDIA_LAT_SPAN * INDIA_LON_SPAN
+        b = INDIA_LAT_SPAN + INDIA_LON_SPAN
+        t = (math.sqrt(b * b + 4 * a * (max_cells - 1)) - b) / (2 * a)
+        # Rounded up so the reported step never falls back over budget
+        planned_step = math.ceil(10000 / t) / 10000 if t > 0 else math.inf
+
+    estimate = {
+        'requestedStep': step,
+        'step': planned_step,
+        'estimatedGridPoints': estimate_india_grid_points(planned_step),
+        'estimatedDistancePairs': estimate_india_grid_points(planned_step) * n_data_points,
+        'coarsened': planned_step > step
+    }
+    if planned_step > max_step:
+        raise AdmissionRejected(
+            f"The national grid needs a step of {planned_step:.2f} degrees to fit the compute budget, "
+            f"coarser than the {max_step} degree limit.",
+            413, estimate
+        )
+    return estimate
+
+
+class ConcurrencyLimiter:
+    """
+    Per-endpoint caps on requests in progress. Over the cap, requests are
+    rejected immediately (429) rather than queued behind slow work.
+    """
+
+    def __init__(self, limits):
+        self._semaphores = {name: threading.BoundedSemaphore(limit) for name, limit in limits.items()}
+        self._limits = dict(limits)
+
+    @contextmanager
+    def slot(self, endpoint):
+        semaphore = self._semaphores.get(endpoint)
+        if semaphore is None:
+            yield
+            return
+        if not semaphore.acquire(blocking=False):
+            raise AdmissionRejected(
+                f"Too many concurrent '{endpoint}' requests (limit {self._limits[endpoint]}). Try again shortly.",
+                429
+            )
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_concurrency_limiter(limits):
+    """Returns the process-wide limiter, creating it on first use."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = ConcurrencyLimiter(limits)
+        return _limiter
@@ -0,0 +1,74 @@
+# In app/services/cost_model.py
+
+import os
+
+import numpy as np
+
+# Industry heuristics for a preliminary Green Hydrogen cost estimate.
+# Override with environment variables to tune the model without code changes.
+CAPEX_USD_PER_MW = float(os.getenv("COST_CAPEX_USD_PER_MW", 1.5e6))  # Electrolyzer system + balance of plant
+OPEX_FRACTION_OF_CAPEX = float(os.getenv("COST_OPEX_FRACTION", 0.03))  # Annual OPEX as a share of CAPEX
+USD_TO_INR = float(os.getenv("COST_USD_TO_INR", 83.0))
+
+INR_PER_CRORE = 1e7
+
+
+def estimate_project_costs(required_capacity_mw, capex_usd_per_mw=None, opex_fraction=None, usd_to_inr=None):
+    """
+    Estimates CAPEX and annual OPEX for a project of the given size.
+
+    Args:
+        required_capacity_mw (float or array-like): Project size(s) in MW. Arrays are
+            evaluated element-wise in one pass.
+        capex_usd_per_mw, opex_fraction, usd_to_inr: Optional overrides of the module heuristics.
+
+    Returns:
+        dict: CAPEX/OPEX in USD and INR, as floats for scalar input or numpy arrays otherwise.
+    """
+    capex_usd_per_mw = CAPEX_USD_PER_MW if capex_usd_per_mw is None else capex_usd_per_mw
+    opex_fraction = OPEX_FRACTION_OF_CAPEX if opex_fraction is None else opex_fraction
+    usd_to_inr = USD_TO_INR if usd_to_inr is None else usd_to_inr
+
+    capacity = np.asarray(required_capacity_mw, dtype=float)
+    capex_usd = capacity * capex_usd_per_mw
+    opex_usd = capex_usd * opex_fraction
+
+    estimate = {
+        "capacity_mw": capacity,
+        "capex_usd": capex_usd,
+        "opex_usd_per_year": opex_usd,
+        "capex_inr": capex_usd * usd_to_inr,
+        "opex_inr_per_year": opex_usd * usd_to_inr,
+    }
+    if capacity.ndim == 0:
+        estimate = {key: float(value) for key, value in estimate.items()}
+    estimate["assumptions"] = {
+        "capex_usd_per_mw": capex_usd_per_mw,
+        "opex_fraction_of_capex": opex_fraction,
+        "usd_to_inr": usd_to_inr
+    }
+    return estimate
+
+
+def format_usd(amount):
+    """Formats a USD amount in millions, e.g. '$150.00 million'."""
+    return f"${amount / 1e6:,.2f} million"
+
+
+def format_inr(amount):
+    """Formats an INR amount in crore, e.g. '₹1,245.00 crore'."""
+    return f"₹{amount / INR_PER_CRORE:,.2f} crore"
+
+
+def describe_costs(estimate):
+    """
+    Plain-text summary of a scalar estimate, ready to drop into an LLM prompt.
+    """
+    assumptions = estimate["assumptions"]
+    return (
+        f"Capital Expenditure (CAPEX): {format_inr(estimate['capex_inr'])} ({format_usd(estimate['capex_usd'])}), "
+        f"based on ${assumptions['capex_usd_per_mw'] / 1e6:g} million USD per MW for {estimate['capacity_mw']:g} MW. "
+        f"Annual Operational Expenditure (OPEX): {format_inr(estimate['opex_inr_per_year'])} ({format_usd(estimate['opex_usd_per_year'])}) per year, "
+        f"assumed at {assumptions['opex_fraction_of_capex']:.0%} of CAPEX. "
+        f"Exchange rate used: 1 USD = {assumptions['usd_to_inr']:g} INR."
+    )
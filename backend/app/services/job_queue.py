@@ -0,0 +1,146 @@
+# In app/services/job_queue.py
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds the maximum number of pending jobs."""
+
+
+class JobQueue:
+    """
+    A bounded background executor for slow work (LLM calls) so it does not
+    hold a Flask worker. Jobs are tracked by id until `result_ttl` seconds
+    after they finish.
+    """
+
+    def __init__(self, max_workers=2, max_pending=16, result_ttl=600):
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, *args, **kwargs):
+        """
+        Queues `fn(*args, **kwargs)` and returns the new job's public state.
+        Raises QueueFullError when too many jobs are waiting or running.
+        """
+        with self._lock:
+            self._prune()
+            if self.depth() >= self.max_pending:
+                raise QueueFullError(f"Job queue is full ({self.max_pending} pending jobs)")
+
+            job_id = uuid.uuid4().hex
+            job = {
+                'id': job_id,
+                'kind': kind,
+                'status': QUEUED,
+                'result': None,
+                'error': None,
+                'created_at': time.time(),
+                'finished_at': None,
+                'future': None
+            }
+            self._jobs[job_id] = job
+            job['future'] = self._executor.submit(self._run, job, fn, args, kwargs)
+            return self._public(job)
+
+    def _run(self, job, fn, args, kwargs):
+        with self._lock:
+            if job['status'] == CANCELLED:
+                return
+            job['status'] = RUNNING
+
+        try:
+            result = fn(*args, **kwargs)
+            error = None
+        except Exception as e:
+            result, error = None, str(e)
+
+        with self._lock:
+            # A job cancelled while running keeps its cancelled state; the result is dropped
+            if job['status'] == CANCELLED:
+                return
+            job['status'] = FAILED if error else SUCCEEDED
+            job['result'] = result
+            job['error'] = error
+            job['finished_at'] = time.time()
+
+    def get(self, job_id):
+        """Returns the public state of a job, or None if it is unknown/expired."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._public(job) if job else None
+
+    def cancel(self, job_id):
+        """
+        Cancels a job. Queued jobs never start; running jobs finish in the
+        background but their result is discarded. Returns False if unknown.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            if job['status'] not in FINISHED_STATES:
+                job['future'].cancel()
+                job['status'] = CANCELLED
+                job['finished_at'] = time.time()
+            return True
+
+    def depth(self):
+        """
+        Number of jobs still holding the executor: queued or running, including
+        jobs cancelled while running whose worker has not returned yet.
+        """
+        return sum(1 for job in self._jobs.values() if not self._done(job))
+
+    @staticmethod
+    def _done(job):
+        return job['future'] is not None and job['future'].done()
+
+    def _prune(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job['finished_at'] is not None and job['finished_at'] < cutoff and self._done(job)
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    @staticmethod
+    def _public(job):
+        state = {
+            'jobId': job['id'],
+            'kind': job['kind'],
+            'status': job['status']
+        }
+        if job['status'] == SUCCEEDED:
+            state['result'] = job['result']
+        elif job['status'] == FAILED:
+            state['error'] = job['error']
+        return state
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue(max_workers=2, max_pending=16, result_ttl=600):
+    """Returns the process-wide job queue, creating it on first use."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue(max_workers=max_workers, max_pending=max_pending, result_ttl=result_ttl)
+        return _job_queue
@@ -1,8 +1,27 @@
 # In app/services/optimization_service.py
 
+import logging
+
 import pandas as pd
 import numpy as np
-from sklearn.metrics.pairwise import haversine_distances
+
+from ..utils.timing import timed
+
+logger = logging.getLogger(__name__)
+
+def haversine_distances(X, Y):
+    """
+    Pairwise great-circle distances on the unit sphere between rows of X and Y,
+    both given as [lat, lon] in radians. Same contract as sklearn's
+    haversine_distances, without importing scikit-learn at startup.
+    """
+    X = np.asarray(X, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+    lat1, lon1 = X[:, 0:1], X[:, 1:2]
+    lat2, lon2 = Y[:, 0], Y[:, 1]
+
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
 
 def create_india_grid(step=0.5):
     """
@@ -21,30 +40,88 @@ def create_india_grid(step=0.5):
     # print(grid_points)
     return grid_points
 
-def calculate_scores(grid_points_rad, data_points_rad):
+def calculate_min_distances(grid_points_rad, data_points_rad):
+    """
+    Returns the distance (km) from each grid point to its nearest data point.
+    """
+    with timed('distances'):
+        # Calculate distances between all grid points and all data points
+        distances = haversine_distances(grid_points_rad, data_points_rad) * 6371 # Radius of Earth in km
+
+        # Find the minimum distance for each grid point
+        return distances.min(axis=1)
+
+def calculate_nearest(grid_points_rad, data_points_rad):
+    """
+    Like calculate_min_distances, but also returns the index of the nearest
+    data point for each grid point: (distances_km, indices).
+    """
+    with timed('distances'):
+        distances = haversine_distances(grid_points_rad, data_points_rad) * 6371
+        nearest = distances.argmin(axis=1)
+        return distances[np.arange(len(nearest)), nearest], nearest
+
+def calculate_scores(grid_points_rad, data_points_rad, max_dist=None):
     """
     Calculates the minimum distance from each grid point to any data point.
     Returns a normalized score where higher is better (closer).
+
+    By default the score is normalized against the farthest grid point. Pass
+    `max_dist` (km) to normalize against a fixed reference instead, e.g. so that
+    map tiles share the scale of the national grid.
     """
-    # Calculate distances between all grid points and all data points
-    distances = haversine_distances(grid_points_rad, data_points_rad) * 6371 # Radius of Earth in km
-    
-    # Find the minimum distance for each grid point
-    min_distances = distances.min(axis=1)
+    min_distances = calculate_min_distances(grid_points_rad, data_points_rad)
     
     # Normalize the score (closer is better). We invert the distance.
     # Adding a small epsilon to avoid division by zero
-    max_dist = min_distances.max()
+    if max_dist is None:
+        max_dist = min_distances.max()
     scores = 10 * (1 - (min_distances / max_dist)) # Scale from 0 to 10
     
-    return scores
+    return np.clip(scores, 0, 10)
 
-def calculate_opportunity_scores(weights, renewable_df, demand_df, logistics_df, num_results=10):
+def select_diverse_indices(points, scores, num_results, min_separation_km):
+    """
+    Indices of the `num_results` best points (by score, descending) such that no
+    two are closer than `min_separation_km`: greedy non-maximum suppression.
+    Accepted points are kept in a spatial hash of cells at least the separation
+    wide, so each candidate is only checked against the accepted points in its
+    own and the 8 neighbouring cells.
+    """
+    if num_results <= 0 or len(points) == 0:
+        return np.array([], dtype=int)
+    lat_cell = min_separation_km / 111.0
+    # Longitude degrees shrink with latitude: size cells for the most poleward point
+    max_abs_lat = min(float(np.abs(points[:, 0]).max()) + lat_cell, 89.0)
+    lon_cell = min_separation_km / (111.0 * np.cos(np.radians(max_abs_lat)))
+    rows = np.floor(points[:, 0] / lat_cell).astype(np.int64)
+    cols = np.floor(points[:, 1] / lon_cell).astype(np.int64)
+
+    buckets = {}
+    selected = []
+    for i in np.argsort(-scores, kind='stable'):
+        row, col = rows[i], cols[i]
+        neighbours = [j for dr in (-1, 0, 1) for dc in (-1, 0, 1) for j in buckets.get((row + dr, col + dc), ())]
+        if neighbours:
+            distances = haversine_distance(points[i, 0], points[i, 1], points[neighbours, 0], points[neighbours, 1])
+            if distances.min() < min_separation_km:
+                continue
+        buckets.setdefault((row, col), []).append(i)
+        selected.append(i)
+        if len(selected) == num_results:
+            break
+    return np.array(selected, dtype=int)
+
+
+def calculate_opportunity_scores(weights, renewable_df, demand_df, logistics_df, num_results=10, step=0.5,
+                                 min_separation_km=None):
     """
     Main function to run the optimization analysis.
+    `step` is the national grid resolution in degrees. With `min_separation_km`,
+    the results are the best sites at least that far apart from each other.
     """
-    print("Creating analysis grid...")
-    grid_points = create_india_grid(step=0.5)
+    with timed('grid'):
+        grid_points = create_india_grid(step=step)
     
     # Convert all coordinates to radians for haversine calculation
     grid_points_rad = np.radians(grid_points)
@@ -52,7 +129,6 @@ def calculate_opportunity_scores(weights, renewable_df, demand_df, logistics_df,
     demand_rad = np.radians(demand_df[['latitude', 'longitude']].values)
     logistics_rad = np.radians(logistics_df[['latitude', 'longitude']].values)
 
-    print("Calculating scores...")
     power_scores = calculate_scores(grid_points_rad, renewable_rad)
     market_scores = calculate_scores(grid_points_rad, demand_rad)
     logistics_scores = calculate_scores(grid_points_rad, logistics_rad)
@@ -70,22 +146,29 @@ def calculate_opportunity_scores(weights, renewable_df, demand_df, logistics_df,
     results_df['subScores'] = list(zip(power_scores, market_scores, logistics_scores))
 
     # Sort and get top N results
-    top_results = results_df.sort_values(by='overallScore', ascending=False).head(num_results)
+    with timed('rank'):
+        if min_separation_km:
+            top_results = results_df.iloc[select_diverse_indices(grid_points, overall_scores, num_results, min_separation_km)]
+        else:
+            top_results = results_df.sort_values(by='overallScore', ascending=False).head(num_results)
     
     # Format for JSON output
-    output = []
-    for _, row in top_results.iterrows():
-        output.append({
-            'latitude': row['latitude'],
-            'longitude': row['longitude'],
-            'overallScore': round(row['overallScore'], 2),
-            'subScores': {
-                'power': round(row['subScores'][0], 2),
-                'market': round(row['subScores'][1], 2),
-                'logistics': round(row['subScores'][2], 2)
-            }
-        })
+    with timed('format'):
+        output = []
+        for _, row in top_results.iterrows():
+            output.append({
+                'latitude': row['latitude'],
+                'longitude': row['longitude'],
+                'overallScore': round(row['overallScore'], 2),
+                'subScores': {
+                    'power': round(row['subScores'][0], 2),
+                    'market': round(row['subScores'][1], 2),
+                    'logistics': round(row['subScores'][2], 2)
+                }
+            })
         
+    if min_separation_km:
+        return {"results": output, "minSeparationKm": min_separation_km}
     return {"results": output}
 
 
@@ -176,16 +259,12 @@ def create_radius_grid(center_lat, center_lng, radius_km, step_km=5):
     lat_grid = np.arange(lat_min, lat_max, step_lat)
     lng_grid = np.arange(lng_min, lng_max, step_lng)
     
-    # Create all combinations
-    grid_points = []
-    for lat in lat_grid:
-        for lng in lng_grid:
-            # Check if point is within radius using Haversine distance
-            distance = haversine_distance(center_lat, center_lng, lat, lng)
-            if distance <= radius_km:
-                grid_points.append([lat, lng])
+    # Create all combinations and keep those within radius (Haversine distance)
+    lats, lngs = np.meshgrid(lat_grid, lng_grid, indexing='ij')
+    lats, lngs = lats.ravel(), lngs.ravel()
+    inside = haversine_distance(center_lat, center_lng, lats, lngs) <= radius_km
     
-    return np.array(grid_points)
+    return np.column_stack([lats[inside], lngs[inside]])
 
 
 def haversine_distance(lat1, lng1, lat2, lng2):
@@ -207,7 +286,8 @@ def haversine_distance(lat1, lng1, lat2, lng2):
 
 
 def calculate_radius_optimization(center_lat, center_lng, radius_km, weights, 
-                                renewable_df, demand_df, logistics_df, num_results=3):
+                                renewable_df, demand_df, logistics_df, num_results=3, step_km=5,
+                                min_separation_km=None):
     """
     Advanced radius-based optimization that ALWAYS returns the top N locations
     within the specified radius, regardless of absolute score quality.
@@ -216,12 +296,12 @@ def calculate_radius_optimization(center_lat, center_lng, radius_km, weights,
     1. Creates a dense grid within the radius
     2. Scores every point using the ML model
     3. Returns the top N results with real location context
+       (at least `min_separation_km` apart from each other when given)
     """
-    print(f"Starting radius optimization for center ({center_lat}, {center_lng}) with {radius_km}km radius...")
-    
-    # Create a dense grid within the radius (5km resolution for good coverage)
-    grid_points = create_radius_grid(center_lat, center_lng, radius_km, step_km=5)
-    print(f"Created grid with {len(grid_points)} points within {radius_km}km radius")
+    # Create a dense grid within the radius (5km resolution by default for good coverage)
+    with timed('grid'):
+        grid_points = create_radius_grid(center_lat, center_lng, radius_km, step_km=step_km)
+    logger.debug("Radius grid around (%s, %s) r=%skm has %d points", center_lat, center_lng, radius_km, len(grid_points))
     
     if len(grid_points) == 0:
         return {
@@ -237,8 +317,6 @@ def calculate_radius_optimization(center_lat, center_lng, radius_km, weights,
     demand_rad = np.radians(demand_df[['latitude', 'longitude']].values)
     logistics_rad = np.radians(logistics_df[['latitude', 'longitude']].values)
 
-    print("Calculating scores for all grid points...")
-    
     # Calculate scores for all grid points
     power_scores = calculate_scores(grid_points_rad, renewable_rad)
     market_scores = calculate_scores(grid_points_rad, demand_rad)
@@ -259,33 +337,38 @@ def calculate_radius_optimization(center_lat, center_lng, radius_km, weights,
     results_df['logisticsScore'] = logistics_scores
     
     # Sort by overall score and get top N results
-    top_results = results_df.sort_values(by='overallScore', ascending=False).head(num_results)
-    
-    print(f"Returning top {len(top_results)} results within radius")
+    with timed('rank'):
+        if min_separation_km:
+            top_results = results_df.iloc[select_diverse_indices(grid_points, overall_scores, num_results, min_separation_km)]
+        else:
+            top_results = results_df.sort_values(by='overallScore', ascending=False).head(num_results)
     
     # Format for JSON output
-    output = []
-    for _, row in top_results.iterrows():
-        # Calculate distance from center
-        distance = haversine_distance(center_lat, center_lng, row['latitude'], row['longitude'])
-        
-        output.append({
-            'latitude': round(row['latitude'], 6),
-            'longitude': round(row['longitude'], 6),
-            'overallScore': round(row['overallScore'], 2),
-            'subScores': {
-                'power': round(row['powerScore'], 2),
-                'market': round(row['marketScore'], 2),
-                'logistics': round(row['logisticsScore'], 2)
-            },
-            'distanceFromCenter': round(distance, 2)
-        })
+    with timed('format'):
+        output = []
+        for _, row in top_results.iterrows():
+            # Calculate distance from center
+            distance = haversine_distance(center_lat, center_lng, row['latitude'], row['longitude'])
+            
+            output.append({
+                'latitude': round(row['latitude'], 6),
+                'longitude': round(row['longitude'], 6),
+                'overallScore': round(row['overallScore'], 2),
+                'subScores': {
+                    'power': round(row['powerScore'], 2),
+                    'market': round(row['marketScore'], 2),
+                    'logistics': round(row['logisticsScore'], 2)
+                },
+                'distanceFromCenter': round(distance, 2)
+            })
         
     return {
         "results": output,
         "message": f"Found {len(output)} optimal locations within {radius_km}km radius",
         "centerPoint": {"latitude": center_lat, "longitude": center_lng},
         "radius": radius_km,
+        "stepKm": step_km,
+        "minSeparationKm": min_separation_km,
         "gridPointsAnalyzed": len(grid_points)
     }
 
@@ -301,7 +384,8 @@ def analyze_power_supply_for_coordinate(user_lat, user_lon, required_capacity_mw
     renewable_rad = np.radians(renewable_df[['latitude', 'longitude']].values)
 
     # Calculate distances from the user's point to ALL renewable plants
-    distances_km = (haversine_distances(user_point_rad, renewable_rad) * 6371).flatten()
+    with timed('distances'):
+        distances_km = (haversine_distances(user_point_rad, renewable_rad) * 6371).flatten()
     
     # Add distances to the DataFrame and find the N nearest plants
     analysis_df = renewable_df.copy()
@@ -1,15 +1,18 @@
 import os
-from crewai import Agent, Task, Crew, Process
-# from langchain_google_genai import ChatGoogleGenerativeAI
-from dotenv import load_dotenv
+import re
+import json
+import hashlib
+import math
+import threading
 
+from flask import current_app, has_app_context
 
-from crewai import LLM
+from ..utils.cache import TieredCache
+from ..utils.timing import timed
+from .cost_model import estimate_project_costs, describe_costs, CAPEX_USD_PER_MW, OPEX_FRACTION_OF_CAPEX, USD_TO_INR
 
-# Load environment variables from .env file
-load_dotenv()
-
-gemini_api_key = os.getenv("GEMINI_API_KEY")
+# crewai (and litellm, which it wraps) take seconds to import, so the LLM stack is
+# only built on the first reasoning request. The scoring API never pays for it.
 
 # Initialize the Gemini LLM
 # This will automatically use the GOOGLE_API_KEY from your .env file
@@ -22,63 +25,157 @@ gemini_api_key = os.getenv("GEMINI_API_KEY")
 
 """using crewai's inbuilt llm class which is independent of langchain dependecy"""
 """also check the extra parameters we can add to improve the model's response"""
-llm = LLM(
-    model="gemini/gemini-2.0-flash",
-    temperature=1,
-    # reasoning_effort='high'
+LLM_MODEL = "gemini/gemini-2.0-flash"
+LLM_TEMPERATURE = 1
+
+ANALYST_ROLE = "Green Hydrogen Feasibility Analyst"
+ANALYST_GOAL = "To provide clear, data-driven reasoning for the feasibility score of a potential Green Hydrogen project location in India."
+ANALYST_BACKSTORY = (
+    "You are a world-class energy sector analyst with expertise in India's renewable energy landscape. "
+    "You specialize in breaking down complex quantitative data into concise, qualitative insights for investors and policymakers. "
+    "Your analysis is always objective and directly tied to the data provided."
 )
 
+_llm_stack = None
+_llm_stack_lock = threading.Lock()
 
-# Define the Agent
-analyst_agent = Agent(
-    role="Green Hydrogen Feasibility Analyst",
-    goal="To provide clear, data-driven reasoning for the feasibility score of a potential Green Hydrogen project location in India.",
-    backstory=(
-        "You are a world-class energy sector analyst with expertise in India's renewable energy landscape. "
-        "You specialize in breaking down complex quantitative data into concise, qualitative insights for investors and policymakers. "
-        "Your analysis is always objective and directly tied to the data provided."
-    ),
-    llm=llm,
-    verbose=True,
-    allow_delegation=False
-)
 
-# # --- AGENT 1: The Existing Lead Analyst ---
-# analyst_agent = Agent(
-#     role="Green Hydrogen Feasibility Analyst",
-#     # ... (rest of the definition is unchanged)
-#     goal="To provide a clear, data-driven reasoning for the feasibility of a potential Green Hydrogen project location in India, combining power supply data and financial estimates.",
-#     # ...
-# )
+def get_llm_stack():
+    """
+    Builds the LLM and the analyst Agent on first use and returns them as
+    a dict with 'llm', 'analyst_agent' and 'stub' keys.
+    Set REASONING_LLM=stub to run against the local stub (no network, configurable latency).
+    """
+    global _llm_stack
+    with _llm_stack_lock:
+        if _llm_stack is not None:
+            return _llm_stack
 
-# --- AGENT 2: The New Financial Specialist ---
-financial_analyst_agent = Agent(
-    role="Financial Analyst for Green Energy Projects",
-    goal="To estimate the preliminary Capital Expenditure (CAPEX) and annual Operational Expenditure (OPEX) for a proposed Green Hydrogen project (in Indian Rupee - compulsory convert to indian rupee).",
-    backstory=(
-        "You are a meticulous financial analyst with deep experience in cost modeling for renewable energy infrastructure in India. "
-        "You provide high-level, indicative cost estimates to guide initial investment decisions. "
-        "You work with industry-standard heuristics to calculate CAPEX and OPEX based on project size (MW)."
-    ),
-    llm=llm,
-    verbose=True,
-    allow_delegation=False
-)
+        from dotenv import load_dotenv
+        from crewai import Agent, LLM
 
-def get_reasoning_for_data(weights, scores_data):
+        # Load environment variables from .env file
+        load_dotenv()
+
+        use_stub = os.getenv("REASONING_LLM", "gemini") == "stub"
+        if use_stub:
+            from .stub_llm import StubLLM
+            llm = StubLLM()
+        else:
+            llm = LLM(
+                model=LLM_MODEL,
+                temperature=LLM_TEMPERATURE,
+                # reasoning_effort='high'
+            )
+
+        # Define the Agent
+        analyst_agent = Agent(
+            role=ANALYST_ROLE,
+            goal=ANALYST_GOAL,
+            backstory=ANALYST_BACKSTORY,
+            llm=llm,
+            verbose=True,
+            allow_delegation=False
+        )
+
+        _llm_stack = {'llm': llm, 'analyst_agent': analyst_agent, 'stub': use_stub}
+        return _llm_stack
+
+
+# --- Reasoning cache ---
+# Inputs are bucketed before hashing so analyses that differ only in the second
+# decimal of a score reuse the same generated text instead of calling Gemini again.
+# Bump REASONING_PROMPT_VERSION whenever a prompt changes to invalidate old entries.
+REASONING_PROMPT_VERSION = 3
+WEIGHT_BUCKET = 0.05
+SCORE_BUCKET = 0.5
+DISTANCE_BUCKET_KM = 5.0
+
+_reasoning_cache = None
+_reasoning_cache_lock = threading.Lock()
+
+
+def get_reasoning_cache(directory=None, max_items=256, disk_size_limit=64 * 1024 * 1024, default_ttl=7 * 24 * 3600):
+    """Returns the process-wide reasoning cache, creating it on first use."""
+    global _reasoning_cache
+    with _reasoning_cache_lock:
+        if _reasoning_cache is None:
+            _reasoning_cache = TieredCache(
+                max_items=max_items,
+                directory=directory,
+                disk_size_limit=disk_size_limit,
+                default_ttl=default_ttl
+            )
+        return _reasoning_cache
+
+
+def _cache():
+    """The reasoning cache, configured from the app's REASONING_CACHE_* settings."""
+    if not has_app_context():
+        return get_reasoning_cache()
+    config = current_app.config
+    return get_reasoning_cache(
+        directory=config['REASONING_CACHE_DIR'],
+        max_items=config['REASONING_CACHE_MEMORY_ITEMS'],
+        disk_size_limit=config['REASONING_CACHE_BYTES'],
+        default_ttl=config['REASONING_CACHE_TTL']
+    )
+
+
+def _bucket(value, step):
+    """Rounds a number to the nearest multiple of `step`; non-numbers pass through."""
+    try:
+        return round(round(float(value) / step) * step, 4)
+    except (TypeError, ValueError):
+        return value
+
+
+def _significant(value, digits=3):
+    """Rounds a number to a fixed number of significant figures."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return value
+    if value == 0 or not math.isfinite(value):
+        return value
+    return round(value, digits - 1 - int(math.floor(math.log10(abs(value)))))
+
+
+def _cache_key(kind, payload):
+    canonical = json.dumps(payload, sort_keys=True, default=str)
+    digest = hashlib.sha1(canonical.encode()).hexdigest()
+    return (kind, LLM_MODEL, REASONING_PROMPT_VERSION, digest)
+
+
+def reasoning_cache_key(weights, scores_data):
+    """Canonical cache key for get_reasoning_for_data inputs."""
+    sub_scores = scores_data.get('subScores', {})
+    return _cache_key('scores', {
+        'weights': {k: _bucket(weights.get(k, 0), WEIGHT_BUCKET) for k in ('power', 'market', 'logistics')},
+        'overall': _bucket(scores_data.get('overallScore'), SCORE_BUCKET),
+        'subScores': {k: _bucket(sub_scores.get(k), SCORE_BUCKET) for k in ('power', 'market', 'logistics')}
+    })
+
+
+def power_supply_cache_key(power_analysis_data):
+    """Canonical cache key for get_reasoning_for_power_supply inputs."""
+    return _cache_key('power-supply', {
+        'required': _significant(power_analysis_data.get('required_capacity_mw')),
+        'available': _significant(power_analysis_data.get('total_available_capacity_mw')),
+        'supplyScore': _bucket(power_analysis_data.get('supply_score'), SCORE_BUCKET),
+        'costModel': [CAPEX_USD_PER_MW, OPEX_FRACTION_OF_CAPEX, USD_TO_INR],
+        'plants': [
+            [plant.get('type'), _significant(plant.get('capacity_mw')), _bucket(plant.get('distance_km'), DISTANCE_BUCKET_KM)]
+            for plant in power_analysis_data.get('nearest_plants', [])
+        ]
+    })
+
+
+def build_reasoning_prompt(weights, scores_data):
     """
-    Uses the CrewAI agent to generate a textual reasoning for the given scores.
-    
-    Args:
-        weights (dict): The user's input weights.
-        scores_data (dict): The output data from the optimization service.
-        
-    Returns:
-        str: The AI-generated reasoning.
+    Builds the analyst prompt explaining a site's scores against the user's weights.
     """
-    
-    # Dynamically create the task description based on the input data
-    task_description = (
+    return (
         f"Analyze the following data for a potential Green Hydrogen project location in India and provide a concise reasoning for its feasibility. "
         f"The user's priorities (weights) are: Power Proximity = {weights.get('power', 0)}, Market Proximity = {weights.get('market', 0)}, Logistics Access = {weights.get('logistics', 0)}. "
         f"The calculated feasibility scores (out of 10) are: Overall Score = {scores_data.get('overallScore', 'N/A')}, "
@@ -90,87 +187,267 @@ def get_reasoning_for_data(weights, scores_data):
         f"Keep the analysis to 2-3 sentences."
     )
 
+
+def build_power_supply_report_prompt(power_analysis_data):
+    """
+    Builds the final report prompt from the power analysis. CAPEX/OPEX come
+    from the deterministic cost model and are stated in the prompt.
+    """
+    required_capacity = power_analysis_data.get('required_capacity_mw', 0)
+    financial_section = describe_costs(estimate_project_costs(required_capacity))
+    plants_summary = "\n".join([
+        f"- A {plant['type']} source with {plant['capacity_mw']} MW is {plant['distance_km']} km away."
+        for plant in power_analysis_data.get("nearest_plants", [])
+    ])
+
+    return (
+        f"Create a comprehensive feasibility report for a proposed Green Hydrogen project. "
+        f"You must synthesize two sets of information: the Power Supply data and the Financial Estimates. "
+        f"\n\n**1. Power Supply Data:**"
+        f"\nThe project requires {required_capacity} MW. The total available capacity from nearby plants is {power_analysis_data.get('total_available_capacity_mw')} MW, "
+        f"resulting in a Supply Score of {power_analysis_data.get('supply_score')}/10. The nearest plants are:\n{plants_summary}"
+        f"\n\n**2. Financial Estimates:**"
+        f"\nUse these figures exactly as given: {financial_section}"
+        f"\n\n**Your Final Report Structure:**"
+        f"\nStructure your output with three distinct sections using Markdown headings:"
+        f"\n### Power Supply Analysis"
+        f"\n(Provide a 2-3 sentence analysis of the power supply adequacy.)"
+        f"\n### Financial Estimate"
+        f"\n(State the CAPEX and annual OPEX clearly.)"
+        f"\n### Overall Recommendation"
+        f"\n(Provide a 1-2 sentence concluding thought on the project's viability based on both power and cost factors.)"
+    )
+
+
+def get_reasoning_for_data(weights, scores_data):
+    """
+    Uses the CrewAI agent to generate a textual reasoning for the given scores.
+    
+    Args:
+        weights (dict): The user's input weights.
+        scores_data (dict): The output data from the optimization service.
+        
+    Returns:
+        str: The AI-generated reasoning.
+    """
+    cache_key = reasoning_cache_key(weights, scores_data)
+    cached = _cache().get(cache_key)
+    if cached is not None:
+        return cached
+
+    from crewai import Task, Crew, Process
+    analyst_agent = get_llm_stack()['analyst_agent']
+
     # Define the Task for the Agent
     analysis_task = Task(
-        description=task_description,
+        description=build_reasoning_prompt(weights, scores_data),
         expected_output="A short, insightful paragraph explaining the reasoning behind the scores, directly referencing the provided data and user weights.",
         agent=analyst_agent
     )
 
     # Create and run the Crew
-    # Adding extra agent here to get cost
     crew = Crew(
-        agents=[analyst_agent, financial_analyst_agent],
+        agents=[analyst_agent],
         tasks=[analysis_task],
         verbose=True,
         process=Process.sequential
     )
 
-    print(gemini_api_key)
-    result = crew.kickoff()
+    with timed('llm'):
+        result = crew.kickoff()
+    _cache().set(cache_key, result.raw)
     return result.raw
 
 
 def get_reasoning_for_power_supply(power_analysis_data):
     """
-    Uses a multi-agent Crew to generate a comprehensive report including
+    Uses the analyst agent to generate a comprehensive report including
     power supply analysis and financial estimates (CAPEX/OPEX).
     """
-    required_capacity = power_analysis_data.get('required_capacity_mw', 0)
-
-    # --- TASK 1: Financial Estimation ---
-    # The Financial Analyst calculates the costs first.
-    financial_task = Task(
-        description=(
-            f"Calculate the preliminary financial estimates for a Green Hydrogen project "
-            f"that requires {required_capacity} MW of power. "
-            f"1.  **Estimate Capital Expenditure (CAPEX):** Use a standard heuristic of **$1.5 million USD per MW** for the electrolyzer system and balance-of-plant costs. Calculate the total. "
-            f"2.  **Estimate Annual Operational Expenditure (OPEX):** Assume OPEX is **3% of the total CAPEX** per year. Calculate the total. "
-            f"Present the final numbers clearly under 'Capital Expenditure (CAPEX)' and 'Annual Operational Expenditure (OPEX)' headings."
-        ),
-        expected_output="A concise summary with the total estimated CAPEX in USD and the total estimated annual OPEX in USD.",
-        agent=financial_analyst_agent
-    )
+    cache_key = power_supply_cache_key(power_analysis_data)
+    cached = _cache().get(cache_key)
+    if cached is not None:
+        return cached
 
-    # --- TASK 2: Final Report Synthesis ---
-    # The Lead Analyst takes the power data AND the financial data to write the final report.
-    
-    plants_summary = "\n".join([
-        f"- A {plant['type']} source with {plant['capacity_mw']} MW is {plant['distance_km']} km away."
-        for plant in power_analysis_data.get("nearest_plants", [])
-    ])
+    from crewai import Task, Crew, Process
+    analyst_agent = get_llm_stack()['analyst_agent']
 
+    # The financial estimate is computed in-process by the cost model and embedded
+    # in the prompt, so the Lead Analyst writes the whole report in one LLM call.
     synthesis_task = Task(
-        description=(
-            f"Create a comprehensive feasibility report for a proposed Green Hydrogen project. "
-            f"You must synthesize two sets of information: the Power Supply data and the Financial Estimates. "
-            f"\n\n**1. Power Supply Data:**"
-            f"\nThe project requires {required_capacity} MW. The total available capacity from nearby plants is {power_analysis_data.get('total_available_capacity_mw')} MW, "
-            f"resulting in a Supply Score of {power_analysis_data.get('supply_score')}/10. The nearest plants are:\n{plants_summary}"
-            f"\n\n**2. Financial Estimates (from the Financial Analyst):**"
-            f"\nIncorporate the CAPEX and OPEX calculations from the Financial Analyst's report. "
-            f"\n\n**Your Final Report Structure:**"
-            f"\nStructure your output with three distinct sections using Markdown headings:"
-            f"\n### Power Supply Analysis"
-            f"\n(Provide a 2-3 sentence analysis of the power supply adequacy.)"
-            f"\n### Financial Estimate"
-            f"\n(State the CAPEX and annual OPEX clearly.)"
-            f"\n### Overall Recommendation"
-            f"\n(Provide a 1-2 sentence concluding thought on the project's viability based on both power and cost factors.)"
-        ),
+        description=build_power_supply_report_prompt(power_analysis_data),
         expected_output="A structured report with three markdown-headed sections: 'Power Supply Analysis', 'Financial Estimate', and 'Overall Recommendation'.",
-        agent=analyst_agent,
-        context=[financial_task] # <-- CRITICAL: This gives the output of Task 1 to Task 2
+        agent=analyst_agent
+    )
+
+    crew = Crew(
+        agents=[analyst_agent],
+        tasks=[synthesis_task],
+        verbose=True,
+        process=Process.sequential
+    )
+
+    with timed('llm'):
+        result = crew.kickoff()
+    _cache().set(cache_key, result.raw)
+    return result.raw
+
+
+# --- Batched reasoning ---
+# Explaining the top N sites one request at a time costs N LLM round trips.
+# Instead all uncached sites go into one structured prompt and the per-site
+# explanations are parsed back out of a single JSON response.
+
+def build_batch_reasoning_prompt(weights, sites):
+    """
+    Builds one prompt asking for a short explanation of every site in `sites`.
+    Sites are numbered from 1 in the prompt.
+    """
+    site_lines = "\n".join(
+        f"Site {i}: latitude {site.get('latitude', 'N/A')}, longitude {site.get('longitude', 'N/A')}, "
+        f"Overall Score = {site.get('overallScore', 'N/A')}, "
+        f"Power Score = {site.get('subScores', {}).get('power', 'N/A')}, "
+        f"Market Score = {site.get('subScores', {}).get('market', 'N/A')}, "
+        f"Logistics Score = {site.get('subScores', {}).get('logistics', 'N/A')}"
+        for i, site in enumerate(sites, start=1)
+    )
+    return (
+        f"Analyze the following candidate locations for a Green Hydrogen project in India and provide a concise reasoning for the feasibility of EACH one. "
+        f"The user's priorities (weights) are: Power Proximity = {weights.get('power', 0)}, Market Proximity = {weights.get('market', 0)}, Logistics Access = {weights.get('logistics', 0)}. "
+        f"All scores are out of 10.\n\n{site_lines}\n\n"
+        f"For each site, explain WHY its overall score is what it is, referencing the user's weights and the specific sub-scores, in 2-3 sentences. "
+        f"Respond ONLY with a JSON array, one object per site, in the form "
+        f'[{{"site": 1, "reasoning": "..."}}, {{"site": 2, "reasoning": "..."}}] and no other text.'
     )
 
-    # Create and run the Crew with both agents and tasks
+
+def parse_batch_reasoning(raw_text, num_sites):
+    """
+    Extracts {site number: reasoning} from the model's JSON answer, tolerating
+    markdown code fences or text around the array.
+    """
+    match = re.search(r"\[.*\]", raw_text, re.DOTALL)
+    if not match:
+        raise ValueError("Batch reasoning response did not contain a JSON array")
+
+    parsed = {}
+    for item in json.loads(match.group(0)):
+        try:
+            site = int(item.get('site'))
+        except (AttributeError, TypeError, ValueError):
+            continue
+        if 1 <= site <= num_sites and item.get('reasoning'):
+            parsed[site] = str(item['reasoning']).strip()
+    return parsed
+
+
+def get_reasoning_for_sites(weights, sites):
+    """
+    Generates a reasoning for each site with at most one LLM call.
+
+    Args:
+        weights (dict): The user's input weights.
+        sites (list): Score dicts as returned by /optimize-grid or /optimize-radius.
+
+    Returns:
+        list: One reasoning string per site, in the same order.
+    """
+    keys = [reasoning_cache_key(weights, site) for site in sites]
+    reasonings = [_cache().get(key) for key in keys]
+    missing = [i for i, text in enumerate(reasonings) if text is None]
+    if not missing:
+        return reasonings
+
+    from crewai import Task, Crew, Process
+    analyst_agent = get_llm_stack()['analyst_agent']
+
+    batch_task = Task(
+        description=build_batch_reasoning_prompt(weights, [sites[i] for i in missing]),
+        expected_output="A JSON array with one {\"site\": <number>, \"reasoning\": <text>} object per site.",
+        agent=analyst_agent
+    )
     crew = Crew(
-        agents=[analyst_agent, financial_analyst_agent],
-        tasks=[financial_task, synthesis_task],
+        agents=[analyst_agent],
+        tasks=[batch_task],
         verbose=True,
-        # Process.sequential ensures tasks run one after another
-        process=Process.sequential 
+        process=Process.sequential
+    )
+    with timed('llm'):
+        raw = crew.kickoff().raw
+    parsed = parse_batch_reasoning(raw, len(missing))
+
+    for position, i in enumerate(missing, start=1):
+        if position in parsed:
+            reasonings[i] = parsed[position]
+            _cache().set(keys[i], parsed[position])
+        else:
+            # The model skipped this site; fall back to a single-site call
+            reasonings[i] = get_reasoning_for_data(weights, sites[i])
+    return reasonings
+
+
+# --- Streaming variants ---
+# These bypass the Crew and stream the analyst's answer straight from the LLM,
+# so the browser sees the first words as soon as they are generated.
+
+def stream_llm(prompt):
+    """
+    Streams a completion for `prompt`, using the analyst's role and backstory as
+    the system prompt. Yields text chunks.
+    """
+    messages = [
+        {"role": "system", "content": f"You are a {ANALYST_ROLE}. {ANALYST_BACKSTORY} Your goal: {ANALYST_GOAL}"},
+        {"role": "user", "content": prompt}
+    ]
+
+    stack = get_llm_stack()
+    if stack['stub']:
+        yield from stack['llm'].stream(messages)
+        return
+
+    import litellm
+    response = litellm.completion(
+        model=LLM_MODEL,
+        messages=messages,
+        temperature=LLM_TEMPERATURE,
+        api_key=os.getenv("GEMINI_API_KEY"),
+        stream=True
+    )
+    for chunk in response:
+        text = chunk.choices[0].delta.content
+        if text:
+            yield text
+
+
+def _stream_and_cache(cache_key, prompt):
+    cached = _cache().get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    with timed('llm_stream'):
+        for text in stream_llm(prompt):
+            parts.append(text)
+            yield text
+    _cache().set(cache_key, "".join(parts))
+
+
+def stream_reasoning_for_data(weights, scores_data):
+    """
+    Streaming version of get_reasoning_for_data. Yields text chunks.
+    """
+    return _stream_and_cache(
+        reasoning_cache_key(weights, scores_data),
+        build_reasoning_prompt(weights, scores_data)
     )
 
-    result = crew.kickoff()
-    return result.raw
\ No newline at end of file
+
+def stream_reasoning_for_power_supply(power_analysis_data):
+    """
+    Streaming version of get_reasoning_for_power_supply. Yields text chunks.
+    """
+    return _stream_and_cache(
+        power_supply_cache_key(power_analysis_data),
+        build_power_supply_report_prompt(power_analysis_data)
+    )
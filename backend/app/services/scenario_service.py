@@ -0,0 +1,175 @@
+# In app/services/scenario_service.py
+"""
+What-if scenarios on the national grid ("if this solar park is built, how do the
+top sites change?"), scored as small deltas on cached nearest-facility fields.
+"""
+
+import threading
+
+import numpy as np
+
+from .optimization_service import create_india_grid, calculate_nearest, calculate_min_distances, haversine_distances
+
+LAYERS = ('power', 'market', 'logistics')
+
+# A removed facility is matched to the nearest base facility within this distance
+REMOVE_MATCH_KM = 1.0
+
+# (dataset_version, step) -> base fields; only the current dataset version is kept
+_base_fields = {}
+_base_fields_lock = threading.Lock()
+
+
+def get_base_fields(dataset_version, step, renewable_df, demand_df, logistics_df):
+    """
+    Returns the cached base fields for the national grid:
+    {'grid': [lat, lon], 'grid_rad', layer: {'points_rad', 'distances', 'nearest', 'max_dist'}}.
+    """
+    key = (dataset_version, step)
+    with _base_fields_lock:
+        fields = _base_fields.get(key)
+    if fields is not None:
+        return fields
+
+    grid_points = create_india_grid(step=step)
+    grid_rad = np.radians(grid_points)
+    fields = {'grid': grid_points, 'grid_rad': grid_rad}
+    for layer, df in zip(LAYERS, (renewable_df, demand_df, logistics_df)):
+        points_rad = np.radians(df[['latitude', 'longitude']].values)
+        distances, nearest = calculate_nearest(grid_rad, points_rad)
+        fields[layer] = {
+            'points_rad': points_rad,
+            'distances': distances,
+            'nearest': nearest,
+            'max_dist': float(distances.max())
+        }
+
+    with _base_fields_lock:
+        # Older dataset versions can never be requested again
+        for stale in [k for k in _base_fields if k[0] != dataset_version]:
+            del _base_fields[stale]
+        _base_fields[key] = fields
+    return fields
+
+
+def parse_scenario(changes, base):
+    """
+    Validates the 'add' / 'remove' lists of a scenario request and resolves them
+    per layer to {'added_rad': [[lat, lon]] in radians, 'removed': [base index]}.
+    Raises ValueError with a client-facing message on bad input.
+    """
+    delta = {layer: {'added_rad': [], 'removed': set()} for layer in LAYERS}
+
+    for kind in ('add', 'remove'):
+        for item in changes.get(kind) or []:
+            layer = item.get('layer')
+            if layer not in LAYERS:
+                raise ValueError(f"Each '{kind}' entry needs a 'layer' of {', '.join(LAYERS)}")
+            try:
+                point = [float(item['latitude']), float(item['longitude'])]
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"Each '{kind}' entry needs numeric 'latitude' and 'longitude'")
+            point_rad = np.radians(point)
+
+            if kind == 'add':
+                delta[layer]['added_rad'].append(point_rad)
+                continue
+
+            distances = haversine_distances(point_rad[None, :], base[layer]['points_rad'])[0] * 6371
+            index = int(distances.argmin())
+            if distances[index] > REMOVE_MATCH_KM:
+                raise ValueError(
+                    f"No existing '{layer}' facility within {REMOVE_MATCH_KM} km of "
+                    f"({point[0]}, {point[1]}) to remove"
+                )
+            delta[layer]['removed'].add(index)
+
+    return delta
+
+
+def apply_layer_delta(grid_rad, layer_base, added_rad, removed):
+    """
+    Nearest-facility distances for one layer with the delta applied.
+    Returns (distances_km, changed_mask).
+    """
+    distances = layer_base['distances'].copy()
+    changed = np.zeros(len(distances), dtype=bool)
+
+    if removed:
+        # Only cells whose nearest facility was removed need a new nearest
+        orphaned = np.isin(layer_base['nearest'], list(removed))
+        if orphaned.any():
+            keep = np.ones(len(layer_base['points_rad']), dtype=bool)
+            keep[list(removed)] = False
+            if keep.any():
+                distances[orphaned] = calculate_min_distances(grid_rad[orphaned], layer_base['points_rad'][keep])
+            else:
+                distances[orphaned] = np.inf
+            changed |= orphaned
+
+    if added_rad:
+        # Tiny delta index: every cell against the handful of new facilities
+        added_distances = calculate_min_distances(grid_rad, np.asarray(added_rad))
+        closer = added_distances < distances
+        distances[closer] = added_distances[closer]
+        changed |= closer
+
+    return distances, changed
+
+
+def _layer_scores(distances, max_dist):
+    # Same 0-10 scale as the baseline so scenario and baseline scores are comparable
+    return np.clip(10 * (1 - distances / max_dist), 0, 10)
+
+
+def _top_cells(grid_points, overall, sub_scores, num_results, baseline_overall=None):
+    top = np.argsort(-overall, kind='stable')[:num_results]
+    output = []
+    for i in top:
+        entry = {
+            'latitude': float(grid_points[i, 0]),
+            'longitude': float(grid_points[i, 1]),
+            'overallScore': round(float(overall[i]), 2),
+            'subScores': {layer: round(float(sub_scores[layer][i]), 2) for layer in LAYERS}
+        }
+        if baseline_overall is not None:
+            entry['baselineScore'] = round(float(baseline_overall[i]), 2)
+            entry['scoreChange'] = round(float(overall[i] - baseline_overall[i]), 2)
+        output.append(entry)
+    return output
+
+
+def calculate_scenario_scores(weights, changes, dataset_version, renewable_df, demand_df, logistics_df,
+                              num_results=10, step=0.5):
+    """
+    Top sites on the national grid for the baseline and for a what-if scenario.
+    `changes` is {'add': [...], 'remove': [...]}, entries {'layer', 'latitude', 'longitude'}.
+    """
+    base = get_base_fields(dataset_version, step, renewable_df, demand_df, logistics_df)
+    delta = parse_scenario(changes, base)
+
+    baseline_sub = {}
+    scenario_sub = {}
+    changed_cells = {}
+    for layer in LAYERS:
+        layer_base = base[layer]
+        baseline_sub[layer] = _layer_scores(layer_base['distances'], layer_base['max_dist'])
+        if not delta[layer]['added_rad'] and not delta[layer]['removed']:
+            scenario_sub[layer] = baseline_sub[layer]
+            changed_cells[layer] = 0
+            continue
+        distances, changed = apply_layer_delta(
+            base['grid_rad'], layer_base, delta[layer]['added_rad'], delta[layer]['removed']
+        )
+        scenario_sub[layer] = _layer_scores(distances, layer_base['max_dist'])
+        changed_cells[layer] = int(changed.sum())
+
+    baseline_overall = sum(weights[layer] * baseline_sub[layer] for layer in LAYERS)
+    scenario_overall = sum(weights[layer] * scenario_sub[layer] for layer in LAYERS)
+
+    return {
+        "results": _top_cells(base['grid'], scenario_overall, scenario_sub, num_results, baseline_overall),
+        "baseline": _top_cells(base['grid'], baseline_overall, baseline_sub, num_results),
+        "changedCells": changed_cells,
+        "gridPoints": len(base['grid'])
+    }
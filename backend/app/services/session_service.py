@@ -0,0 +1,274 @@
+# In app/services/session_service.py
+"""
+Stateful supply-chain sessions (/api/supply-chain/sessions): each keeps one
+SupplyChainOptimizer in memory, so edits are followed by warm-started re-solves.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from supply_chain_optimizer import SupplyChainOptimizer, Location, Facility, DemandPoint, FacilityType
+
+logger = logging.getLogger(__name__)
+
+FACILITY_TYPES = {'production': FacilityType.PRODUCTION, 'storage': FacilityType.STORAGE}
+
+
+class SessionNotFound(KeyError):
+    """Raised for an unknown or evicted session id."""
+
+
+class _Session:
+    def __init__(self, session_id, optimizer):
+        self.id = session_id
+        self.optimizer = optimizer
+        self.lock = threading.Lock()  # The optimizer is not thread safe
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.memory_bytes = optimizer.memory_bytes()
+
+
+class SessionStore:
+    """
+    In-memory sessions in LRU order, bounded by count, idle time and total
+    (estimated) memory. A session evicted while a request is using it stays
+    valid for that request.
+    """
+
+    def __init__(self, max_sessions=64, max_bytes=512 * 1024 * 1024, idle_ttl=3600,
+                 matrix_bytes=32 * 1024 * 1024):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.matrix_bytes = matrix_bytes
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self):
+        """Creates an empty session and returns its id."""
+        optimizer = SupplyChainOptimizer()
+        optimizer.distances.max_bytes = self.matrix_bytes
+        session = _Session(uuid.uuid4().hex, optimizer)
+        with self._lock:
+            self._sessions[session.id] = session
+            self._evict(keep=session.id)
+        return session.id
+
+    def delete(self, session_id):
+        """Drops a session. Returns False if it was unknown."""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    @contextmanager
+    def use(self, session_id):
+        """
+        Holds the session's lock for the duration of a request and yields it.
+        Its memory is re-measured afterwards and the cap enforced.
+        Raises SessionNotFound for unknown, expired or evicted ids.
+        """
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is None:
+                raise SessionNotFound(session_id)
+            self._sessions.move_to_end(session_id)
+
+        with session.lock:
+            try:
+                yield session
+            finally:
+                session.last_used = time.time()
+                session.memory_bytes = session.optimizer.memory_bytes()
+
+        with self._lock:
+            self._evict(keep=session_id)
+
+    def _expire(self):
+        cutoff = time.time() - self.idle_ttl
+        for session_id in [k for k, s in self._sessions.items() if s.last_used < cutoff]:
+            del self._sessions[session_id]
+
+    def _evict(self, keep):
+        # Least recently used first; the session just used is kept even if it alone is over the cap
+        total = sum(s.memory_bytes for s in self._sessions.values())
+        for session_id in list(self._sessions):
+            if len(self._sessions) <= self.max_sessions and total <= self.max_bytes:
+                break
+            if session_id == keep:
+                continue
+            evicted = self._sessions.pop(session_id)
+            total -= evicted.memory_bytes
+            logger.info("Evicted supply-chain session %s (%d bytes)", session_id, evicted.memory_bytes)
+
+
+_session_store = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store(max_sessions=64, max_bytes=512 * 1024 * 1024, idle_ttl=3600, matrix_bytes=32 * 1024 * 1024):
+    """Returns the process-wide session store, creating it on first use."""
+    global _session_store
+    with _session_store_lock:
+        if _session_store is None:
+            _session_store = SessionStore(max_sessions, max_bytes, idle_ttl, matrix_bytes)
+        return _session_store
+
+
+# --- Request parsing ---------------------------------------------------------
+# Each raises ValueError with a client-facing message on bad input.
+
+def _number(item, key, default=None, minimum=None):
+    value = item.get(key, default)
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{key}' must be a number")
+    if minimum is not None and value < minimum:
+        raise ValueError(f"'{key}' must be at least {minimum}")
+    return value
+
+
+def _entity_id(item, kind):
+    entity_id = item.get('id')
+    if not isinstance(entity_id, str) or not entity_id:
+        raise ValueError(f"Each {kind} needs a string 'id'")
+    return entity_id
+
+
+def _session_location(optimizer, item, pending=None):
+    location_id = item.get('locationId')
+    if pending and location_id in pending:
+        return pending[location_id]
+    if location_id not in optimizer.locations:
+        raise ValueError(f"Unknown 'locationId' {location_id!r}; add the location first")
+    return optimizer.locations[location_id]
+
+
+def parse_location(item):
+    if not isinstance(item, dict):
+        raise ValueError("Each location must be an object")
+    location_id = _entity_id(item, 'location')
+    return Location(
+        location_id,
+        str(item.get('name', location_id)),
+        _number(item, 'latitude'),
+        _number(item, 'longitude'),
+        _number(item, 'costIndex', default=1.0, minimum=0)
+    )
+
+
+def parse_facility(optimizer, item, pending=None):
+    if not isinstance(item, dict):
+        raise ValueError("Each facility must be an object")
+    facility_type = FACILITY_TYPES.get(item.get('type'))
+    if facility_type is None:
+        raise ValueError(f"'type' must be one of {', '.join(FACILITY_TYPES)}")
+    return Facility(
+        _entity_id(item, 'facility'),
+        _session_location(optimizer, item, pending),
+        facility_type,
+        capacity=_number(item, 'capacity', minimum=0),
+        current_utilization=_number(item, 'currentUtilization', default=0.0, minimum=0)
+    )
+
+
+def parse_demand(optimizer, item, pending=None):
+    """A demand at a session location ('locationId') or at an ad-hoc point ('latitude'/'longitude')."""
+    if not isinstance(item, dict):
+        raise ValueError("Each demand must be an object")
+    demand_id = _entity_id(item, 'demand')
+    if 'locationId' in item:
+        location = _session_location(optimizer, item, pending)
+    else:
+        location = parse_location(dict(item, id=f"{demand_id}_location"))
+    return DemandPoint(
+        demand_id,
+        location,
+        demand_volume=_number(item, 'volume', minimum=0),
+        priority=int(_number(item, 'priority', default=1))
+    )
+
+
+def parse_plan(optimizer, plan):
+    """The plan's allocations with 'volume' as a float."""
+    if not isinstance(plan, list):
+        raise ValueError("'plan' must be a list of allocations")
+    allocations = []
+    for allocation in plan:
+        if not isinstance(allocation, dict) or allocation.get('from_facility') not in optimizer.facilities:
+            raise ValueError("Each allocation needs a 'from_facility' of this session")
+        allocations.append(dict(allocation, volume=_number(allocation, 'volume', minimum=0)))
+    return allocations
+
+
+# --- Operations --------------------------------------------------------------
+
+def add_entities(session, data):
+    """Adds the 'locations', 'facilities' and 'demands' of a request body, in that order."""
+    optimizer = session.optimizer
+    # Parse everything first so a bad entry leaves the session unchanged;
+    # facilities and demands may refer to locations of the same request
+    locations = [parse_location(item) for item in _list(data, 'locations')]
+    pending = {location.id: location for location in locations}
+    facilities = [parse_facility(optimizer, item, pending) for item in _list(data, 'facilities')]
+    demands = [parse_demand(optimizer, item, pending) for item in _list(data, 'demands')]
+
+    for location in locations:
+        optimizer.add_location(location)
+    for facility in facilities:
+        optimizer.add_facility(facility)
+    for demand in demands:
+        optimizer.add_demand_point(demand)
+    return summary(session)
+
+
+def _list(data, key):
+    items = data.get(key) or []
+    if not isinstance(items, list):
+        raise ValueError(f"'{key}' must be a list")
+    return items
+
+
+def evaluate_demand(session, item):
+    optimizer = session.optimizer
+    result = optimizer.evaluate_new_demand(parse_demand(optimizer, item))
+    result['solve'] = dict(optimizer.route_solver.last_solve)
+    return result
+
+
+def optimize_routes(session, options):
+    """
+    'mode': 'lp' (default) re-solves the exact transportation LP;
+    'greedy' is the fast priority-order allocation, optionally with 'compareWithLp'.
+    """
+    optimizer = session.optimizer
+    mode = options.get('mode', 'lp')
+    if mode == 'greedy':
+        return optimizer.allocate_by_priority(compare_with_lp=bool(options.get('compareWithLp')))
+    if mode != 'lp':
+        raise ValueError("'mode' must be 'lp' or 'greedy'")
+    routes = optimizer.optimize_supply_routes()
+    return {'optimizations': routes, 'solve': dict(optimizer.route_solver.last_solve)}
+
+
+def execute_plan(session, plan):
+    optimizer = session.optimizer
+    message = optimizer.execute_fulfillment_plan(parse_plan(optimizer, plan))
+    return dict(summary(session), message=message)
+
+
+def summary(session):
+    optimizer = session.optimizer
+    return {
+        'sessionId': session.id,
+        'locations': len(optimizer.locations),
+        'facilities': len(optimizer.facilities),
+        'demands': len(optimizer.demand_points),
+        'memoryBytes': optimizer.memory_bytes(),
+        'createdAt': session.created_at,
+        'lastSolve': dict(optimizer.route_solver.last_solve)
+    }
@@ -0,0 +1,74 @@
+# In app/services/stub_llm.py
+"""
+A local stand-in for Gemini used in tests and load tests.
+Enable it with REASONING_LLM=stub. It returns canned, prompt-dependent text
+with a configurable delay and never makes a network call.
+"""
+
+import json
+import os
+import re
+import time
+
+try:
+    from crewai import BaseLLM
+except ImportError:
+    BaseLLM = object
+
+STUB_TEXT = (
+    "The site balances its proximity to renewable power, demand centers and logistics hubs "
+    "in line with the weights provided. The strongest sub-score drives most of the overall result, "
+    "while the weakest factor is the main risk to address before committing capital."
+)
+
+
+class StubLLM(BaseLLM):
+    """
+    Deterministic fake LLM. `first_token_delay` is the wait before the first
+    chunk and `chunk_delay` the wait between chunks, both in seconds.
+    """
+
+    def __init__(self, model="stub/echo", temperature=None, first_token_delay=None, chunk_delay=None, chunk_words=3):
+        if BaseLLM is not object:
+            super().__init__(model=model, temperature=temperature)
+        else:
+            self.model = model
+            self.temperature = temperature
+        self.first_token_delay = float(first_token_delay if first_token_delay is not None
+                                       else os.getenv("STUB_LLM_FIRST_TOKEN_DELAY", 0.05))
+        self.chunk_delay = float(chunk_delay if chunk_delay is not None
+                                 else os.getenv("STUB_LLM_CHUNK_DELAY", 0.01))
+        self.chunk_words = chunk_words
+
+    def _respond(self, messages):
+        prompt = messages if isinstance(messages, str) else messages[-1].get("content", "")
+        # Batched prompts list "Site N:" lines and expect a JSON array back
+        if "JSON array" in prompt:
+            sites = sorted({int(n) for n in re.findall(r"^Site (\d+):", prompt, re.MULTILINE)})
+            return json.dumps([{"site": n, "reasoning": f"[stub:site {n}] {STUB_TEXT}"} for n in sites])
+        # Echo a short fingerprint of the prompt so different inputs give different text
+        return f"[stub:{len(prompt)}] {STUB_TEXT}"
+
+    def stream(self, messages):
+        """Yields the response a few words at a time, sleeping between chunks."""
+        words = self._respond(messages).split(" ")
+        time.sleep(self.first_token_delay)
+        for i in range(0, len(words), self.chunk_words):
+            if i:
+                time.sleep(self.chunk_delay)
+            yield " ".join(words[i:i + self.chunk_words]) + " "
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        """Blocking call used by crewai agents; sleeps for the full stream duration."""
+        text = "".join(self.stream(messages)).strip()
+        # crewai agents expect the ReAct-style final answer marker
+        return f"Thought: I now can give a great answer\nFinal Answer: {text}"
+
+    def supports_function_calling(self):
+        return False
+
+    def supports_stop_words(self):
+        return False
+
+    def get_context_window_size(self):
+        return 8192
@@ -0,0 +1,133 @@
+# In app/services/tile_service.py
+
+import math
+import threading
+
+import numpy as np
+
+from .optimization_service import create_india_grid, calculate_min_distances, calculate_scores
+from ..utils.cache import TieredCache
+
+EARTH_CIRCUMFERENCE_KM = 40075.0
+
+_tile_cache = None
+_tile_cache_lock = threading.Lock()
+
+# Per dataset version: the national-grid max distance for each layer, used so
+# every tile is normalized on the same 0-10 scale as /optimize-grid.
+_reference_distances = {}
+
+
+def get_tile_cache(directory=None, max_items=512, disk_size_limit=256 * 1024 * 1024):
+    """Returns the process-wide tile cache, creating it on first use."""
+    global _tile_cache
+    with _tile_cache_lock:
+        if _tile_cache is None:
+            _tile_cache = TieredCache(
+                max_items=max_items,
+                directory=directory,
+                disk_size_limit=disk_size_limit
+            )
+        return _tile_cache
+
+
+def quantize_weights(weights, step=0.05):
+    """
+    Snaps weights to a fixed step so near-identical slider positions share tiles.
+    """
+    return {
+        key: round(round(float(weights.get(key, 0)) / step) * step, 4)
+        for key in ('power', 'market', 'logistics')
+    }
+
+
+def tile_bounds(z, x, y):
+    """
+    Returns (west, south, east, north) in degrees for a web-mercator tile.
+    """
+    n = 2 ** z
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return west, south, east, north
+
+
+def cells_per_tile(z, max_cells=64, min_cell_km=1.0):
+    """
+    Picks the sampling resolution for a zoom level: finer cells as you zoom in,
+    but never more than `max_cells` per side or finer than `min_cell_km`.
+    """
+    tile_width_km = EARTH_CIRCUMFERENCE_KM / (2 ** z)
+    return int(max(1, min(max_cells, math.ceil(tile_width_km / min_cell_km))))
+
+
+def create_tile_grid(z, x, y, size):
+    """
+    Creates a size x size grid of cell centres for a tile, rows ordered north to south.
+    Rows are spaced evenly in mercator space so they line up with the rendered tile.
+    """
+    n = 2 ** z
+    offsets = (np.arange(size) + 0.5) / size
+
+    lons = (x + offsets) / n * 360.0 - 180.0
+    merc_y = np.pi * (1 - 2 * (y + offsets) / n)
+    lats = np.degrees(np.arctan(np.sinh(merc_y)))
+
+    lon_mesh, lat_mesh = np.meshgrid(lons, lats)
+    return np.vstack([lat_mesh.ravel(), lon_mesh.ravel()]).T
+
+
+def get_reference_distances(dataset_version, renewable_df, demand_df, logistics_df):
+    """
+    Returns the national-grid max nearest-distance (km) for each layer.
+    """
+    if dataset_version not in _reference_distances:
+        grid_points_rad = np.radians(create_india_grid(step=0.5))
+        _reference_distances[dataset_version] = {
+            layer: float(calculate_min_distances(
+                grid_points_rad, np.radians(df[['latitude', 'longitude']].values)
+            ).max())
+            for layer, df in (('power', renewable_df), ('market', demand_df), ('logistics', logistics_df))
+        }
+    return _reference_distances[dataset_version]
+
+
+def calculate_tile_scores(z, x, y, weights, dataset_version, renewable_df, demand_df, logistics_df,
+                          max_cells=64, min_cell_km=1.0):
+    """
+    Computes weighted opportunity scores for every cell of one map tile.
+    """
+    size = cells_per_tile(z, max_cells=max_cells, min_cell_km=min_cell_km)
+    grid_points_rad = np.radians(create_tile_grid(z, x, y, size))
+    reference = get_reference_distances(dataset_version, renewable_df, demand_df, logistics_df)
+
+    sub_scores = {
+        'power': calculate_scores(grid_points_rad, np.radians(renewable_df[['latitude', 'longitude']].values),
+                                  max_dist=reference['power']),
+        'market': calculate_scores(grid_points_rad, np.radians(demand_df[['latitude', 'longitude']].values),
+                                   max_dist=reference['market']),
+        'logistics': calculate_scores(grid_points_rad, np.radians(logistics_df[['latitude', 'longitude']].values),
+                                      max_dist=reference['logistics']),
+    }
+
+    overall_scores = (
+        weights['power'] * sub_scores['power'] +
+        weights['market'] * sub_scores['market'] +
+        weights['logistics'] * sub_scores['logistics']
+    )
+
+    west, south, east, north = tile_bounds(z, x, y)
+    return {
+        "z": z,
+        "x": x,
+        "y": y,
+        "size": size,
+        "bounds": {"west": west, "south": south, "east": east, "north": north},
+        "weights": weights,
+        "overallScore": np.round(overall_scores, 2).reshape(size, size).tolist(),
+        "subScores": {
+            layer: np.round(scores, 2).reshape(size, size).tolist()
+            for layer, scores in sub_scores.items()
+        }
+    }
@@ -0,0 +1,257 @@
+# In app/services/zonal_service.py
+"""
+Per-state / per-district summaries of the national grid scores, computed from
+per-zone tables of sub-score statistics built once per dataset version.
+"""
+
+import json
+import threading
+
+import numpy as np
+
+from .optimization_service import calculate_nearest
+from .scenario_service import LAYERS, get_base_fields, _layer_scores
+
+LEVELS = ('state', 'district')
+
+# Sub-scores (0-10) are quantized to this many steps per point for the joint tables
+SCORE_RESOLUTION = 10
+SCORE_BINS = 10 * SCORE_RESOLUTION + 1
+
+QUANTILES = (0.25, 0.5, 0.75)
+
+# (dataset_version, step, level, boundaries_path) -> zone index; only the current dataset version is kept
+_zone_indexes = {}
+_zone_indexes_lock = threading.Lock()
+
+
+def _polygons(geometry):
+    """Rings of a GeoJSON Polygon / MultiPolygon as a list of polygons, each a list of (k, 2) lon/lat arrays."""
+    if geometry is None:
+        return []
+    if geometry['type'] == 'Polygon':
+        return [[np.asarray(ring, dtype=float)[:, :2] for ring in geometry['coordinates']]]
+    if geometry['type'] == 'MultiPolygon':
+        return [[np.asarray(ring, dtype=float)[:, :2] for ring in polygon] for polygon in geometry['coordinates']]
+    return []
+
+
+def points_in_polygon(lon, lat, rings, edge_chunk=2048):
+    """Even-odd test of points against a polygon given as rings (outer and holes)."""
+    inside = np.zeros(len(lon), dtype=bool)
+    edges = np.vstack([np.hstack([ring, np.roll(ring, -1, axis=0)]) for ring in rings])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for start in range(0, len(edges), edge_chunk):
+            x0, y0, x1, y1 = edges[start:start + edge_chunk].T
+            straddles = (y0 > lat[:, None]) != (y1 > lat[:, None])
+            crossing_lon = x0 + (x1 - x0) * (lat[:, None] - y0) / (y1 - y0)
+            crossings = straddles & (lon[:, None] < crossing_lon)
+            inside ^= (crossings.sum(axis=1) % 2).astype(bool)
+    return inside
+
+
+def rasterize_boundaries(grid_points, features, name_property):
+    """
+    Zone label per grid cell from GeoJSON features. Returns (cell_zone, names);
+    cells outside every feature get -1.
+    """
+    lat, lon = grid_points[:, 0], grid_points[:, 1]
+    cell_zone = np.full(len(grid_points), -1, dtype=np.int32)
+    names = []
+    codes = {}
+    for feature in features:
+        name = (feature.get('properties') or {}).get(name_property)
+        if not name:
+            continue
+        code = codes.setdefault(name, len(codes))
+        if code == len(names):
+            names.append(name)
+        for rings in _polygons(feature.get('geometry')):
+            outer = rings[0]
+            # Only cells in the polygon's bounding box need the full test
+            candidates = np.flatnonzero(
+                (cell_zone < 0)
+                & (lon >= outer[:, 0].min()) & (lon <= outer[:, 0].max())
+                & (lat >= outer[:, 1].min()) & (lat <= outer[:, 1].max())
+            )
+            if len(candidates):
+                inside = points_in_polygon(lon[candidates], lat[candidates], rings)
+                cell_zone[candidates[inside]] = code
+    return cell_zone, names
+
+
+def nearest_point_labels(grid_rad, points_rad, labels, max_km):
+    """
+    Zone label per grid cell from the nearest labelled point within `max_km`.
+    Returns (cell_zone, names); cells too far from every point get -1.
+    """
+    names, codes = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+    distances, nearest = calculate_nearest(grid_rad, points_rad)
+    cell_zone = np.where(distances <= max_km, codes[nearest], -1).astype(np.int32)
+    return cell_zone, [str(name) for name in names]
+
+
+def _labelled_points(renewable_df, logistics_df):
+    """Dataset points that carry a state name: renewable plants ('State') and ports ('state')."""
+    frames = []
+    for df, column in ((renewable_df, 'State'), (logistics_df, 'state')):
+        if column in df.columns:
+            labelled = df.dropna(subset=[column])
+            frames.append((labelled[['latitude', 'longitude']].values, labelled[column].astype(str).str.strip().values))
+    if not frames:
+        return np.zeros((0, 2)), np.array([], dtype=str)
+    return np.vstack([f[0] for f in frames]), np.concatenate([f[1] for f in frames])
+
+
+def _label_cells(base, level, boundaries, renewable_df, logistics_df, nearest_max_km):
+    path = (boundaries or {}).get(level)
+    if path:
+        with open(path) as f:
+            features = json.load(f).get('features', [])
+        name_property = boundaries.get(f'{level}_property', level)
+        cell_zone, names = rasterize_boundaries(base['grid'], features, name_property)
+        return cell_zone, names, 'boundaries'
+
+    if level != 'state':
+        raise ValueError(f"No boundary file is configured for '{level}' zones")
+    points, labels = _labelled_points(renewable_df, logistics_df)
+    if len(points) == 0:
+        raise ValueError("The dataset has no state-labelled points to derive zones from")
+    # Without a boundary file, state borders are only roughly (Voronoi-shaped) approximated
+    cell_zone, names = nearest_point_labels(base['grid_rad'], np.radians(points), labels, nearest_max_km)
+    return cell_zone, names, 'nearest-data-point'
+
+
+def get_zone_index(dataset_version, step, level, renewable_df, demand_df, logistics_df,
+                   boundaries=None, nearest_max_km=250.0):
+    """
+    Returns the cached per-zone tables for the national grid:
+    {'names', 'cell_zone', 'source', 'cells', 'sums' (zones x layers), 'histograms' {layer: zones x bins},
+     'triple_zone', 'triples' (quantized sub-scores), 'triple_counts', 'triple_cell', 'capacity_mw', 'grid'}.
+    """
+    boundaries_key = tuple(sorted((boundaries or {}).items()))
+    key = (dataset_version, step, level, boundaries_key)
+    with _zone_indexes_lock:
+        index = _zone_indexes.get(key)
+    if index is not None:
+        return index
+
+    base = get_base_fields(dataset_version, step, renewable_df, demand_df, logistics_df)
+    cell_zone, names, source = _label_cells(base, level, boundaries, renewable_df, logistics_df, nearest_max_km)
+    n_zones = len(names)
+    assigned = np.flatnonzero(cell_zone >= 0)
+    zone = cell_zone[assigned].astype(np.int64)
+
+    scores = np.column_stack([
+        _layer_scores(base[layer]['distances'], base[layer]['max_dist'])[assigned] for layer in LAYERS
+    ])
+    quantized = np.rint(scores * SCORE_RESOLUTION).astype(np.int64)
+
+    # Distinct (zone, power, market, logistics) combinations with a count and one cell each
+    packed = ((zone * SCORE_BINS + quantized[:, 0]) * SCORE_BINS + quantized[:, 1]) * SCORE_BINS + quantized[:, 2]
+    unique, first, counts = np.unique(packed, return_index=True, return_counts=True)
+
+    # Renewable capacity counted in the zone of the plant's grid cell
+    capacity = np.zeros(n_zones)
+    if 'capacity_mw' in renewable_df.columns and len(renewable_df):
+        _, plant_cell = calculate_nearest(np.radians(renewable_df[['latitude', 'longitude']].values), base['grid_rad'])
+        plant_zone = cell_zone[plant_cell]
+        in_zone = plant_zone >= 0
+        capacity = np.bincount(plant_zone[in_zone], weights=renewable_df['capacity_mw'].fillna(0).values[in_zone],
+                               minlength=n_zones)
+
+    index = {
+        'names': names,
+        'source': source,
+        'grid': base['grid'],
+        'cell_zone': cell_zone,
+        'cells': np.bincount(zone, minlength=n_zones),
+        'sums': np.stack([np.bincount(zone, weights=scores[:, i], minlength=n_zones) for i in range(len(LAYERS))], axis=1),
+        'histograms': {
+            layer: np.bincount(zone * SCORE_BINS + quantized[:, i], minlength=n_zones * SCORE_BINS).reshape(n_zones, SCORE_BINS)
+            for i, layer in enumerate(LAYERS)
+        },
+        'triple_zone': unique // SCORE_BINS ** 3,
+        'triples': np.column_stack([
+            unique // SCORE_BINS ** 2 % SCORE_BINS, unique // SCORE_BINS % SCORE_BINS, unique % SCORE_BINS
+        ]) / SCORE_RESOLUTION,
+        'triple_counts': counts,
+        'triple_cell': assigned[first],
+        'capacity_mw': capacity,
+    }
+
+    with _zone_indexes_lock:
+        for stale in [k for k in _zone_indexes if k[0] != dataset_version]:
+            del _zone_indexes[stale]
+        _zone_indexes[key] = index
+    return index
+
+
+def _histogram_quantiles(histogram, quantiles):
+    cumulative = np.cumsum(histogram)
+    return [float(np.searchsorted(cumulative, q * cumulative[-1]) / SCORE_RESOLUTION) for q in quantiles]
+
+
+def _weighted_quantiles(values, counts, quantiles):
+    order = np.argsort(values, kind='stable')
+    cumulative = np.cumsum(counts[order])
+    return [float(values[order[np.searchsorted(cumulative, q * cumulative[-1])]]) for q in quantiles]
+
+
+def _quantile_fields(values):
+    return {f"p{int(q * 100)}": round(v, 2) for q, v in zip(QUANTILES, values)}
+
+
+def calculate_zone_summaries(weights, level, dataset_version, renewable_df, demand_df, logistics_df,
+                             step=0.5, boundaries=None, nearest_max_km=250.0):
+    """
+    Per-zone summary of the weighted overall score and each sub-score, best zones first.
+    Quantiles and the best cell are computed on sub-scores quantized to 0.1.
+    """
+    if level not in LEVELS:
+        raise ValueError(f"'level' must be one of {', '.join(LEVELS)}")
+    index = get_zone_index(dataset_version, step, level, renewable_df, demand_df, logistics_df,
+                           boundaries=boundaries, nearest_max_km=nearest_max_km)
+    weight_vector = np.array([float(weights[layer]) for layer in LAYERS])
+
+    overall = index['triples'] @ weight_vector
+    bounds = np.searchsorted(index['triple_zone'], np.arange(len(index['names']) + 1))
+
+    zones = []
+    for z, name in enumerate(index['names']):
+        cells = int(index['cells'][z])
+        if cells == 0:
+            continue
+        lo, hi = bounds[z], bounds[z + 1]
+        values, counts = overall[lo:hi], index['triple_counts'][lo:hi]
+        best = lo + int(np.argmax(values))
+        best_cell = index['grid'][index['triple_cell'][best]]
+        means = index['sums'][z] / cells
+        zones.append({
+            'zone': name,
+            'cells': cells,
+            'capacityMw': round(float(index['capacity_mw'][z]), 2),
+            'overall': {
+                'best': round(float(overall[best]), 2),
+                'bestCell': {'latitude': float(best_cell[0]), 'longitude': float(best_cell[1])},
+                'mean': round(float(means @ weight_vector), 2),
+                **_quantile_fields(_weighted_quantiles(values, counts, QUANTILES))
+            },
+            'subScores': {
+                layer: {
+                    'mean': round(float(means[i]), 2),
+                    'max': round(float(np.flatnonzero(index['histograms'][layer][z]).max() / SCORE_RESOLUTION), 2),
+                    **_quantile_fields(_histogram_quantiles(index['histograms'][layer][z], QUANTILES))
+                }
+                for i, layer in enumerate(LAYERS)
+            }
+        })
+
+    zones.sort(key=lambda entry: -entry['overall']['best'])
+    return {
+        'level': level,
+        'source': index['source'],
+        'zones': zones,
+        'unassignedCells': int((index['cell_zone'] < 0).sum()),
+        'gridPoints': len(index['grid'])
+    }
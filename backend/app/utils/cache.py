@@ -0,0 +1,87 @@
+# In app/utils/cache.py
+
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TieredCache:
+    """
+    A small two-level cache: a bounded in-memory LRU in front of an optional
+    size-bounded diskcache store.
+
+    Keys are tuples of plain values (str/int/float). Entries can carry a TTL in
+    seconds; expired entries are dropped on read from both levels.
+    """
+
+    def __init__(self, max_items=256, directory=None, disk_size_limit=256 * 1024 * 1024, default_ttl=None):
+        self.max_items = max_items
+        self.default_ttl = default_ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+
+        if directory:
+            try:
+                import diskcache
+                self._disk = diskcache.Cache(
+                    directory,
+                    size_limit=disk_size_limit,
+                    eviction_policy='least-recently-used'
+                )
+            except ImportError:
+                # Fall back to memory-only caching if diskcache is not installed
+                self._disk = None
+
+    @staticmethod
+    def _disk_key(key):
+        return repr(key)
+
+    def get(self, key, default=None):
+        """Returns the cached value for `key`, or `default` if absent/expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    return value
+                del self._memory[key]
+
+        if self._disk is None:
+            return default
+
+        # With expire_time=True a miss is (default, None), not default
+        value, expires_at = self._disk.get(self._disk_key(key), default=_MISSING, expire_time=True)
+        if value is _MISSING:
+            return default
+        self._remember(key, value, expires_at)
+        return value
+
+    def set(self, key, value, ttl=None):
+        """Stores `value` under `key` in both levels."""
+        ttl = ttl if ttl is not None else self.default_ttl
+        expires_at = time.time() + ttl if ttl else None
+        self._remember(key, value, expires_at)
+        if self._disk is not None:
+            self._disk.set(self._disk_key(key), value, expire=ttl)
+
+    def _remember(self, key, value, expires_at):
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._memory)
@@ -1,23 +1,49 @@
 # In app/utils/data_loader.py
 
 import pandas as pd
+import hashlib
 import os
 
+from .timing import timed_function
+
 # _BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # DATA_DIR = os.path.join(_BASE_DIR, '..', 'data')
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_DIR = os.path.join(BASE_DIR, '..','data','app','data')
+# DATA_DIR can be overridden, e.g. to point the app at synthetic load-test data
+DATA_DIR = os.environ.get('DATA_DIR', os.path.join(BASE_DIR, '..','data','app','data'))
+
+DATA_FILES = [
+    'cleaned_solar_plants.csv',
+    'cleaned_wind_plants.csv',
+    'cleaned_demand_centers.csv',
+    'ports.csv',
+]
+
+def get_dataset_version():
+    """
+    Returns a short fingerprint of the data files (name, size and mtime).
+    Changes whenever any of the CSVs is replaced, so it can be used in cache keys.
+    """
+    digest = hashlib.sha1()
+    for name in DATA_FILES:
+        path = os.path.join(DATA_DIR, name)
+        try:
+            stat = os.stat(path)
+            digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        except FileNotFoundError:
+            digest.update(f"{name}:missing;".encode())
+    return digest.hexdigest()[:12]
 
+@timed_function('load_data')
 def load_all_data():
     """
     Loads, cleans, and combines all necessary CSV files into pandas DataFrames.
     """
     try:
         # Load the cleaned data files
-        solar_path = os.path.join(DATA_DIR, 'cleaned_solar_plants.csv')
-        wind_path = os.path.join(DATA_DIR, 'cleaned_wind_plants.csv')
-        demand_path = os.path.join(DATA_DIR, 'cleaned_demand_centers.csv')
-        ports_path = os.path.join(DATA_DIR, 'ports.csv')
+        solar_path, wind_path, demand_path, ports_path = [
+            os.path.join(DATA_DIR, name) for name in DATA_FILES
+        ]
 
         solar_df = pd.read_csv(solar_path)
         wind_df = pd.read_csv(wind_path)
@@ -0,0 +1,207 @@
+# In app/utils/profiling.py
+"""
+On-demand profiling of single requests.
+
+An endpoint decorated with `@profiled` runs as usual unless the request
+carries the configured PROFILING_TOKEN, either as an 'X-Profile-Token' header
+or a '?profile=<token>' query parameter. A request that carries it is handled
+under a sampling CPU profiler and tracemalloc. The profile is stored under an
+id that the response returns in an 'X-Profile-Id' header. The CPU profile
+is kept as folded stacks ("outer;inner;leaf count" lines), the input format of
+flamegraph.pl and speedscope. The top allocation sites are kept as JSON.
+
+With no token configured, or none sent, the only cost is a config lookup.
+tracemalloc traces the whole process, so only one request is profiled at a
+time; others sent meanwhile are served unprofiled ('X-Profile-Status: busy').
+"""
+
+import functools
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+
+from flask import current_app, request
+
+TOKEN_HEADER = 'X-Profile-Token'
+TOKEN_QUERY_PARAM = 'profile'
+
+TRACEMALLOC_FRAMES = 16
+TOP_ALLOCATIONS = 50
+
+_profile_lock = threading.Lock()
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack from a background thread, counting identical stacks."""
+
+    def __init__(self, thread_id, interval=0.005, root=None):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.root = root
+        self.samples = 0
+        self._stacks = Counter()
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            self._stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            if self.root and filename.startswith(self.root):
+                filename = os.path.relpath(filename, self.root)
+            name = getattr(code, 'co_qualname', code.co_name)
+            # ';' separates frames in the folded format
+            label = self._labels[code] = f"{name} ({filename}:{code.co_firstlineno})".replace(';', ':')
+        return label
+
+    def folded(self):
+        """Folded stacks, root frame first, most sampled first."""
+        return "\n".join(
+            f"{';'.join(self._label(code) for code in stack)} {count}"
+            for stack, count in self._stacks.most_common()
+        ) + "\n"
+
+
+def top_allocations(snapshot, limit=TOP_ALLOCATIONS):
+    """Allocation sites still holding memory, by size: [{'file', 'line', 'sizeBytes', 'count'}]."""
+    # Leave out the profiler's own bookkeeping
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)
+    ])
+    return [
+        {
+            'file': stat.traceback[0].filename,
+            'line': stat.traceback[0].lineno,
+            'sizeBytes': stat.size,
+            'count': stat.count
+        }
+        for stat in snapshot.statistics('lineno')[:limit]
+    ]
+
+
+def _requested_token():
+    return request.headers.get(TOKEN_HEADER) or request.args.get(TOKEN_QUERY_PARAM)
+
+
+def is_authorized(token):
+    """Whether `token` matches the configured PROFILING_TOKEN (never when none is configured)."""
+    expected = current_app.config.get('PROFILING_TOKEN')
+    return bool(expected and token) and hmac.compare_digest(token.encode(), expected.encode())
+
+
+def _store(profile_dir, profile_id, folded, report, max_stored):
+    os.makedirs(profile_dir, exist_ok=True)
+    with open(os.path.join(profile_dir, f"{profile_id}.folded"), 'w') as f:
+        f.write(folded)
+    with open(os.path.join(profile_dir, f"{profile_id}.json"), 'w') as f:
+        json.dump(report, f)
+
+    # Keep only the newest profiles
+    reports = sorted(
+        (entry for entry in os.scandir(profile_dir) if entry.name.endswith('.json')),
+        key=lambda entry: entry.stat().st_mtime
+    )
+    for entry in reports[:max(0, len(reports) - max_stored)]:
+        stale_id = entry.name[:-len('.json')]
+        for suffix in ('.json', '.folded'):
+            try:
+                os.remove(os.path.join(profile_dir, stale_id + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def profile_path(profile_id, kind):
+    """Path of a stored profile: kind 'folded' (CPU stacks) or 'json' (report); None if unknown."""
+    try:
+        uuid.UUID(hex=profile_id)
+    except ValueError:
+        return None
+    path = os.path.join(current_app.config['PROFILING_DIR'], f"{profile_id}.{kind}")
+    return path if os.path.exists(path) else None
+
+
+def _run_profiled(fn, args, kwargs):
+    config = current_app.config
+    profiler = SamplingProfiler(threading.get_ident(), config['PROFILING_INTERVAL'],
+                                root=os.path.dirname(current_app.root_path))
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    tracemalloc.reset_peak()
+
+    start = time.perf_counter()
+    profiler.start()
+    try:
+        response = current_app.make_response(fn(*args, **kwargs))
+    finally:
+        profiler.stop()
+        duration = time.perf_counter() - start
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+
+    profile_id = uuid.uuid4().hex
+    report = {
+        'id': profile_id,
+        'endpoint': request.url_rule.rule if request.url_rule else request.path,
+        'status': response.status_code,
+        'createdAt': time.time(),
+        'durationSeconds': duration,
+        'samples': profiler.samples,
+        'intervalSeconds': profiler.interval,
+        'peakTracedBytes': peak,
+        'allocations': top_allocations(snapshot)
+    }
+    _store(config['PROFILING_DIR'], profile_id, profiler.folded(), report, config['PROFILING_MAX_STORED'])
+
+    response.headers['X-Profile-Id'] = profile_id
+    response.headers['X-Profile-Status'] = 'stored'
+    return response
+
+
+def profiled(fn):
+    """Profiles the endpoint when the request carries the profiling token; see the module docstring."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _requested_token()
+        if not token or not current_app.config.get('PROFILING_TOKEN'):
+            return fn(*args, **kwargs)
+        if not is_authorized(token):
+            return current_app.make_response(({"error": "Invalid profiling token"}, 403))
+        if not _profile_lock.acquire(blocking=False):
+            response = current_app.make_response(fn(*args, **kwargs))
+            response.headers['X-Profile-Status'] = 'busy'
+            return response
+        try:
+            return _run_profiled(fn, args, kwargs)
+        finally:
+            _profile_lock.release()
+    return wrapper
@@ -0,0 +1,137 @@
+# In app/utils/timing.py
+"""
+Lightweight hot-path timing.
+
+Wrap a stage in `with timed('distances'):` (or decorate a function with
+`@timed_function('load_data')`). Every stage duration is added to an in-process
+histogram exposed at /metrics in Prometheus text format, and stages timed while
+handling a request are also collected for that request's Server-Timing header.
+"""
+
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds in seconds, from sub-millisecond numpy work up to LLM calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_request_stages = contextvars.ContextVar('request_stages', default=None)
+
+
+class Histogram:
+    """A labelled, cumulative-bucket histogram (the Prometheus data model)."""
+
+    def __init__(self, name, help_text, label_names, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = {
+                    'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0
+                }
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][i] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        """Returns the histogram in Prometheus text exposition format."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, series in sorted(self._series.items()):
+                labels = ",".join(
+                    f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, label_values)
+                )
+                prefix = f"{labels}," if labels else ""
+                for bound, count in zip(self.buckets, series['counts']):
+                    lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {count}')
+                lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series["count"]}')
+                lines.append(f"{self.name}_sum{{{labels}}} {series['sum']}")
+                lines.append(f"{self.name}_count{{{labels}}} {series['count']}")
+        return "\n".join(lines)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+STAGE_DURATION = Histogram(
+    'app_stage_duration_seconds', 'Time spent in each instrumented stage.', ['stage']
+)
+REQUEST_DURATION = Histogram(
+    'app_request_duration_seconds', 'Total request handling time.', ['endpoint', 'status']
+)
+
+
+def record_stage(stage, seconds):
+    """Records one stage duration in the histogram and the current request, if any."""
+    STAGE_DURATION.observe(seconds, stage)
+    stages = _request_stages.get()
+    if stages is not None:
+        stages.append((stage, seconds))
+
+
+@contextmanager
+def timed(stage):
+    """Times the enclosed block as `stage`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def timed_function(stage):
+    """Decorator form of `timed`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_request_timing():
+    """Starts collecting stage timings for the current request. Returns a reset token."""
+    return _request_stages.set([])
+
+
+def finish_request_timing(token):
+    """Stops collecting and returns the request's stages as [(stage, seconds)]."""
+    stages = _request_stages.get() or []
+    try:
+        _request_stages.reset(token)
+    except ValueError:
+        # Token from another context (e.g. a streamed response); just clear it
+        _request_stages.set(None)
+    return stages
+
+
+def server_timing_header(stages, total_seconds=None):
+    """
+    Formats stages as a Server-Timing header value. Repeated stages (e.g. one
+    'distances' per layer) are summed into one entry.
+    """
+    totals = {}
+    for stage, seconds in stages:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    entries = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in totals.items()]
+    if total_seconds is not None:
+        entries.append(f"total;dur={total_seconds * 1000:.2f}")
+    return ", ".join(entries)
+
+
+def render_metrics():
+    """All metrics in Prometheus text exposition format."""
+    return "\n".join([STAGE_DURATION.render(), REQUEST_DURATION.render()]) + "\n"
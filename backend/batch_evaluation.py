@@ -0,0 +1,146 @@
+"""
+Batch what-if evaluation of new demand against a frozen copy of the network.
+
+SupplyChainOptimizer.snapshot() copies what evaluate_new_demand reads (the
+suppliers' positions, cost indices and spare capacity) into read-only arrays.
+Each scenario is evaluated against that snapshot on its own, so no scenario
+sees another's allocations and the optimizer itself is never touched. Large
+batches are split into chunks and spread over a process pool; the snapshot is
+shipped to each worker once, through the pool initializer.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from distance_matrix import haversine_km
+
+# Below this many scenarios the pool start-up costs more than it saves
+PARALLEL_MIN_SCENARIOS = 2_000
+
+# Bound on suppliers x scenarios cells evaluated at once, per process
+CHUNK_CELLS = 1_000_000
+
+
+@dataclass(frozen=True)
+class NetworkSnapshot:
+    """Immutable view of the suppliers with spare capacity."""
+    supplier_ids: Tuple[str, ...]
+    lat_rad: np.ndarray
+    lon_rad: np.ndarray
+    cost_index: np.ndarray
+    available: np.ndarray
+    cost_per_km: float
+
+    def __post_init__(self):
+        for array in (self.lat_rad, self.lon_rad, self.cost_index, self.available):
+            array.flags.writeable = False
+
+    def __len__(self):
+        return len(self.supplier_ids)
+
+
+def scenario_arrays(demands: Sequence) -> Dict:
+    """DemandPoints as plain arrays: {'ids', 'lat_rad', 'lon_rad', 'cost_index', 'volume'}."""
+    return {
+        'ids': [d.id for d in demands],
+        'lat_rad': np.radians(np.array([d.location.lat for d in demands], dtype=float)),
+        'lon_rad': np.radians(np.array([d.location.lon for d in demands], dtype=float)),
+        'cost_index': np.array([d.location.cost_index for d in demands], dtype=float),
+        'volume': np.array([d.demand_volume for d in demands], dtype=float),
+    }
+
+
+def evaluate_scenarios(snapshot: NetworkSnapshot, scenarios: Dict) -> List[Dict]:
+    """
+    Same allocation as evaluate_new_demand, for every scenario independently:
+    cheapest suppliers first, each up to its spare capacity.
+    """
+    n = len(scenarios['ids'])
+    if n == 0:
+        return []
+    if len(snapshot) == 0:
+        return [_result(scenarios['ids'][i], [], 0.0, float(scenarios['volume'][i])) for i in range(n)]
+
+    # (suppliers, scenarios) per-unit costs, as in transportation_cost_matrix
+    distances = haversine_km(snapshot.lat_rad[:, None], snapshot.lon_rad[:, None],
+                             scenarios['lat_rad'][None, :], scenarios['lon_rad'][None, :])
+    unit_costs = distances * snapshot.cost_per_km * (snapshot.cost_index[:, None] + scenarios['cost_index'][None, :]) / 2
+
+    order = np.argsort(unit_costs, axis=0, kind='stable')
+    sorted_costs = np.take_along_axis(unit_costs, order, axis=0)
+    sorted_available = snapshot.available[order]
+    filled_before = np.cumsum(sorted_available, axis=0) - sorted_available
+    allocation = np.clip(scenarios['volume'][None, :] - filled_before, 0.0, sorted_available)
+    costs = allocation * sorted_costs
+    total_costs = costs.sum(axis=0)
+    # From the total rather than allocation.sum(), whose rounding can leave a 1e-14 shortfall
+    unmet = np.maximum(scenarios['volume'] - snapshot.available.sum(), 0.0)
+
+    results = []
+    for i in range(n):
+        used = np.flatnonzero(allocation[:, i] > 0)
+        plan = [{
+            'from_facility': snapshot.supplier_ids[order[r, i]],
+            'to_demand': scenarios['ids'][i],
+            'volume': float(allocation[r, i]),
+            'cost': float(costs[r, i])
+        } for r in used]
+        results.append(_result(scenarios['ids'][i], plan, float(total_costs[i]), float(unmet[i])))
+    return results
+
+
+def _result(demand_id, plan, total_cost, unmet):
+    return {
+        'demand_id': demand_id,
+        'can_fulfill': unmet <= 0,
+        'fulfillment_plan': plan,
+        'total_cost': total_cost,
+        'unfulfilled_volume': unmet
+    }
+
+
+def _chunks(scenarios: Dict, size: int):
+    for start in range(0, len(scenarios['ids']), size):
+        yield {key: values[start:start + size] for key, values in scenarios.items()}
+
+
+# Set in each pool worker by _init_worker
+_worker_snapshot: Optional[NetworkSnapshot] = None
+
+
+def _init_worker(snapshot):
+    global _worker_snapshot
+    _worker_snapshot = snapshot
+
+
+def _evaluate_chunk(scenarios):
+    return evaluate_scenarios(_worker_snapshot, scenarios)
+
+
+def evaluate_batch(snapshot: NetworkSnapshot, demands: Sequence, workers: Optional[int] = None) -> List[Dict]:
+    """
+    Evaluates every demand against the snapshot, in input order.
+    workers: process count (default: all cores); 1 evaluates in-process.
+    """
+    scenarios = scenario_arrays(demands)
+    n = len(demands)
+    workers = workers or os.cpu_count() or 1
+    chunk_size = max(1, CHUNK_CELLS // max(len(snapshot), 1))
+
+    if workers == 1 or n < PARALLEL_MIN_SCENARIOS:
+        results = []
+        for chunk in _chunks(scenarios, chunk_size):
+            results.extend(evaluate_scenarios(snapshot, chunk))
+        return results
+
+    # At least a few chunks per worker so a slow chunk does not leave cores idle
+    chunk_size = max(1, min(chunk_size, -(-n // (4 * workers))))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(snapshot,)) as pool:
+        results = []
+        for chunk_results in pool.map(_evaluate_chunk, _chunks(scenarios, chunk_size)):
+            results.extend(chunk_results)
+    return results
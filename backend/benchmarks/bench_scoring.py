@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# In benchmarks/bench_scoring.py
+"""
+Micro-benchmarks for the scoring engine and the supply-chain optimizer.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_scoring              # full suite
+    python -m benchmarks.bench_scoring --quick      # smaller sizes only
+    python -m benchmarks.bench_scoring --filter radius
+
+Each case records its median/min wall time and peak traced memory, and the run
+is appended to benchmarks/history.json (untracked) together with the current git commit,
+so runs can be compared across commits. The previous run is printed alongside
+for a quick regression check.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.services.optimization_service import (
+    create_india_grid, calculate_scores, calculate_opportunity_scores,
+    create_radius_grid, calculate_radius_optimization, analyze_power_supply_for_coordinate
+)
+from benchmarks.synthetic import make_dataset, make_renewable_df
+from supply_chain_optimizer import SupplyChainOptimizer, Location, Facility, DemandPoint, FacilityType
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORY_PATH = os.path.join(BACKEND_DIR, 'benchmarks', 'history.json')
+
+WEIGHTS = {'power': 0.4, 'market': 0.3, 'logistics': 0.3}
+CENTER = (21.0, 78.0)  # Central India
+
+GRID_STEPS = [1.0, 0.5, 0.25]
+PLANT_COUNTS = [10, 100, 1_000, 10_000, 100_000]
+RADII_KM = [50, 200, 500]
+NETWORK_SIZES = [10, 50, 200]
+
+QUICK_GRID_STEPS = [0.5]
+QUICK_PLANT_COUNTS = [10, 1_000]
+QUICK_RADII_KM = [50, 200]
+QUICK_NETWORK_SIZES = [10, 50]
+
+# Skip cases whose grid x plants distance matrix would not fit comfortably in RAM
+MAX_MATRIX_CELLS = 60_000_000
+
+
+def build_cases(quick=False):
+    """Returns a list of (name, params, setup) where setup() returns the callable to time."""
+    grid_steps = QUICK_GRID_STEPS if quick else GRID_STEPS
+    plant_counts = QUICK_PLANT_COUNTS if quick else PLANT_COUNTS
+    radii = QUICK_RADII_KM if quick else RADII_KM
+    network_sizes = QUICK_NETWORK_SIZES if quick else NETWORK_SIZES
+
+    cases = []
+    for step in grid_steps:
+        cases.append(('create_india_grid', {'step': step}, lambda step=step: (lambda: create_india_grid(step=step))))
+
+    for step in grid_steps:
+        n_grid = len(create_india_grid(step=step))
+        for n_plants in plant_counts:
+            if n_grid * n_plants > MAX_MATRIX_CELLS:
+                continue
+
+            def setup(step=step, n_plants=n_plants):
+                grid_rad = np.radians(create_india_grid(step=step))
+                plants_rad = np.radians(make_renewable_df(n_plants)[['latitude', 'longitude']].values)
+                return lambda: calculate_scores(grid_rad, plants_rad)
+            cases.append(('calculate_scores', {'step': step, 'plants': n_plants}, setup))
+
+    n_national = len(create_india_grid(step=0.5))
+    for n_plants in plant_counts:
+        if n_national * n_plants > MAX_MATRIX_CELLS:
+            continue
+
+        def setup(n_plants=n_plants):
+            renewable_df, demand_df, logistics_df = make_dataset(n_plants)
+            return lambda: calculate_opportunity_scores(WEIGHTS, renewable_df, demand_df, logistics_df, num_results=10)
+        cases.append(('calculate_opportunity_scores', {'plants': n_plants}, setup))
+
+    for radius in radii:
+        cases.append(('create_radius_grid', {'radius_km': radius, 'step_km': 5},
+                      lambda radius=radius: (lambda: create_radius_grid(*CENTER, radius, step_km=5))))
+
+        n_radius = math.pi * (radius / 5) ** 2  # Approximate disc size at 5 km steps
+        for n_plants in plant_counts:
+            if n_radius * n_plants > MAX_MATRIX_CELLS:
+                continue
+
+            def setup(radius=radius, n_plants=n_plants):
+                renewable_df, demand_df, logistics_df = make_dataset(n_plants)
+                return lambda: calculate_radius_optimization(
+                    *CENTER, radius, WEIGHTS, renewable_df, demand_df, logistics_df, num_results=3
+                )
+            cases.append(('calculate_radius_optimization', {'radius_km': radius, 'plants': n_plants}, setup))
+
+    for n_plants in plant_counts:
+        def setup(n_plants=n_plants):
+            renewable_df = make_renewable_df(n_plants)
+            return lambda: analyze_power_supply_for_coordinate(*CENTER, 500, renewable_df)
+        cases.append(('analyze_power_supply_for_coordinate', {'plants': n_plants}, setup))
+
+    for n in network_sizes:
+        def setup(n=n):
+            optimizer = make_network(n, n)
+
+            def solve():
+                # Without this every run after the warm-up is a no-op warm re-solve
+                optimizer.route_solver.reset()
+                return optimizer.optimize_supply_routes()
+            return solve
+        cases.append(('optimize_supply_routes', {'facilities': n, 'demands': n}, setup))
+
+    return cases
+
+
+def make_network(n_facilities, n_demands, seed=0):
+    """A synthetic SupplyChainOptimizer with enough capacity to meet all demand."""
+    rng = np.random.default_rng(seed)
+    optimizer = SupplyChainOptimizer()
+    n_locations = n_facilities + n_demands
+    lats = rng.uniform(8.0, 37.0, size=n_locations)
+    lons = rng.uniform(68.0, 98.0, size=n_locations)
+    cost_indices = rng.uniform(0.7, 1.3, size=n_locations)
+
+    for i in range(n_locations):
+        optimizer.add_location(Location(f"loc{i}", f"Location {i}", float(lats[i]), float(lons[i]), float(cost_indices[i])))
+
+    demand_volumes = rng.uniform(50, 500, size=n_demands)
+    capacity_each = 1.5 * demand_volumes.sum() / n_facilities
+    for i in range(n_facilities):
+        fac_type = FacilityType.PRODUCTION if i % 2 == 0 else FacilityType.STORAGE
+        optimizer.add_facility(Facility(f"fac{i}", optimizer.locations[f"loc{i}"], fac_type, capacity=float(capacity_each)))
+    for j in range(n_demands):
+        optimizer.add_demand_point(DemandPoint(
+            f"dem{j}", optimizer.locations[f"loc{n_facilities + j}"], demand_volume=float(demand_volumes[j])
+        ))
+    return optimizer
+
+
+def measure(fn, repeat):
+    """Returns (timings in seconds, peak traced memory in bytes)."""
+    fn()  # Warm-up run (imports, caches)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return timings, peak
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def case_id(name, params):
+    return name + "(" + ", ".join(f"{k}={v}" for k, v in sorted(params.items())) + ")"
+
+
+def run(quick=False, repeat=5, name_filter=None, history_path=HISTORY_PATH, save=True):
+    history = load_history(history_path)
+    previous = {r['id']: r for r in history[-1]['results']} if history else {}
+
+    results = []
+    print(f"{'case':<70} {'median ms':>10} {'min ms':>10} {'peak MB':>9} {'vs prev':>8}")
+    for name, params, setup in build_cases(quick):
+        cid = case_id(name, params)
+        if name_filter and name_filter not in cid:
+            continue
+
+        timings, peak = measure(setup(), repeat)
+        result = {
+            'id': cid,
+            'name': name,
+            'params': params,
+            'median_s': statistics.median(timings),
+            'min_s': min(timings),
+            'peak_mb': peak / 1e6,
+            'repeat': repeat
+        }
+        results.append(result)
+
+        change = ""
+        if cid in previous:
+            change = f"{result['median_s'] / previous[cid]['median_s']:.2f}x"
+        print(f"{cid:<70} {result['median_s'] * 1000:>10.2f} {result['min_s'] * 1000:>10.2f} "
+              f"{result['peak_mb']:>9.1f} {change:>8}")
+
+    if save:
+        history.append({
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'quick': quick,
+            'results': results
+        })
+        with open(history_path, 'w') as f:
+            json.dump(history, f, indent=2)
+        print(f"\nAppended {len(results)} results to {history_path}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Scoring engine micro-benchmarks")
+    parser.add_argument('--quick', action='store_true', help="Run a reduced set of sizes")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per case")
+    parser.add_argument('--filter', default=None, help="Only run cases whose id contains this text")
+    parser.add_argument('--history', default=HISTORY_PATH, help="JSON history file to append to")
+    parser.add_argument('--no-save', action='store_true', help="Do not write the history file")
+    args = parser.parse_args()
+    run(quick=args.quick, repeat=args.repeat, name_filter=args.filter,
+        history_path=args.history, save=not args.no_save)
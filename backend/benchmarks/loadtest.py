@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# In benchmarks/loadtest.py
+"""
+End-to-end load test for the Flask API, fully offline.
+
+Generates a synthetic dataset, boots the app in-process against it with the
+stub LLM (REASONING_LLM=stub), then replays a weighted mix of /api/* calls at
+a target concurrency and reports throughput and p50/p95/p99 latency per endpoint.
+
+Run from the backend directory:
+
+    python -m benchmarks.loadtest --plants 5000 --concurrency 16 --duration 60
+    python -m benchmarks.loadtest --llm-latency 2.0 --mix optimize-grid=5,analyze-reasoning=1
+    python -m benchmarks.loadtest --url http://127.0.0.1:5000   # against a running server
+
+Reasoning endpoints are reported twice: the submit call, and ':complete' for the
+time until the background job finished (measured by polling /api/jobs/<id>).
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+import numpy as np
+
+from benchmarks.synthetic import write_dataset_csvs, LAT_RANGE, LON_RANGE
+
+DEFAULT_MIX = {
+    'optimize-grid': 30,
+    'optimize-point': 25,
+    'optimize-radius': 15,
+    'initial-map-data': 10,
+    'tiles': 10,
+    'analyze-reasoning': 7,
+    'analyze-power-supply': 3,
+}
+
+
+def _random_weights(rng):
+    raw = [rng.random() + 0.05 for _ in range(3)]
+    total = sum(raw)
+    return {'power': raw[0] / total, 'market': raw[1] / total, 'logistics': raw[2] / total}
+
+
+def _random_coordinate(rng):
+    return {'latitude': rng.uniform(*LAT_RANGE), 'longitude': rng.uniform(*LON_RANGE)}
+
+
+def _random_scores(rng):
+    sub = {k: round(rng.uniform(0, 10), 2) for k in ('power', 'market', 'logistics')}
+    return {'overallScore': round(sum(sub.values()) / 3, 2), 'subScores': sub}
+
+
+def build_request(endpoint, rng):
+    """Returns (method, path, json body or None) for one request of the given kind."""
+    if endpoint == 'optimize-grid':
+        return 'POST', '/api/optimize-grid', {'weights': _random_weights(rng), 'numResults': 10}
+    if endpoint == 'optimize-point':
+        return 'POST', '/api/optimize-point', {'weights': _random_weights(rng), 'coordinate': _random_coordinate(rng)}
+    if endpoint == 'optimize-radius':
+        return 'POST', '/api/optimize-radius', {
+            'weights': _random_weights(rng), 'centerPoint': _random_coordinate(rng),
+            'radius': rng.choice([25, 50, 100, 200]), 'numResults': 3
+        }
+    if endpoint == 'initial-map-data':
+        return 'GET', '/api/initial-map-data', None
+    if endpoint == 'tiles':
+        z = rng.randint(4, 8)
+        # Tiles covering India at zoom z
+        x = rng.randint(int((68 + 180) / 360 * 2 ** z), int((98 + 180) / 360 * 2 ** z))
+        y = rng.randint(int(0.38 * 2 ** z), int(0.48 * 2 ** z))
+        w = _random_weights(rng)
+        return 'GET', f"/api/tiles/{z}/{x}/{y}?power={w['power']:.2f}&market={w['market']:.2f}&logistics={w['logistics']:.2f}", None
+    if endpoint == 'analyze-reasoning':
+        return 'POST', '/api/analyze-reasoning', {'weights': _random_weights(rng), 'scores': _random_scores(rng)}
+    if endpoint == 'analyze-power-supply':
+        return 'POST', '/api/analyze-power-supply', {
+            'coordinate': _random_coordinate(rng), 'requiredCapacity': rng.choice([50, 100, 250, 500, 1000])
+        }
+    raise ValueError(f"Unknown endpoint '{endpoint}'")
+
+
+def send(base_url, method, path, body=None, timeout=120):
+    """Sends one request and returns (status, parsed JSON or None)."""
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(base_url + path, data=data, method=method,
+                                 headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            payload = resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        payload = e.read()
+        status = e.code
+    try:
+        return status, json.loads(payload) if payload else None
+    except ValueError:
+        return status, None
+
+
+def wait_for_job(base_url, job, poll_interval=0.1, timeout=300):
+    """Polls a background job until it finishes. Returns its final status."""
+    deadline = time.perf_counter() + timeout
+    while job.get('status') in ('queued', 'running'):
+        if time.perf_counter() > deadline:
+            return 'timeout'
+        time.sleep(poll_interval)
+        _, job = send(base_url, 'GET', f"/api/jobs/{job['jobId']}")
+        job = job or {}
+    return job.get('status')
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, ok):
+        with self._lock:
+            self.latencies[name].append(seconds)
+            if not ok:
+                self.errors[name] += 1
+
+
+def worker(base_url, mix, deadline, max_requests, counter, recorder, seed):
+    rng = random.Random(seed)
+    endpoints, weights = zip(*mix.items())
+    while time.perf_counter() < deadline:
+        with counter['lock']:
+            if max_requests and counter['sent'] >= max_requests:
+                return
+            counter['sent'] += 1
+
+        endpoint = rng.choices(endpoints, weights)[0]
+        method, path, body = build_request(endpoint, rng)
+        start = time.perf_counter()
+        try:
+            status, payload = send(base_url, method, path, body)
+        except OSError:
+            recorder.record(endpoint, time.perf_counter() - start, ok=False)
+            continue
+        recorder.record(endpoint, time.perf_counter() - start, ok=status < 400)
+
+        if status == 202 and payload and 'jobId' in payload:
+            final = wait_for_job(base_url, payload)
+            recorder.record(f"{endpoint}:complete", time.perf_counter() - start, ok=final == 'succeeded')
+
+
+def start_local_server(plants, demand, ports, llm_latency, chunk_delay, port=0):
+    """
+    Writes a synthetic dataset, configures the environment and serves the app
+    on a background thread. Returns the base URL.
+    """
+    workdir = tempfile.mkdtemp(prefix='loadtest_')
+    write_dataset_csvs(os.path.join(workdir, 'data'), plants, demand, ports)
+
+    # Must be set before the app modules are imported
+    os.environ['DATA_DIR'] = os.path.join(workdir, 'data')
+    os.environ['REASONING_LLM'] = 'stub'
+    os.environ['STUB_LLM_FIRST_TOKEN_DELAY'] = str(llm_latency)
+    os.environ['STUB_LLM_CHUNK_DELAY'] = str(chunk_delay)
+    os.environ['REASONING_CACHE_DIR'] = os.path.join(workdir, 'reasoning_cache')
+    os.environ['TILE_CACHE_DIR'] = os.path.join(workdir, 'tile_cache')
+
+    from werkzeug.serving import make_server
+    from app import create_app
+    from config import Config
+
+    server = make_server('127.0.0.1', port, create_app(Config), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def summarize(recorder, elapsed):
+    """Per-endpoint count, errors, throughput and latency percentiles (ms)."""
+    report = {}
+    for name, latencies in sorted(recorder.latencies.items()):
+        values = np.array(latencies) * 1000
+        report[name] = {
+            'requests': len(values),
+            'errors': recorder.errors.get(name, 0),
+            'throughput_rps': len(values) / elapsed,
+            'p50_ms': float(np.percentile(values, 50)),
+            'p95_ms': float(np.percentile(values, 95)),
+            'p99_ms': float(np.percentile(values, 99)),
+            'max_ms': float(values.max()),
+        }
+    return report
+
+
+def print_report(report, elapsed, concurrency):
+    total = sum(r['requests'] for name, r in report.items() if not name.endswith(':complete'))
+    print(f"\n{total} requests in {elapsed:.1f}s at concurrency {concurrency} ({total / elapsed:.1f} req/s)\n")
+    print(f"{'endpoint':<32} {'reqs':>7} {'errs':>6} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, r in report.items():
+        print(f"{name:<32} {r['requests']:>7} {r['errors']:>6} {r['throughput_rps']:>8.2f} "
+              f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['max_ms']:>9.1f}")
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}'. Choose from {', '.join(DEFAULT_MIX)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the hydrogen siting API")
+    parser.add_argument('--url', default=None, help="Target an already running server instead of booting one")
+    parser.add_argument('--plants', type=int, default=1000, help="Synthetic renewable plants (solar + wind)")
+    parser.add_argument('--demand', type=int, default=None, help="Synthetic demand centers")
+    parser.add_argument('--ports', type=int, default=None, help="Synthetic ports")
+    parser.add_argument('--llm-latency', type=float, default=1.0, help="Stub LLM delay before the first token (s)")
+    parser.add_argument('--llm-chunk-delay', type=float, default=0.02, help="Stub LLM delay between chunks (s)")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30.0, help="Seconds to run")
+    parser.add_argument('--requests', type=int, default=0, help="Stop after this many requests (0 = no limit)")
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help="Weighted endpoint mix, e.g. optimize-grid=3,tiles=1")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', default=None, help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    base_url = args.url or start_local_server(
+        args.plants, args.demand, args.ports, args.llm_latency, args.llm_chunk_delay
+    )
+    print(f"Target: {base_url}  mix: {args.mix}")
+
+    recorder = Recorder()
+    counter = {'sent': 0, 'lock': threading.Lock()}
+    start = time.perf_counter()
+    deadline = start + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(base_url, args.mix, deadline, args.requests, counter, recorder, args.seed + i))
+        for i in range(args.concurrency)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    report = summarize(recorder, elapsed)
+    print_report(report, elapsed, args.concurrency)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'elapsed_s': elapsed, 'concurrency': args.concurrency, 'mix': args.mix, 'endpoints': report}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
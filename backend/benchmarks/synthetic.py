@@ -0,0 +1,124 @@
+# In benchmarks/synthetic.py
+"""
+Synthetic datasets shaped like the output of app.utils.data_loader.load_all_data,
+for benchmarking and load testing at sizes the real CSVs do not reach.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# Same bounding box as create_india_grid
+LAT_RANGE = (8.0, 37.0)
+LON_RANGE = (68.0, 98.0)
+
+STATES = [
+    'Andhra Pradesh', 'Gujarat', 'Karnataka', 'Madhya Pradesh', 'Maharashtra',
+    'Rajasthan', 'Tamil Nadu', 'Telangana', 'Uttar Pradesh', 'West Bengal'
+]
+
+
+def _random_points(rng, n):
+    return (
+        rng.uniform(*LAT_RANGE, size=n),
+        rng.uniform(*LON_RANGE, size=n)
+    )
+
+
+def make_renewable_df(n, seed=0):
+    """Synthetic renewable plants: State, type, capacity_mw, latitude, longitude."""
+    rng = np.random.default_rng(seed)
+    lats, lons = _random_points(rng, n)
+    return pd.DataFrame({
+        'State': rng.choice(STATES, size=n),
+        'type': rng.choice(['solar', 'wind'], size=n),
+        'capacity_mw': rng.uniform(10, 2000, size=n).round(1),
+        'latitude': lats,
+        'longitude': lons
+    })
+
+
+def make_demand_df(n, seed=1):
+    """Synthetic demand centers (SEZs) with the loader's column names."""
+    rng = np.random.default_rng(seed)
+    lats, lons = _random_points(rng, n)
+    return pd.DataFrame({
+        'Name of the Zone': [f"Synthetic SEZ {i}" for i in range(n)],
+        'latitude': lats,
+        'longitude': lons
+    })
+
+
+def make_logistics_df(n, seed=2):
+    """Synthetic ports with the loader's column names."""
+    rng = np.random.default_rng(seed)
+    lats, lons = _random_points(rng, n)
+    return pd.DataFrame({
+        'port_name': [f"Synthetic Port {i}" for i in range(n)],
+        'state': rng.choice(STATES, size=n),
+        'latitude': lats,
+        'longitude': lons
+    })
+
+
+def make_dataset(n_plants, n_demand=None, n_ports=None, seed=0):
+    """
+    Returns (renewable_df, demand_df, logistics_df). Demand centers and ports
+    default to a fixed fraction of the plant count, like the real data.
+    """
+    n_demand = n_demand if n_demand is not None else max(5, n_plants // 4)
+    n_ports = n_ports if n_ports is not None else max(3, n_plants // 10)
+    return (
+        make_renewable_df(n_plants, seed=seed),
+        make_demand_df(n_demand, seed=seed + 1),
+        make_logistics_df(n_ports, seed=seed + 2)
+    )
+
+
+def write_dataset_csvs(directory, n_plants, n_demand=None, n_ports=None, seed=0):
+    """
+    Writes synthetic cleaned_solar_plants.csv, cleaned_wind_plants.csv,
+    cleaned_demand_centers.csv and ports.csv in the same raw format as the real
+    files, so load_all_data can be pointed at `directory` via DATA_DIR.
+    """
+    os.makedirs(directory, exist_ok=True)
+    renewable_df, demand_df, logistics_df = make_dataset(n_plants, n_demand, n_ports, seed=seed)
+    rng = np.random.default_rng(seed + 3)
+
+    solar = renewable_df[renewable_df['type'] == 'solar'].reset_index(drop=True)
+    pd.DataFrame({
+        'Sl. No.': np.arange(1, len(solar) + 1),
+        'State': solar['State'],
+        'Name of Park and Location': [f"Synthetic Solar Park {i}" for i in range(len(solar))],
+        'Capacity Sanctioned (MW)': solar['capacity_mw'],
+        'Projects Installed (MW)': (solar['capacity_mw'] * rng.uniform(0.3, 1.0, size=len(solar))).round(1),
+        'latitude': solar['latitude'],
+        'longitude': solar['longitude']
+    }).to_csv(os.path.join(directory, 'cleaned_solar_plants.csv'), index=False)
+
+    wind = renewable_df[renewable_df['type'] == 'wind'].reset_index(drop=True)
+    pd.DataFrame({
+        'Sl. No.': np.arange(1, len(wind) + 1),
+        'State': wind['State'],
+        'District': [f"Synthetic District {i}" for i in range(len(wind))],
+        'Area (sq. km) available': (wind['capacity_mw'] / 5).round(0),
+        'Average Wind Speed (m/s)': rng.uniform(5.5, 9.0, size=len(wind)).round(3),
+        'Installable Potential (MW) (assuming 5 MW / sq.km)': wind['capacity_mw'],
+        'latitude': wind['latitude'],
+        'longitude': wind['longitude']
+    }).to_csv(os.path.join(directory, 'cleaned_wind_plants.csv'), index=False)
+
+    exports = rng.uniform(10, 20000, size=(len(demand_df), 3)).round(2)
+    pd.DataFrame({
+        'Sl. No.': np.arange(1, len(demand_df) + 1),
+        'Name of the Zone': demand_df['Name of the Zone'],
+        'Exports (in Rs. Crores) - 2018-19': exports[:, 0],
+        'Exports (in Rs. Crores) - 2019-20': exports[:, 1],
+        'Exports (in Rs. Crores) -2020-21': exports[:, 2],
+        'latitude': demand_df['latitude'],
+        'longitude': demand_df['longitude']
+    }).to_csv(os.path.join(directory, 'cleaned_demand_centers.csv'), index=False)
+
+    logistics_df.to_csv(os.path.join(directory, 'ports.csv'), index=False)
+    return directory
@@ -1,7 +1,67 @@
 # config.py
 import os
 
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
 class Config:
     """Base configuration."""
     SECRET_KEY = os.environ.get('SECRET_KEY', 'a_super_secret_key')
-    # Add other configuration variables here if needed
\ No newline at end of file
+    # Add other configuration variables here if needed
+
+    # Slippy-map score tiles (/api/tiles/<z>/<x>/<y>)
+    TILE_CACHE_DIR = os.environ.get('TILE_CACHE_DIR', os.path.join(_BASE_DIR, '.cache', 'tiles'))
+    TILE_CACHE_MEMORY_ITEMS = int(os.environ.get('TILE_CACHE_MEMORY_ITEMS', 512))
+    TILE_CACHE_DISK_BYTES = int(os.environ.get('TILE_CACHE_DISK_BYTES', 256 * 1024 * 1024))
+    TILE_MAX_ZOOM = 14
+    TILE_MAX_CELLS = 64        # Cells per tile side
+    TILE_MIN_CELL_KM = 1.0     # Never sample finer than this
+    TILE_WEIGHT_STEP = 0.05    # Weights are quantized to this step for caching
+
+    # Background jobs for the LLM reasoning endpoints
+    JOB_MAX_WORKERS = int(os.environ.get('JOB_MAX_WORKERS', 2))
+    JOB_MAX_PENDING = int(os.environ.get('JOB_MAX_PENDING', 16))
+    JOB_RESULT_TTL = int(os.environ.get('JOB_RESULT_TTL', 600))  # Seconds a finished job is kept
+    REASONING_BATCH_MAX_SITES = int(os.environ.get('REASONING_BATCH_MAX_SITES', 20))
+
+    # Generated reasoning text, keyed on bucketed inputs (see app/services/reasoning_agent.py)
+    REASONING_CACHE_DIR = os.environ.get('REASONING_CACHE_DIR', os.path.join(_BASE_DIR, '.cache', 'reasoning'))
+    REASONING_CACHE_MEMORY_ITEMS = int(os.environ.get('REASONING_CACHE_MEMORY_ITEMS', 256))
+    REASONING_CACHE_BYTES = int(os.environ.get('REASONING_CACHE_BYTES', 64 * 1024 * 1024))
+    REASONING_CACHE_TTL = int(os.environ.get('REASONING_CACHE_TTL', 7 * 24 * 3600))  # Seconds
+
+    # Admission control for the scoring endpoints (see app/services/admission.py)
+    RADIUS_DEFAULT_STEP_KM = 5.0
+    RADIUS_MAX_STEP_KM = float(os.environ.get('RADIUS_MAX_STEP_KM', 25.0))    # Coarsest grid before rejecting
+    RADIUS_MAX_GRID_POINTS = int(os.environ.get('RADIUS_MAX_GRID_POINTS', 50_000))
+    GRID_DEFAULT_STEP = 0.5    # Degrees
+    GRID_MAX_STEP = 1.0
+    SCORING_MAX_DISTANCE_PAIRS = int(os.environ.get('SCORING_MAX_DISTANCE_PAIRS', 50_000_000))  # Grid points x data points
+    ENDPOINT_CONCURRENCY = {
+        'optimize-radius': int(os.environ.get('OPTIMIZE_RADIUS_CONCURRENCY', 4)),
+        'optimize-grid': int(os.environ.get('OPTIMIZE_GRID_CONCURRENCY', 4)),
+    }
+
+    # What-if scenarios (/api/optimize-grid/scenario)
+    SCENARIO_MAX_CHANGES = int(os.environ.get('SCENARIO_MAX_CHANGES', 50))
+
+    # Zonal statistics (/api/optimize-grid/zones). Boundary GeoJSON files are optional;
+    # without one, states are approximated from the state-labelled dataset points
+    ZONE_BOUNDARIES = {
+        'state': os.environ.get('STATE_BOUNDARIES_GEOJSON'),
+        'state_property': os.environ.get('STATE_NAME_PROPERTY', 'st_nm'),
+        'district': os.environ.get('DISTRICT_BOUNDARIES_GEOJSON'),
+        'district_property': os.environ.get('DISTRICT_NAME_PROPERTY', 'district'),
+    }
+    ZONE_NEAREST_MAX_KM = 250.0
+
+    # Stateful supply-chain sessions (/api/supply-chain/sessions)
+    SUPPLY_CHAIN_MAX_SESSIONS = int(os.environ.get('SUPPLY_CHAIN_MAX_SESSIONS', 64))
+    SUPPLY_CHAIN_MEMORY_BYTES = int(os.environ.get('SUPPLY_CHAIN_MEMORY_BYTES', 512 * 1024 * 1024))  # All sessions
+    SUPPLY_CHAIN_SESSION_TTL = int(os.environ.get('SUPPLY_CHAIN_SESSION_TTL', 3600))  # Seconds idle before eviction
+    SUPPLY_CHAIN_MATRIX_BYTES = 32 * 1024 * 1024  # Distance cache per session
+
+    # On-demand request profiling (see app/utils/profiling.py); disabled unless a token is set
+    PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN')
+    PROFILING_DIR = os.environ.get('PROFILING_DIR', os.path.join(_BASE_DIR, '.cache', 'profiles'))
+    PROFILING_INTERVAL = 0.005  # Seconds between stack samples
+    PROFILING_MAX_STORED = int(os.environ.get('PROFILING_MAX_STORED', 50))
@@ -0,0 +1,137 @@
+"""
+Lazily built great-circle distance matrix (km) between the locations of a
+SupplyChainOptimizer.
+
+Locations are registered once and get a fixed index. Rows of the matrix
+(one origin to every registered location) are computed in one vectorized
+haversine pass the first time they are needed, and kept in an LRU bounded
+by memory. Registering a new location does not invalidate anything: cached
+rows are extended with the new columns the next time they are read. Moving
+an existing location recomputes its column in the cached rows and drops its row.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Sequence
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; arguments in radians, broadcast like numpy."""
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def unit_vectors(lat_rad, lon_rad):
+    """Points on the unit sphere; nearest by chord length is nearest by great-circle distance."""
+    cos_lat = np.cos(lat_rad)
+    return np.column_stack([cos_lat * np.cos(lon_rad), cos_lat * np.sin(lon_rad), np.sin(lat_rad)])
+
+
+class DistanceMatrix:
+    """Row-cached distance matrix over registered locations."""
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, initial_capacity: int = 64):
+        self.max_bytes = max_bytes
+        self._index: Dict[str, int] = {}
+        self._lat = np.empty(initial_capacity)
+        self._lon = np.empty(initial_capacity)
+        self._size = 0
+        self._rows: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self._row_bytes = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by coordinates and cached rows."""
+        return self._row_bytes + self._lat.nbytes + self._lon.nbytes
+
+    def add(self, location) -> int:
+        """Registers a location (or updates its coordinates). Returns its index."""
+        lat, lon = np.radians(location.lat), np.radians(location.lon)
+        idx = self._index.get(location.id)
+        if idx is not None:
+            if self._lat[idx] != lat or self._lon[idx] != lon:
+                self._move(idx, lat, lon)
+            return idx
+
+        if self._size == len(self._lat):
+            self._lat = np.resize(self._lat, 2 * self._size)
+            self._lon = np.resize(self._lon, 2 * self._size)
+        idx = self._size
+        self._lat[idx], self._lon[idx] = lat, lon
+        self._index[location.id] = idx
+        self._size += 1
+        return idx
+
+    def add_many(self, locations: Sequence) -> np.ndarray:
+        return np.array([self.add(location) for location in locations], dtype=int)
+
+    def index_of(self, location_id: str) -> int:
+        return self._index[location_id]
+
+    def coordinates(self, indices) -> np.ndarray:
+        """(lat, lon) in radians for the given indices."""
+        indices = np.asarray(indices, dtype=int)
+        return np.column_stack([self._lat[indices], self._lon[indices]])
+
+    def row(self, idx: int) -> np.ndarray:
+        """Distances (km) from location `idx` to every registered location."""
+        row = self._rows.get(idx)
+        if row is None:
+            row = haversine_km(self._lat[idx], self._lon[idx], self._lat[:self._size], self._lon[:self._size])
+            self._store(idx, row)
+        elif len(row) < self._size:
+            # Locations were registered since: extend with the new columns only
+            extra = haversine_km(self._lat[idx], self._lon[idx],
+                                 self._lat[len(row):self._size], self._lon[len(row):self._size])
+            row = np.concatenate([row, extra])
+            self._store(idx, row)
+        else:
+            self._rows.move_to_end(idx)
+        return row
+
+    def km(self, from_indices, to_indices) -> np.ndarray:
+        """Distance submatrix (km), shape (len(from_indices), len(to_indices))."""
+        from_indices = np.asarray(from_indices, dtype=int)
+        to_indices = np.asarray(to_indices, dtype=int)
+        # The matrix is symmetric: read rows of whichever side has fewer locations
+        if len(np.unique(to_indices)) < len(np.unique(from_indices)):
+            return self.km(to_indices, from_indices).T
+        if len(from_indices) == 0 or len(to_indices) == 0:
+            return np.zeros((len(from_indices), len(to_indices)))
+        if len(from_indices) * self._size * 8 > self.max_bytes:
+            # The full rows would not fit in the cache: compute just this block
+            a = self.coordinates(from_indices)
+            b = self.coordinates(to_indices)
+            return haversine_km(a[:, 0:1], a[:, 1:2], b[:, 0], b[:, 1])
+        return np.vstack([self.row(int(i))[to_indices] for i in from_indices])
+
+    def km_pairs(self, a_indices, b_indices) -> np.ndarray:
+        """Element-wise distances between two equal-length index arrays, computed directly."""
+        a = self.coordinates(a_indices)
+        b = self.coordinates(b_indices)
+        return haversine_km(a[:, 0], a[:, 1], b[:, 0], b[:, 1])
+
+    def _store(self, idx, row):
+        old = self._rows.pop(idx, None)
+        if old is not None:
+            self._row_bytes -= old.nbytes
+        self._rows[idx] = row
+        self._row_bytes += row.nbytes
+        while self._row_bytes > self.max_bytes and len(self._rows) > 1:
+            _, evicted = self._rows.popitem(last=False)
+            self._row_bytes -= evicted.nbytes
+
+    def _move(self, idx, lat, lon):
+        self._lat[idx], self._lon[idx] = lat, lon
+        old = self._rows.pop(idx, None)
+        if old is not None:
+            self._row_bytes -= old.nbytes
+        for origin, row in self._rows.items():
+            if idx < len(row):
+                row[idx] = haversine_km(self._lat[origin], self._lon[origin], lat, lon)
@@ -0,0 +1,352 @@
+"""
+Columnar storage for the supply-chain entities: one numpy array per numeric
+field plus an id -> row map, with Location, Facility and DemandPoint as views
+of a table row once they are added.
+"""
+
+import sys
+from collections.abc import Mapping
+from enum import Enum
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+
+class FacilityType(Enum):
+    PRODUCTION = "production"
+    STORAGE = "storage"
+    DEMAND = "demand"
+
+
+_FACILITY_TYPES = list(FacilityType)
+
+
+class _Field:
+    """An entity attribute: the entity's own value until it is added to a table, then a table cell."""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, entity, owner=None):
+        if entity is None:
+            return self
+        if entity._table is None:
+            return entity._values[self.name]
+        return entity._table.get_value(self.name, entity._row)
+
+    def __set__(self, entity, value):
+        if entity._table is None:
+            entity._values[self.name] = value
+        else:
+            entity._table.set_value(self.name, entity._row, value)
+
+
+class _Entity:
+    __slots__ = ('_table', '_row', '_values')
+    _fields = ()
+    _defaults = {}
+
+    def __init__(self, *args, **kwargs):
+        values = dict(self._defaults)
+        values.update(zip(self._fields, args))
+        values.update(kwargs)
+        missing = [name for name in self._fields if name not in values]
+        if missing:
+            raise TypeError(f"{type(self).__name__}() missing arguments: {', '.join(missing)}")
+        self._table = None
+        self._row = None
+        self._values = values
+
+    def _bind(self, table, row):
+        self._table, self._row, self._values = table, row, None
+
+    def field_values(self) -> Dict:
+        return {name: getattr(self, name) for name in self._fields}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.field_values() == other.field_values()
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+
+class Location(_Entity):
+    """Represents a geographic location with cost index"""
+    __slots__ = ()
+    _fields = ('id', 'name', 'lat', 'lon', 'cost_index')
+    _defaults = {}
+    id = _Field()
+    name = _Field()
+    lat = _Field()
+    lon = _Field()
+    cost_index = _Field()  # Total cost index for this location
+
+
+class Facility(_Entity):
+    """Represents a supply chain facility"""
+    __slots__ = ()
+    _fields = ('id', 'location', 'type', 'capacity', 'current_utilization', 'operating_cost')
+    _defaults = {'current_utilization': 0.0, 'operating_cost': 0.0}
+    id = _Field()
+    location = _Field()
+    type = _Field()
+    capacity = _Field()
+    current_utilization = _Field()
+    operating_cost = _Field()
+
+    @property
+    def available_capacity(self):
+        return max(0, self.capacity - self.current_utilization)
+
+    @property
+    def utilization_rate(self):
+        return self.current_utilization / self.capacity if self.capacity > 0 else 0
+
+
+class DemandPoint(_Entity):
+    """Represents a demand location"""
+    __slots__ = ()
+    _fields = ('id', 'location', 'demand_volume', 'priority', 'fulfilled_volume')
+    _defaults = {'priority': 1, 'fulfilled_volume': 0.0}  # Higher priority = more important
+    id = _Field()
+    location = _Field()
+    demand_volume = _Field()
+    priority = _Field()
+    fulfilled_volume = _Field()
+
+    @property
+    def unfulfilled_demand(self):
+        return max(0, self.demand_volume - self.fulfilled_volume)
+
+
+class _Table(Mapping):
+    """Growable columns plus an id -> row map; a mapping of id -> entity view."""
+    entity_class = _Entity
+    numeric_columns: Dict[str, type] = {}
+
+    def __init__(self, initial_capacity: int = 64):
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._columns = {name: np.zeros(initial_capacity, dtype=dtype) for name, dtype in self.numeric_columns.items()}
+
+    # Mapping interface
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._ids))
+
+    def __contains__(self, entity_id):
+        return entity_id in self._index
+
+    def __getitem__(self, entity_id):
+        return self.view(self._index[entity_id])
+
+    def __setitem__(self, entity_id, entity):
+        if entity_id != entity.id:
+            raise KeyError(f"Entity id {entity.id!r} stored under {entity_id!r}")
+        self.add(entity)
+
+    # Rows and columns
+    def view(self, row: int):
+        entity = self.entity_class.__new__(self.entity_class)
+        entity._bind(self, int(row))
+        return entity
+
+    def views(self, rows) -> List:
+        return [self.view(row) for row in rows]
+
+    def nbytes(self) -> int:
+        """Approximate memory held: columns, the id -> row map and the ids."""
+        return (sum(array.nbytes for array in self._columns.values())
+                + sys.getsizeof(self._index) + sys.getsizeof(self._ids)
+                + sum(sys.getsizeof(entity_id) for entity_id in self._ids))
+
+    def row_count(self) -> int:
+        """Number of stored rows (for LocationTable, including unlisted locations)."""
+        return len(self._ids)
+
+    def row_of(self, entity_id: str) -> int:
+        return self._index[entity_id]
+
+    def rows_of(self, entity_ids) -> np.ndarray:
+        return np.array([self._index[entity_id] for entity_id in entity_ids], dtype=int)
+
+    def ids_at(self, rows) -> List[str]:
+        return [self._ids[row] for row in rows]
+
+    def column(self, name: str) -> np.ndarray:
+        """The column for every row, as a view: do not resize."""
+        return self._columns[name][:len(self._ids)]
+
+    def add(self, entity) -> int:
+        """Stores an entity (replacing any with the same id) and binds it to its row."""
+        values = entity.field_values()
+        row = self._index.get(values['id'])
+        if row is None:
+            row = self._append(values['id'])
+        for name, value in values.items():
+            if name != 'id':
+                self.set_value(name, row, value)
+        entity._bind(self, row)
+        return row
+
+    def _append(self, entity_id) -> int:
+        row = len(self._ids)
+        if row == len(next(iter(self._columns.values()))):
+            for name, array in self._columns.items():
+                self._columns[name] = np.resize(array, 2 * row)
+        self._ids.append(entity_id)
+        self._index[entity_id] = row
+        return row
+
+    def get_value(self, name, row):
+        if name == 'id':
+            return self._ids[row]
+        return self._columns[name][row].item()
+
+    def set_value(self, name, row, value):
+        if name == 'id':
+            raise AttributeError("Entity ids are fixed once stored; add a new entity instead")
+        self._columns[name][row] = value
+
+
+class LocationTable(_Table):
+    """
+    Every location the optimizer knows, including ones only referenced by a
+    facility or demand point. Only "listed" ones (added with add_location)
+    show up as entries of the mapping.
+    """
+    entity_class = Location
+    numeric_columns = {'lat': np.float64, 'lon': np.float64, 'cost_index': np.float64, 'listed': np.bool_}
+
+    def __init__(self, initial_capacity: int = 64):
+        super().__init__(initial_capacity)
+        self._names: List[str] = []
+        self._listed_count = 0
+
+    def __len__(self):
+        return self._listed_count
+
+    def __iter__(self):
+        listed = self.column('listed')
+        return iter([self._ids[row] for row in np.flatnonzero(listed)])
+
+    def __contains__(self, location_id):
+        row = self._index.get(location_id)
+        return row is not None and bool(self._columns['listed'][row])
+
+    def __getitem__(self, location_id):
+        if location_id not in self:
+            raise KeyError(location_id)
+        return self.view(self._index[location_id])
+
+    def add(self, location, listed: bool = True) -> int:
+        was_listed = location.id in self
+        row = super().add(location)
+        if listed and not was_listed:
+            self._columns['listed'][row] = True
+            self._listed_count += 1
+        return row
+
+    def register(self, location) -> int:
+        """Row of a location referenced by another entity, stored (unlisted) if new."""
+        if location._table is self:
+            return location._row
+        return self.add(location, listed=False)
+
+    def nbytes(self) -> int:
+        return super().nbytes() + sys.getsizeof(self._names) + sum(sys.getsizeof(name) for name in self._names)
+
+    def listed_rows(self) -> np.ndarray:
+        return np.flatnonzero(self.column('listed'))
+
+    def names_at(self, rows) -> List[str]:
+        return [self._names[row] for row in rows]
+
+    def _append(self, location_id):
+        row = super()._append(location_id)
+        self._names.append(None)
+        self._columns['listed'][row] = False
+        return row
+
+    def get_value(self, name, row):
+        if name == 'name':
+            return self._names[row]
+        return super().get_value(name, row)
+
+    def set_value(self, name, row, value):
+        if name == 'name':
+            self._names[row] = value
+        else:
+            super().set_value(name, row, value)
+
+
+class _LocatedTable(_Table):
+    """A table whose entities reference a location of a LocationTable."""
+
+    def __init__(self, locations: LocationTable, initial_capacity: int = 64):
+        super().__init__(initial_capacity)
+        self.locations = locations
+
+    def location_rows(self, rows=None) -> np.ndarray:
+        column = self.column('location')
+        return column if rows is None else column[rows]
+
+    def get_value(self, name, row):
+        if name == 'location':
+            return self.locations.view(self._columns['location'][row])
+        return super().get_value(name, row)
+
+    def set_value(self, name, row, value):
+        if name == 'location':
+            value = self.locations.register(value)
+        super().set_value(name, row, value)
+
+
+class FacilityTable(_LocatedTable):
+    entity_class = Facility
+    numeric_columns = {'location': np.int64, 'type': np.int8, 'capacity': np.float64,
+                       'current_utilization': np.float64, 'operating_cost': np.float64}
+
+    def get_value(self, name, row):
+        if name == 'type':
+            return _FACILITY_TYPES[self._columns['type'][row]]
+        return super().get_value(name, row)
+
+    def set_value(self, name, row, value):
+        if name == 'type':
+            value = _FACILITY_TYPES.index(value)
+        super().set_value(name, row, value)
+
+    def available_capacity(self) -> np.ndarray:
+        return np.maximum(0, self.column('capacity') - self.column('current_utilization'))
+
+    def utilization_rate(self) -> np.ndarray:
+        capacity = self.column('capacity')
+        return np.divide(self.column('current_utilization'), capacity,
+                         out=np.zeros(len(capacity)), where=capacity > 0)
+
+    def type_mask(self, *types: FacilityType) -> np.ndarray:
+        return np.isin(self.column('type'), [_FACILITY_TYPES.index(t) for t in types])
+
+    def supplier_rows(self, with_capacity: bool = True) -> np.ndarray:
+        """Production and storage facilities (with spare capacity), in insertion order."""
+        mask = self.type_mask(FacilityType.PRODUCTION, FacilityType.STORAGE)
+        if with_capacity:
+            mask &= self.available_capacity() > 0
+        return np.flatnonzero(mask)
+
+
+class DemandTable(_LocatedTable):
+    entity_class = DemandPoint
+    numeric_columns = {'location': np.int64, 'demand_volume': np.float64, 'priority': np.int64,
+                       'fulfilled_volume': np.float64}
+
+    def unfulfilled_demand(self) -> np.ndarray:
+        return np.maximum(0, self.column('demand_volume') - self.column('fulfilled_volume'))
@@ -0,0 +1,393 @@
+"""
+Capacitated facility location: choose up to K new sites from a candidate set,
+jointly, to serve every demand point at minimum setup + per-unit cost, given
+the spare capacity of existing facilities.
+
+Small instances are solved exactly as a MILP (scipy.optimize.milp / HiGHS).
+Large ones use a lazy-greedy construction driven by the demand points' dual
+prices, followed by drop/swap local search. Every candidate move is evaluated
+exactly with the warm-started TransportationSolver, and the result is
+reported together with its gap to a lower bound: the LP relaxation when it
+is small enough to solve quickly, a Lagrangian bound otherwise.
+"""
+
+import heapq
+import time
+from typing import Dict, Optional
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import milp, LinearConstraint, Bounds
+
+from transportation_solver import TransportationSolver
+
+# Above this many assignment variables (candidates x demand points) the
+# heuristic is used instead of the exact MILP
+EXACT_MAX_VARIABLES = 20_000
+
+# Above this many the full LP relaxation is too slow to bound an interactive
+# request, and only the Lagrangian bound is reported
+LP_BOUND_MAX_VARIABLES = 100_000
+
+
+def _unmet_penalty(setup_costs, candidate_costs, existing_costs):
+    """Per-unit cost of leaving demand unserved: far above any real way of serving it."""
+    worst = max(
+        float(candidate_costs.max()) if candidate_costs.size else 0.0,
+        float(existing_costs.max()) if existing_costs.size else 0.0,
+    )
+    return 10.0 * (1.0 + worst + (float(setup_costs.max()) if setup_costs.size else 0.0))
+
+
+def _build_model(setup_costs, candidate_costs, candidate_capacity, existing_costs, existing_capacity,
+                 demands, max_new, penalty, strong_linking):
+    """
+    Variables: y (open candidate), x_c (candidate -> demand), x_e (existing -> demand),
+    s (unmet demand). Returns (c, constraints, lower, upper, integrality).
+    """
+    n_c, n_d = candidate_costs.shape
+    n_e = existing_costs.shape[0]
+    n_y, n_xc, n_xe = n_c, n_c * n_d, n_e * n_d
+    n_vars = n_y + n_xc + n_xe + n_d
+    xc0, xe0, s0 = n_y, n_y + n_xc, n_y + n_xc + n_xe
+
+    c = np.concatenate([setup_costs, candidate_costs.ravel(), existing_costs.ravel(), np.full(n_d, penalty)])
+
+    rows, cols, vals = [], [], []
+    lower, upper = [], []
+    row = 0
+
+    # Demand: everything delivered to j (plus unmet) equals d_j
+    demand_rows = np.arange(n_d)
+    rows += [np.tile(demand_rows, n_c), np.tile(demand_rows, n_e), demand_rows]
+    cols += [xc0 + np.arange(n_xc), xe0 + np.arange(n_xe), s0 + demand_rows]
+    vals += [np.ones(n_xc), np.ones(n_xe), np.ones(n_d)]
+    lower.append(demands)
+    upper.append(demands)
+    row += n_d
+
+    # Candidate capacity: sum_j x_kj <= Q_k * y_k
+    cand_rows = row + np.arange(n_c)
+    rows += [np.repeat(cand_rows, n_d), cand_rows]
+    cols += [xc0 + np.arange(n_xc), np.arange(n_c)]
+    vals += [np.ones(n_xc), -candidate_capacity]
+    lower.append(np.full(n_c, -np.inf))
+    upper.append(np.zeros(n_c))
+    row += n_c
+
+    # Existing capacity
+    if n_e:
+        exist_rows = row + np.arange(n_e)
+        rows.append(np.repeat(exist_rows, n_d))
+        cols.append(xe0 + np.arange(n_xe))
+        vals.append(np.ones(n_xe))
+        lower.append(np.full(n_e, -np.inf))
+        upper.append(existing_capacity)
+        row += n_e
+
+    # At most K new sites
+    rows.append(np.full(n_c, row))
+    cols.append(np.arange(n_c))
+    vals.append(np.ones(n_c))
+    lower.append([-np.inf])
+    upper.append([max_new])
+    row += 1
+
+    if strong_linking:
+        # x_kj <= min(d_j, Q_k) * y_k: much tighter relaxation, one row per pair
+        link_rows = row + np.arange(n_xc)
+        rows += [link_rows, link_rows]
+        cols += [xc0 + np.arange(n_xc), np.repeat(np.arange(n_c), n_d)]
+        vals += [np.ones(n_xc), -np.minimum(demands[None, :], candidate_capacity[:, None]).ravel()]
+        lower.append(np.full(n_xc, -np.inf))
+        upper.append(np.zeros(n_xc))
+        row += n_xc
+
+    A = sparse.csr_matrix(
+        (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape=(row, n_vars)
+    )
+    constraints = LinearConstraint(A, np.concatenate(lower), np.concatenate(upper))
+    var_upper = np.concatenate([np.ones(n_y), np.full(n_vars - n_y, np.inf)])
+    integrality = np.concatenate([np.ones(n_y), np.zeros(n_vars - n_y)])
+    return c, constraints, Bounds(np.zeros(n_vars), var_upper), integrality
+
+
+def _split_solution(x, n_c, n_e, n_d):
+    y = x[:n_c]
+    xc = x[n_c:n_c + n_c * n_d].reshape(n_c, n_d)
+    xe = x[n_c + n_c * n_d:n_c + n_c * n_d + n_e * n_d].reshape(n_e, n_d)
+    return y, xc, xe
+
+
+def lp_bound(setup_costs, candidate_costs, candidate_capacity, existing_costs, existing_capacity,
+             demands, max_new, penalty=None, strong_linking=False, time_limit=None) -> Optional[float]:
+    """Optimal value of the LP relaxation (a lower bound), or None if it did not solve in time."""
+    if penalty is None:
+        penalty = _unmet_penalty(setup_costs, candidate_costs, existing_costs)
+    c, constraints, bounds, integrality = _build_model(
+        setup_costs, candidate_costs, candidate_capacity, existing_costs, existing_capacity,
+        demands, max_new, penalty, strong_linking
+    )
+    options = {'time_limit': time_limit} if time_limit else {}
+    result = milp(c, constraints=constraints, bounds=bounds, integrality=np.zeros_like(integrality), options=options)
+    return float(result.fun) if result.status == 0 else None
+
+
+def lagrangian_bound(setup_costs, candidate_costs, candidate_capacity, existing_costs, existing_capacity,
+                     demands, max_new, penalty=None, iterations=30) -> float:
+    """
+    Cheap lower bound for instances too large for the LP relaxation.
+
+    Dropping y_k <= 1 lets every candidate be opened "fractionally", so its setup
+    cost becomes a per-unit charge f_k / Q_k and its capacity no longer binds.
+    Dualizing sum(y) <= K with a multiplier lam adds lam / Q_k per unit. What is
+    left is a transportation problem from the existing facilities plus one
+    uncapacitated "new site" supply whose cost to j is the cheapest amortized
+    candidate. Any lam >= 0 gives a valid bound; lam is bisected on the subgradient.
+    """
+    if penalty is None:
+        penalty = _unmet_penalty(setup_costs, candidate_costs, existing_costs)
+    n_e, n_d = existing_costs.shape[0], len(demands)
+    solver = TransportationSolver()
+    supply_ids = [f"e{i}" for i in range(n_e)] + ['new', 'unmet']
+    demand_ids = [f"d{j}" for j in range(n_d)]
+    capacity = np.maximum(candidate_capacity, 1e-9)
+
+    def value(lam):
+        amortized = candidate_costs + ((setup_costs + lam) / capacity)[:, None]
+        best = amortized.argmin(axis=0)
+        new_costs = amortized[best, np.arange(n_d)]
+        costs = np.vstack([existing_costs, new_costs, np.full(n_d, penalty)])
+        capacities = np.concatenate([existing_capacity, [demands.sum()] * 2])
+        solution = solver.solve(supply_ids, demand_ids, costs, capacities, demands)
+        sites_used = float((solution['flows'][n_e] / capacity[best]).sum())
+        return solution['total_cost'] - lam * max_new, sites_used - max_new
+
+    if len(setup_costs) == 0 or n_d == 0:
+        return value(0.0)[0] if n_d else 0.0
+
+    best_value, subgradient = value(0.0)
+    if subgradient <= 0:
+        return best_value  # The cardinality limit does not bind
+
+    # Grow lam until it does, then bisect
+    low, high, lam = 0.0, None, float(setup_costs.max()) + 1.0
+    for _ in range(iterations):
+        current, subgradient = value(lam)
+        best_value = max(best_value, current)
+        if subgradient > 0:
+            low = lam
+        else:
+            high = lam
+        lam = 2 * lam if high is None else (low + high) / 2
+    return best_value
+
+
+def _solve_exact(setup_costs, candidate_costs, candidate_capacity, existing_costs, existing_capacity,
+                 demands, max_new, penalty, time_limit):
+    n_c, n_d = candidate_costs.shape
+    n_e = existing_costs.shape[0]
+    c, constraints, bounds, integrality = _build_model(
+        setup_costs, candidate_costs, candidate_capacity, existing_costs, existing_capacity,
+        demands, max_new, penalty, strong_linking=True
+    )
+    options = {'time_limit': time_limit} if time_limit else {}
+    result = milp(c, constraints=constraints, bounds=bounds, integrality=integrality, options=options)
+    if result.x is None:
+        return None
+
+    y, xc, xe = _split_solution(result.x, n_c, n_e, n_d)
+    bound = getattr(result, 'mip_dual_bound', None)
+    open_sites = np.flatnonzero(y > 0.5)
+    return {
+        'open': [int(k) for k in open_sites],
+        'candidate_flows': np.where(xc[open_sites] > 1e-9, xc[open_sites], 0.0),
+        'existing_flows': np.where(xe > 1e-9, xe, 0.0),
+        'objective': float(result.fun),
+        'lower_bound': float(bound) if bound is not None and np.isfinite(bound) else float(result.fun),
+        'optimal': result.status == 0,
+    }
+
+
+class _Evaluator:
+    """Exact cost of a set of open candidates, via warm-started transportation solves."""
+
+    def __init__(self, setup_costs, candidate_costs, candidate_capacity, existing_costs, existing_capacity,
+                 demands, penalty):
+        self.setup_costs = setup_costs
+        self.candidate_costs = candidate_costs
+        self.candidate_capacity = candidate_capacity
+        self.existing_costs = existing_costs
+        self.existing_capacity = existing_capacity
+        self.demands = demands
+        self.penalty = penalty
+        self.solver = TransportationSolver()
+        self.demand_ids = [f"d{j}" for j in range(len(demands))]
+        self.evaluations = 0
+
+    def evaluate(self, open_sites):
+        """Returns (objective, solution dict) for the open candidate list."""
+        n_e = self.existing_costs.shape[0]
+        n_d = len(self.demands)
+        open_sites = list(open_sites)
+        # An always-available slack supply makes every instance feasible; its flow is unmet demand
+        costs = np.vstack([self.existing_costs, self.candidate_costs[open_sites], np.full((1, n_d), self.penalty)])
+        capacities = np.concatenate([self.existing_capacity, self.candidate_capacity[open_sites], [self.demands.sum()]])
+        supply_ids = [f"e{i}" for i in range(n_e)] + [f"c{k}" for k in open_sites] + ['unmet']
+
+        solution = self.solver.solve(supply_ids, self.demand_ids, costs, capacities, self.demands)
+        self.evaluations += 1
+        objective = solution['total_cost'] + float(self.setup_costs[open_sites].sum())
+        flows = solution['flows']
+        return objective, {
+            'open': open_sites,
+            'existing_flows': flows[:n_e],
+            'candidate_flows': flows[n_e:n_e + len(open_sites)],
+            'objective': objective,
+        }
+
+    def prices(self):
+        return self.solver.demand_prices()
+
+
+def _estimated_gains(prices, candidate_costs, candidate_capacity, demands, setup_costs, rows=None):
+    """
+    Estimated saving of opening each candidate: it takes over the demand it can
+    serve below the current dual price, best savings first, up to its capacity.
+    """
+    if rows is None:
+        rows = np.arange(candidate_costs.shape[0])
+    savings = np.maximum(prices[None, :] - candidate_costs[rows], 0.0)
+    order = np.argsort(-savings, axis=1)
+    sorted_savings = np.take_along_axis(savings, order, axis=1)
+    sorted_demands = demands[order]
+    filled_before = np.cumsum(sorted_demands, axis=1) - sorted_demands
+    served = np.clip(candidate_capacity[rows, None] - filled_before, 0.0, sorted_demands)
+    return (served * sorted_savings).sum(axis=1) - setup_costs[rows]
+
+
+def _solve_heuristic(setup_costs, candidate_costs, candidate_capacity, existing_costs, existing_capacity,
+                     demands, max_new, penalty, time_limit, swap_candidates=5):
+    evaluator = _Evaluator(setup_costs, candidate_costs, candidate_capacity, existing_costs, existing_capacity,
+                           demands, penalty)
+    deadline = time.perf_counter() + time_limit if time_limit else None
+    best_objective, best = evaluator.evaluate([])
+
+    # Lazy greedy: pop the candidate with the best (stale) estimate, refresh it,
+    # and only evaluate it exactly if it is still the best
+    gains = _estimated_gains(evaluator.prices(), candidate_costs, candidate_capacity, demands, setup_costs)
+    heap = [(-gain, int(k)) for k, gain in enumerate(gains) if gain > 0]
+    heapq.heapify(heap)
+    open_sites = []
+    while heap and len(open_sites) < max_new:
+        if deadline and time.perf_counter() > deadline:
+            break
+        _, k = heapq.heappop(heap)
+        fresh = _estimated_gains(evaluator.prices(), candidate_costs, candidate_capacity, demands, setup_costs,
+                                 rows=np.array([k]))[0]
+        if fresh <= 0:
+            continue
+        if heap and fresh < -heap[0][0]:
+            heapq.heappush(heap, (-fresh, k))
+            continue
+        objective, solution = evaluator.evaluate(open_sites + [k])
+        if objective < best_objective - 1e-9:
+            open_sites.append(k)
+            best_objective, best = objective, solution
+        else:
+            evaluator.evaluate(open_sites)  # Restore the solver state (and prices) of the current set
+
+    # Local search: add a site while below K, drop a site, or swap it for one
+    # of the most promising closed ones
+    improved = True
+    while improved and open_sites:
+        improved = False
+        closed = np.setdiff1d(np.arange(len(setup_costs)), open_sites)
+        if len(open_sites) < max_new and len(closed):
+            gains = _estimated_gains(evaluator.prices(), candidate_costs, candidate_capacity, demands,
+                                     setup_costs, rows=closed)
+            for k_new in closed[np.argsort(-gains)[:swap_candidates]]:
+                objective, solution = evaluator.evaluate(open_sites + [int(k_new)])
+                if objective < best_objective - 1e-9:
+                    open_sites, best_objective, best, improved = open_sites + [int(k_new)], objective, solution, True
+                    break
+            if improved:
+                continue
+            evaluator.evaluate(open_sites)
+        for k in list(open_sites):
+            if deadline and time.perf_counter() > deadline:
+                break
+            others = [o for o in open_sites if o != k]
+            objective, solution = evaluator.evaluate(others)
+            if objective < best_objective - 1e-9:
+                open_sites, best_objective, best, improved = others, objective, solution, True
+                break
+            closed = np.setdiff1d(np.arange(len(setup_costs)), open_sites)
+            if len(closed) == 0:
+                continue
+            gains = _estimated_gains(evaluator.prices(), candidate_costs, candidate_capacity, demands,
+                                     setup_costs, rows=closed)
+            for k_new in closed[np.argsort(-gains)[:swap_candidates]]:
+                objective, solution = evaluator.evaluate(others + [int(k_new)])
+                if objective < best_objective - 1e-9:
+                    open_sites, best_objective, best, improved = others + [int(k_new)], objective, solution, True
+                    break
+            if improved:
+                break
+        evaluator.evaluate(open_sites)
+
+    best['evaluations'] = evaluator.evaluations
+    return best
+
+
+def solve_facility_location(setup_costs, candidate_costs, candidate_capacity, existing_costs, existing_capacity,
+                            demands, max_new, method='auto', time_limit=10.0, bound_time_limit=None) -> Dict:
+    """
+    Chooses at most `max_new` candidates to open.
+
+    Args:
+        setup_costs: (n_candidates,) fixed cost of opening each candidate
+        candidate_costs: (n_candidates, n_demand) per-unit cost of serving demand j from candidate k
+        candidate_capacity: (n_candidates,) capacity of each candidate if opened
+        existing_costs: (n_existing, n_demand) per-unit cost from existing facilities
+        existing_capacity: (n_existing,) their spare capacity
+        demands: (n_demand,) volume to serve
+        method: 'exact', 'heuristic' or 'auto' (exact when the model is small)
+
+    Returns {'open', 'candidate_flows', 'existing_flows', 'objective', 'unmet',
+    'lower_bound', 'gap', 'method'}; 'objective' includes a large penalty per unit of unmet demand.
+    """
+    setup_costs = np.asarray(setup_costs, dtype=float)
+    candidate_costs = np.asarray(candidate_costs, dtype=float).reshape(len(setup_costs), -1)
+    candidate_capacity = np.broadcast_to(np.asarray(candidate_capacity, dtype=float), setup_costs.shape).copy()
+    demands = np.asarray(demands, dtype=float)
+    existing_costs = np.asarray(existing_costs, dtype=float).reshape(-1, len(demands))
+    existing_capacity = np.asarray(existing_capacity, dtype=float)
+    penalty = _unmet_penalty(setup_costs, candidate_costs, existing_costs)
+    args = (setup_costs, candidate_costs, candidate_capacity, existing_costs, existing_capacity, demands, max_new)
+
+    if method == 'auto':
+        method = 'exact' if candidate_costs.size <= EXACT_MAX_VARIABLES else 'heuristic'
+
+    result = None
+    if method == 'exact':
+        result = _solve_exact(*args, penalty, time_limit)
+    if result is None:
+        method = 'heuristic'
+        result = _solve_heuristic(*args, penalty, time_limit)
+        bound = lagrangian_bound(*args, penalty=penalty)
+        if candidate_costs.size <= LP_BOUND_MAX_VARIABLES:
+            lp = lp_bound(*args, penalty=penalty, strong_linking=candidate_costs.size <= EXACT_MAX_VARIABLES,
+                          time_limit=bound_time_limit if bound_time_limit is not None else time_limit)
+            bound = max(bound, lp) if lp is not None else bound
+        result['lower_bound'] = bound
+
+    served = result['candidate_flows'].sum(axis=0) + result['existing_flows'].sum(axis=0)
+    result['unmet'] = float(np.maximum(demands - served, 0).sum())
+    result['method'] = method
+    bound = result.get('lower_bound')
+    result['gap'] = (
+        max(0.0, (result['objective'] - bound) / abs(result['objective']))
+        if bound is not None and result['objective'] else None
+    )
+    return result
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# In backend/profile_imports.py
+"""
+Reports how long it takes to import the Flask app and build it, using
+Python's -X importtime. Run from the backend directory:
+
+    python profile_imports.py            # top 25 slowest imports
+    python profile_imports.py --top 50
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+BOOT_SNIPPET = (
+    "import time; t = time.perf_counter(); "
+    "from app import create_app; from config import Config; create_app(Config); "
+    "print(f'BOOT_SECONDS={time.perf_counter() - t:.4f}')"
+)
+
+
+def parse_importtime(stderr):
+    """
+    Rows of (cumulative_us, self_us, name) from -X importtime output. Nested
+    imports keep their indentation in `name`; top-level ones have none.
+    """
+    # Lines look like: "import time:  self [us] | cumulative | imported package"
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        # Drop the one separator space after '|'; any further indentation marks a nested import
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()[1:]))
+    return rows
+
+
+def top_level_total(rows):
+    """Total cumulative time (us) of the top-level imports."""
+    return sum(cumulative for cumulative, _, name in rows if not name.startswith(" "))
+
+
+def profile_imports(top=25):
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT_SNIPPET],
+        cwd=backend_dir, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        print(proc.stderr)
+        sys.exit(proc.returncode)
+
+    rows = parse_importtime(proc.stderr)
+
+    boot_seconds = next(
+        (line.split("=", 1)[1] for line in proc.stdout.splitlines() if line.startswith("BOOT_SECONDS=")), "?"
+    )
+    top_level = top_level_total(rows)
+
+    print(f"App boot (import + create_app): {boot_seconds} s")
+    print(f"Total top-level import time:    {top_level / 1e6:.4f} s")
+    print(f"\nTop {top} imports by cumulative time:")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative / 1000:>14.1f} {self_us / 1000:>9.1f}  {name.strip()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=25, help="Number of imports to list")
+    profile_imports(parser.parse_args().top)
@@ -1,81 +1,58 @@
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
-from enum import Enum
 import heapq
-from scipy.optimize import linprog
-
-class FacilityType(Enum):
-    PRODUCTION = "production"
-    STORAGE = "storage"
-    DEMAND = "demand"
-
-@dataclass
-class Location:
-    """Represents a geographic location with cost index"""
-    id: str
-    name: str
-    lat: float
-    lon: float
-    cost_index: float  # Total cost index for this location
-    
-@dataclass
-class Facility:
-    """Represents a supply chain facility"""
-    id: str
-    location: Location
-    type: FacilityType
-    capacity: float
-    current_utilization: float = 0.0
-    operating_cost: float = 0.0
-    
-    @property
-    def available_capacity(self):
-        return max(0, self.capacity - self.current_utilization)
-    
-    @property
-    def utilization_rate(self):
-        return self.current_utilization / self.capacity if self.capacity > 0 else 0
-
-@dataclass
-class DemandPoint:
-    """Represents a demand location"""
-    id: str
-    location: Location
-    demand_volume: float
-    priority: int = 1  # Higher priority = more important
-    fulfilled_volume: float = 0.0
-    
-    @property
-    def unfulfilled_demand(self):
-        return max(0, self.demand_volume - self.fulfilled_volume)
+from scipy.spatial import cKDTree
+from transportation_solver import TransportationSolver
+from distance_matrix import DistanceMatrix, unit_vectors
+from facility_location import solve_facility_location
+from batch_evaluation import NetworkSnapshot, evaluate_batch
+from entity_tables import (
+    FacilityType, Location, Facility, DemandPoint, LocationTable, FacilityTable, DemandTable
+)
 
 class SupplyChainOptimizer:
     """Main optimization engine for supply chain management"""
     
     def __init__(self):
-        self.locations: Dict[str, Location] = {}
-        self.facilities: Dict[str, Facility] = {}
-        self.demand_points: Dict[str, DemandPoint] = {}
+        # Columnar tables; they read like dicts of id -> Location / Facility / DemandPoint
+        self.locations = LocationTable()
+        self.facilities = FacilityTable(self.locations)
+        self.demand_points = DemandTable(self.locations)
         self.supply_routes: Dict[Tuple[str, str], float] = {}  # (from_id, to_id): flow
         self.transportation_cost_per_km = 0.1  # Cost per unit per km
+        # Great-circle distances (km) between locations, computed once per pair
+        self.distances = DistanceMatrix()
+        # Keeps the last optimal routing so re-optimizing after an edit is a warm start
+        self.route_solver = TransportationSolver()
+        # Lazily built lookup structures, rebuilt when locations / facilities change
+        self._locations_version = 0
+        self._facilities_version = 0
+        self._location_arrays = None
+        self._facility_indexes = None
+        # Row/column in self.distances of each LocationTable row, extended on demand
+        self._matrix_index = np.zeros(0, dtype=int)
         
     def add_location(self, location: Location):
         """Add a new location to the network"""
-        self.locations[location.id] = location
+        self.locations.add(location)
+        self.distances.add(location)
+        self._locations_version += 1
         
     def add_facility(self, facility: Facility):
         """Add an existing facility to the network"""
-        self.facilities[facility.id] = facility
+        self.facilities.add(facility)
+        self.distances.add(facility.location)
+        self._facilities_version += 1
         
     def add_demand_point(self, demand: DemandPoint):
         """Add a demand point to the network"""
-        self.demand_points[demand.id] = demand
+        self.demand_points.add(demand)
+        self.distances.add(demand.location)
         
     def calculate_distance(self, loc1: Location, loc2: Location) -> float:
-        """Calculate Euclidean distance between two locations"""
-        return np.sqrt((loc1.lat - loc2.lat)**2 + (loc1.lon - loc2.lon)**2)
+        """Great-circle distance between two locations in km"""
+        return float(self.distances.km([self.distances.add(loc1)], [self.distances.add(loc2)])[0, 0])
     
     def calculate_transportation_cost(self, from_facility: Facility, to_location: Location, 
                                      volume: float) -> float:
@@ -86,6 +63,44 @@ class SupplyChainOptimizer:
         adjusted_cost = base_cost * (from_facility.location.cost_index + to_location.cost_index) / 2
         return adjusted_cost
     
+    def transportation_cost_matrix(self, facilities: List[Facility], locations: List[Location]) -> np.ndarray:
+        """
+        Per-unit transportation cost from every facility to every location,
+        shape (len(facilities), len(locations)). Vectorized equivalent of
+        calculate_transportation_cost(facility, location, 1.0).
+        """
+        distances = self.distances.km(
+            self.distances.add_many([f.location for f in facilities]),
+            self.distances.add_many(locations)
+        )
+        origin_index = np.array([f.location.cost_index for f in facilities], dtype=float)
+        target_index = np.array([l.cost_index for l in locations], dtype=float)
+        cost_index = (origin_index[:, None] + target_index[None, :]) / 2
+        return distances * self.transportation_cost_per_km * cost_index
+    
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the network, its distance cache and the kept route solution."""
+        return (self.locations.nbytes() + self.facilities.nbytes() + self.demand_points.nbytes()
+                + self.distances.nbytes + self.route_solver.nbytes + self._matrix_index.nbytes)
+    
+    def location_matrix_index(self, location_rows) -> np.ndarray:
+        """Rows/columns in self.distances of the given LocationTable rows."""
+        known = len(self._matrix_index)
+        if known < self.locations.row_count():
+            added = [self.distances.add(self.locations.view(row)) for row in range(known, self.locations.row_count())]
+            self._matrix_index = np.concatenate([self._matrix_index, np.array(added, dtype=int)])
+        return self._matrix_index[np.asarray(location_rows, dtype=int)]
+    
+    def location_cost_matrix(self, origin_rows, target_rows) -> np.ndarray:
+        """
+        Per-unit transportation cost between LocationTable rows, shape
+        (len(origin_rows), len(target_rows)); same formula as transportation_cost_matrix.
+        """
+        distances = self.distances.km(self.location_matrix_index(origin_rows), self.location_matrix_index(target_rows))
+        cost_index = self.locations.column('cost_index')
+        pair_index = (cost_index[origin_rows][:, None] + cost_index[target_rows][None, :]) / 2
+        return distances * self.transportation_cost_per_km * pair_index
+    
     def evaluate_new_demand(self, new_demand: DemandPoint) -> Dict:
         """
         Evaluate if new demand can be met with existing infrastructure
@@ -101,21 +116,18 @@ class SupplyChainOptimizer:
         }
         
         # Find available supply from existing facilities
+        supplier_rows = self.facilities.supplier_rows()
         available_supplies = []
-        for fac_id, facility in self.facilities.items():
-            if facility.type in [FacilityType.PRODUCTION, FacilityType.STORAGE]:
-                if facility.available_capacity > 0:
-                    cost = self.calculate_transportation_cost(
-                        facility, new_demand.location, 
-                        min(facility.available_capacity, new_demand.demand_volume)
-                    )
-                    cost_per_unit = cost / min(facility.available_capacity, new_demand.demand_volume)
-                    available_supplies.append({
-                        'facility_id': fac_id,
-                        'available': facility.available_capacity,
-                        'cost_per_unit': cost_per_unit,
-                        'total_cost': cost
-                    })
+        if len(supplier_rows):
+            unit_costs = self.transportation_cost_matrix(self.facilities.views(supplier_rows), [new_demand.location])[:, 0]
+            available = self.facilities.available_capacity()[supplier_rows]
+            for facility_id, capacity, cost_per_unit in zip(self.facilities.ids_at(supplier_rows), available, unit_costs):
+                available_supplies.append({
+                    'facility_id': facility_id,
+                    'available': float(capacity),
+                    'cost_per_unit': cost_per_unit,
+                    'total_cost': cost_per_unit * min(capacity, new_demand.demand_volume)
+                })
         
         # Sort by cost efficiency
         available_supplies.sort(key=lambda x: x['cost_per_unit'])
@@ -151,86 +163,276 @@ class SupplyChainOptimizer:
         
         return result
     
-    def suggest_new_facilities(self, demand: DemandPoint, required_volume: float) -> List[Dict]:
+    def snapshot(self) -> NetworkSnapshot:
+        """Frozen copy of the suppliers' positions and spare capacity, as evaluate_new_demand sees them."""
+        rows = self.facilities.supplier_rows()
+        location_rows = self.facilities.location_rows(rows)
+        return NetworkSnapshot(
+            supplier_ids=tuple(self.facilities.ids_at(rows)),
+            lat_rad=np.radians(self.locations.column('lat')[location_rows]),
+            lon_rad=np.radians(self.locations.column('lon')[location_rows]),
+            cost_index=self.locations.column('cost_index')[location_rows].copy(),
+            available=self.facilities.available_capacity()[rows],
+            cost_per_km=self.transportation_cost_per_km
+        )
+    
+    def evaluate_demand_batch(self, demands: List[DemandPoint], workers: Optional[int] = None) -> List[Dict]:
+        """
+        Evaluates many what-if demands, each on its own against the current network
+        (no scenario sees another's allocations, and nothing is mutated).
+        Returns per demand {'demand_id', 'can_fulfill', 'fulfillment_plan', 'total_cost',
+        'unfulfilled_volume'}; facility recommendations are left to evaluate_new_demand.
+        """
+        return evaluate_batch(self.snapshot(), demands, workers=workers)
+    
+    def location_arrays(self) -> Dict:
+        """
+        Candidate locations as arrays: {'ids', 'names', 'rows' (in self.locations),
+        'coords' (lat, lon), 'cost_index', 'matrix_index' (rows/columns in self.distances)}
+        in insertion order. Cached until a location is added.
+        """
+        key = (self._locations_version, len(self.locations))
+        if self._location_arrays is None or self._location_arrays['key'] != key:
+            rows = self.locations.listed_rows()
+            self._location_arrays = {
+                'key': key,
+                'ids': self.locations.ids_at(rows),
+                'names': self.locations.names_at(rows),
+                'rows': rows,
+                'coords': np.column_stack([self.locations.column('lat')[rows], self.locations.column('lon')[rows]]),
+                'cost_index': self.locations.column('cost_index')[rows],
+                'matrix_index': self.location_matrix_index(rows),
+            }
+        return self._location_arrays
+    
+    def facility_indexes(self) -> Dict:
+        """
+        {'occupied_locations': self.locations rows that have a facility,
+         'production': rows of the production facilities in self.facilities,
+         'production_cost_index': cost index of their locations,
+         'production_tree': KD-tree over their positions on the unit sphere, or None if there are none,
+         'production_index': their rows/columns in self.distances,
+         'free_candidates': positions in location_arrays() without a facility (set on first use)}.
+        Cached until a facility is added.
+        """
+        key = (self._facilities_version, len(self.facilities))
+        if self._facility_indexes is None or self._facility_indexes['key'] != key:
+            production = np.flatnonzero(self.facilities.type_mask(FacilityType.PRODUCTION))
+            production_locations = self.facilities.location_rows(production)
+            production_index = self.location_matrix_index(production_locations)
+            self._facility_indexes = {
+                'key': key,
+                'occupied_locations': np.unique(self.facilities.location_rows()),
+                'production': production,
+                'production_cost_index': self.locations.column('cost_index')[production_locations],
+                'production_index': production_index,
+                'production_tree': cKDTree(unit_vectors(*self.distances.coordinates(production_index).T))
+                                   if len(production) else None,
+            }
+        return self._facility_indexes
+    
+    def _free_candidates(self, locations: Dict, indexes: Dict) -> np.ndarray:
+        """Positions in location_arrays() of locations without a facility."""
+        if indexes.get('free_key') != locations['key']:
+            indexes['free_candidates'] = np.flatnonzero(
+                ~np.isin(locations['rows'], indexes['occupied_locations'])
+            )
+            indexes['free_key'] = locations['key']
+        return indexes['free_candidates']
+    
+    def suggest_new_facilities(self, demand: DemandPoint, required_volume: float, top_n: int = 5) -> List[Dict]:
         """
         Suggest new production or storage facilities based on cost indices
         """
-        suggestions = []
+        locations = self.location_arrays()
+        indexes = self.facility_indexes()
         
-        # Evaluate each potential location
-        for loc_id, location in self.locations.items():
-            # Skip if location already has a facility
-            if any(f.location.id == loc_id for f in self.facilities.values()):
-                continue
-            
-            # Calculate costs for production facility
-            prod_setup_cost = 10000 * location.cost_index  # Base setup cost * index
-            prod_operating_cost = 50 * required_volume * location.cost_index
-            prod_transport_cost = self.calculate_transportation_cost(
-                Facility('temp', location, FacilityType.PRODUCTION, required_volume),
-                demand.location, required_volume
+        # Skip locations that already have a facility
+        candidates = self._free_candidates(locations, indexes)
+        if len(candidates) == 0:
+            return []
+        matrix_index = locations['matrix_index'][candidates]
+        cost_index = locations['cost_index'][candidates]
+        rate = self.transportation_cost_per_km * required_volume
+        
+        # Calculate costs for production facilities
+        prod_setup_cost = 10000 * cost_index  # Base setup cost * index
+        prod_operating_cost = 50 * required_volume * cost_index
+        demand_distance = self.distances.km([self.distances.add(demand.location)], matrix_index)[0]
+        prod_transport_cost = demand_distance * rate * (cost_index + demand.location.cost_index) / 2
+        prod_total_cost = prod_setup_cost + prod_operating_cost + prod_transport_cost
+        
+        # Calculate costs for storage facilities
+        storage_setup_cost = 5000 * cost_index  # Lower setup cost for storage
+        storage_operating_cost = 20 * required_volume * cost_index
+        storage_transport_cost = prod_transport_cost  # Same transport cost
+        
+        # Need to account for supply to storage from the nearest production facility
+        storage_supply_cost = np.zeros(len(candidates))
+        if indexes['production_tree'] is not None:
+            _, nearest = indexes['production_tree'].query(
+                unit_vectors(*self.distances.coordinates(matrix_index).T), workers=-1
             )
-            prod_total_cost = prod_setup_cost + prod_operating_cost + prod_transport_cost
-            
-            # Calculate costs for storage facility
-            storage_setup_cost = 5000 * location.cost_index  # Lower setup cost for storage
-            storage_operating_cost = 20 * required_volume * location.cost_index
-            storage_transport_cost = prod_transport_cost  # Same transport cost
-            
-            # Need to account for supply to storage from production
-            nearest_production = self.find_nearest_production(location)
-            storage_supply_cost = 0
-            if nearest_production:
-                storage_supply_cost = self.calculate_transportation_cost(
-                    nearest_production, location, required_volume
-                )
-            
-            storage_total_cost = storage_setup_cost + storage_operating_cost + \
-                                storage_transport_cost + storage_supply_cost
-            
+            supply_distance = self.distances.km_pairs(indexes['production_index'][nearest], matrix_index)
+            production_cost_index = indexes['production_cost_index'][nearest]
+            storage_supply_cost = supply_distance * rate * (production_cost_index + cost_index) / 2
+        
+        storage_total_cost = storage_setup_cost + storage_operating_cost + \
+                            storage_transport_cost + storage_supply_cost
+        
+        # Top N by total cost of the recommended facility type (ties keep location order)
+        best_cost = np.minimum(prod_total_cost, storage_total_cost)
+        top = np.arange(len(candidates))
+        if len(top) > top_n:
+            top = np.argpartition(best_cost, top_n - 1)[:top_n]
+        top = top[np.lexsort((top, best_cost[top]))]
+        
+        suggestions = []
+        for k in top:
+            i = candidates[k]
             suggestions.append({
-                'location_id': loc_id,
-                'location_name': location.name,
-                'cost_index': location.cost_index,
-                'production_facility_cost': prod_total_cost,
-                'storage_facility_cost': storage_total_cost,
-                'recommended_type': 'production' if prod_total_cost < storage_total_cost else 'storage',
+                'location_id': locations['ids'][i],
+                'location_name': locations['names'][i],
+                'cost_index': float(cost_index[k]),
+                'production_facility_cost': float(prod_total_cost[k]),
+                'storage_facility_cost': float(storage_total_cost[k]),
+                'recommended_type': 'production' if prod_total_cost[k] < storage_total_cost[k] else 'storage',
                 'cost_breakdown': {
                     'production': {
-                        'setup': prod_setup_cost,
-                        'operating': prod_operating_cost,
-                        'transport': prod_transport_cost,
-                        'total': prod_total_cost
+                        'setup': float(prod_setup_cost[k]),
+                        'operating': float(prod_operating_cost[k]),
+                        'transport': float(prod_transport_cost[k]),
+                        'total': float(prod_total_cost[k])
                     },
                     'storage': {
-                        'setup': storage_setup_cost,
-                        'operating': storage_operating_cost,
-                        'transport': storage_transport_cost,
-                        'supply': storage_supply_cost,
-                        'total': storage_total_cost
+                        'setup': float(storage_setup_cost[k]),
+                        'operating': float(storage_operating_cost[k]),
+                        'transport': float(storage_transport_cost[k]),
+                        'supply': float(storage_supply_cost[k]),
+                        'total': float(storage_total_cost[k])
                     }
                 }
             })
         
-        # Sort by total cost of recommended facility type
-        suggestions.sort(key=lambda x: min(x['production_facility_cost'], 
-                                          x['storage_facility_cost']))
-        
-        return suggestions[:5]  # Return top 5 suggestions
+        return suggestions  # Top 5 suggestions by default
     
     def find_nearest_production(self, location: Location) -> Optional[Facility]:
         """Find the nearest production facility to a location"""
-        min_distance = float('inf')
-        nearest = None
+        indexes = self.facility_indexes()
+        if indexes['production_tree'] is None:
+            return None
+        
+        point = unit_vectors(*self.distances.coordinates([self.distances.add(location)]).T)
+        _, nearest = indexes['production_tree'].query(point[0])
+        return self.facilities.view(indexes['production'][int(nearest)])
+    
+    def add_grid_candidates(self, step: float = 0.5, cost_index: float = 1.0) -> List[str]:
+        """
+        Register the points of the national scoring grid (optimization_service.create_india_grid)
+        as candidate locations. Returns their location ids.
+        """
+        from app.services.optimization_service import create_india_grid
+        
+        ids = []
+        for lat, lon in create_india_grid(step=step):
+            location = Location(f"grid_{lat:.3f}_{lon:.3f}", f"Grid point {lat:.2f}, {lon:.2f}",
+                                float(lat), float(lon), cost_index)
+            if location.id not in self.locations:
+                self.add_location(location)
+            ids.append(location.id)
+        return ids
+    
+    def plan_new_facilities(self, max_new: int, capacity: float, facility_type: str = 'production',
+                            candidate_ids: Optional[List[str]] = None, method: str = 'auto',
+                            time_limit: float = 10.0) -> Dict:
+        """
+        Choose up to `max_new` new sites jointly so that all unfulfilled demand is met
+        at minimum setup + operating + transport cost, using the spare capacity of
+        existing facilities first where that is cheaper.
         
-        for facility in self.facilities.values():
-            if facility.type == FacilityType.PRODUCTION:
-                distance = self.calculate_distance(facility.location, location)
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest = facility
+        Candidates default to every location without a facility. Small instances are
+        solved exactly (MILP); large ones heuristically, with the gap to the LP bound.
+        """
+        unfulfilled = self.demand_points.unfulfilled_demand()
+        demand_rows = np.flatnonzero(unfulfilled > 0)
+        if not len(demand_rows):
+            return {'method': None, 'new_facilities': [], 'routes': [], 'total_cost': 0.0, 'unmet_volume': 0.0}
+        
+        locations = self.location_arrays()
+        indexes = self.facility_indexes()
+        if candidate_ids is None:
+            candidates = self._free_candidates(locations, indexes)
+        else:
+            position = {loc_id: i for i, loc_id in enumerate(locations['ids'])}
+            candidates = np.array([position[loc_id] for loc_id in candidate_ids], dtype=int)
+        candidate_matrix_index = locations['matrix_index'][candidates]
+        cost_index = locations['cost_index'][candidates]
+        
+        demand_ids = self.demand_points.ids_at(demand_rows)
+        demand_locations = self.demand_points.location_rows(demand_rows)
+        demand_index = self.location_matrix_index(demand_locations)
+        demand_cost_index = self.locations.column('cost_index')[demand_locations]
+        demands = unfulfilled[demand_rows]
+        
+        # Per-unit cost of serving each demand point from each candidate
+        transport = self.distances.km(candidate_matrix_index, demand_index) * self.transportation_cost_per_km \
+            * (cost_index[:, None] + demand_cost_index[None, :]) / 2
+        if facility_type == 'production':
+            setup_costs = 10000 * cost_index
+            operating = 50 * cost_index
+        else:
+            setup_costs = 5000 * cost_index
+            operating = 20 * cost_index
+            # Storage has to be supplied from the nearest production facility
+            if indexes['production_tree'] is not None:
+                _, nearest = indexes['production_tree'].query(
+                    unit_vectors(*self.distances.coordinates(candidate_matrix_index).T)
+                )
+                production_cost_index = indexes['production_cost_index'][nearest]
+                operating = operating + self.distances.km_pairs(
+                    indexes['production_index'][nearest], candidate_matrix_index
+                ) * self.transportation_cost_per_km * (production_cost_index + cost_index) / 2
+        
+        existing = self.facilities.supplier_rows()
+        existing_costs = self.location_cost_matrix(self.facilities.location_rows(existing), demand_locations)
+        
+        solution = solve_facility_location(
+            setup_costs, transport + operating[:, None], capacity,
+            existing_costs, self.facilities.available_capacity()[existing],
+            demands, max_new, method=method, time_limit=time_limit
+        )
         
-        return nearest
+        new_facilities = []
+        routes = []
+        for row, k in enumerate(solution['open']):
+            i = candidates[k]
+            flows = solution['candidate_flows'][row]
+            new_facilities.append({
+                'location_id': locations['ids'][i],
+                'location_name': locations['names'][i],
+                'type': facility_type,
+                'capacity': capacity,
+                'setup_cost': float(setup_costs[k]),
+                'volume': float(flows.sum())
+            })
+            for j in np.flatnonzero(flows > 0.01):
+                routes.append({'from': locations['ids'][i], 'to': demand_ids[j], 'volume': float(flows[j]),
+                               'cost': float(flows[j] * (transport[k, j] + operating[k]))})
+        for e, facility_id in enumerate(self.facilities.ids_at(existing)):
+            flows = solution['existing_flows'][e]
+            for j in np.flatnonzero(flows > 0.01):
+                routes.append({'from': facility_id, 'to': demand_ids[j], 'volume': float(flows[j]),
+                               'cost': float(flows[j] * existing_costs[e, j])})
+        
+        return {
+            'method': solution['method'],
+            'new_facilities': new_facilities,
+            'routes': routes,
+            'total_cost': float(sum(f['setup_cost'] for f in new_facilities) + sum(r['cost'] for r in routes)),
+            'unmet_volume': solution['unmet'],
+            'lower_bound': solution['lower_bound'],
+            'gap': solution['gap']
+        }
     
     def optimize_existing_assets(self) -> List[Dict]:
         """
@@ -239,23 +441,25 @@ class SupplyChainOptimizer:
         """
         optimizations = []
         
-        # Analyze current utilization
-        for fac_id, facility in self.facilities.items():
-            if facility.type in [FacilityType.PRODUCTION, FacilityType.STORAGE]:
-                if facility.utilization_rate < 0.5:
-                    optimizations.append({
-                        'type': 'underutilized',
-                        'facility_id': fac_id,
-                        'current_utilization': f"{facility.utilization_rate:.1%}",
-                        'recommendation': f"Consider consolidating operations or finding new demand sources"
-                    })
-                elif facility.utilization_rate > 0.9:
-                    optimizations.append({
-                        'type': 'near_capacity',
-                        'facility_id': fac_id,
-                        'current_utilization': f"{facility.utilization_rate:.1%}",
-                        'recommendation': f"Consider expanding capacity or adding new facility nearby"
-                    })
+        # Analyze current utilization (only flagged facilities are visited)
+        utilization = self.facilities.utilization_rate()
+        suppliers = self.facilities.type_mask(FacilityType.PRODUCTION, FacilityType.STORAGE)
+        flagged = np.flatnonzero(suppliers & ((utilization < 0.5) | (utilization > 0.9)))
+        for fac_id, rate in zip(self.facilities.ids_at(flagged), utilization[flagged]):
+            if rate < 0.5:
+                optimizations.append({
+                    'type': 'underutilized',
+                    'facility_id': fac_id,
+                    'current_utilization': f"{rate:.1%}",
+                    'recommendation': f"Consider consolidating operations or finding new demand sources"
+                })
+            else:
+                optimizations.append({
+                    'type': 'near_capacity',
+                    'facility_id': fac_id,
+                    'current_utilization': f"{rate:.1%}",
+                    'recommendation': f"Consider expanding capacity or adding new facility nearby"
+                })
         
         # Optimize supply routes using linear programming
         route_optimization = self.optimize_supply_routes()
@@ -266,89 +470,132 @@ class SupplyChainOptimizer:
     
     def optimize_supply_routes(self) -> List[Dict]:
         """
-        Use linear programming to optimize supply routes
+        Solve the transportation problem to optimize supply routes
         Minimizes total transportation cost while meeting demand
         """
-        supply_facilities = [f for f in self.facilities.values() 
-                           if f.type in [FacilityType.PRODUCTION, FacilityType.STORAGE]]
-        demand_points_list = list(self.demand_points.values())
+        supply_rows = self.facilities.supplier_rows(with_capacity=False)
         
-        if not supply_facilities or not demand_points_list:
+        if not len(supply_rows) or not len(self.demand_points):
             return []
+        supply_ids = self.facilities.ids_at(supply_rows)
+        demand_ids = list(self.demand_points)
         
-        n_supply = len(supply_facilities)
-        n_demand = len(demand_points_list)
-        
-        # Create cost matrix
-        costs = []
-        for supply in supply_facilities:
-            for demand in demand_points_list:
-                cost = self.calculate_transportation_cost(
-                    supply, demand.location, 1.0  # Cost per unit
-                )
-                costs.append(cost)
-        
-        # Create constraint matrices
-        # Supply constraints (cannot exceed available capacity)
-        A_supply = np.zeros((n_supply, n_supply * n_demand))
-        for i in range(n_supply):
-            for j in range(n_demand):
-                A_supply[i, i * n_demand + j] = 1
-        
-        b_supply = [f.available_capacity for f in supply_facilities]
-        
-        # Demand constraints (must meet demand)
-        A_demand = np.zeros((n_demand, n_supply * n_demand))
-        for j in range(n_demand):
-            for i in range(n_supply):
-                A_demand[j, i * n_demand + j] = 1
+        # Cost per unit for every (supply, demand) pair
+        costs = self.location_cost_matrix(
+            self.facilities.location_rows(supply_rows), self.demand_points.location_rows()
+        )
         
-        b_demand = [d.unfulfilled_demand for d in demand_points_list]
+        # Solve (warm-started from the previous solution when only capacities,
+        # demands or the set of facilities / demand points changed)
+        try:
+            solution = self.route_solver.solve(
+                supply_ids,
+                demand_ids,
+                costs,
+                self.facilities.available_capacity()[supply_rows],
+                self.demand_points.unfulfilled_demand()
+            )
+        except Exception:
+            self.route_solver.reset()
+            return []
         
-        # Combine constraints
-        A_ub = np.vstack([A_supply])
-        b_ub = b_supply
-        A_eq = A_demand
-        b_eq = b_demand
+        # Demand must be met in full
+        if solution['unmet'] > 0.01:
+            return []
         
-        # Bounds (non-negative flows)
-        bounds = [(0, None) for _ in range(n_supply * n_demand)]
+        optimizations = []
+        current_routes = []
+        
+        # Parse optimized routes
+        flows = solution['flows']
+        for i, j in zip(*np.nonzero(flows > 0.01)):  # Significant flow
+            current_routes.append({
+                'from': supply_ids[i],
+                'to': demand_ids[j],
+                'volume': flows[i, j],
+                'cost': flows[i, j] * costs[i, j]
+            })
         
-        # Solve
-        try:
-            result = linprog(costs, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq, 
-                           bounds=bounds, method='highs')
-            
-            if result.success:
-                optimizations = []
-                current_routes = []
-                
-                # Parse optimized routes
-                for i, supply in enumerate(supply_facilities):
-                    for j, demand in enumerate(demand_points_list):
-                        flow = result.x[i * n_demand + j]
-                        if flow > 0.01:  # Significant flow
-                            current_routes.append({
-                                'from': supply.id,
-                                'to': demand.id,
-                                'volume': flow,
-                                'cost': flow * costs[i * n_demand + j]
-                            })
-                
-                if current_routes:
-                    optimizations.append({
-                        'type': 'route_optimization',
-                        'total_cost': result.fun,
-                        'optimized_routes': current_routes,
-                        'recommendation': 'Implement optimized routing to reduce transportation costs'
-                    })
-                
-                return optimizations
-        except:
-            return []
+        if current_routes:
+            optimizations.append({
+                'type': 'route_optimization',
+                'total_cost': solution['total_cost'],
+                'optimized_routes': current_routes,
+                'recommendation': 'Implement optimized routing to reduce transportation costs'
+            })
         
-        return []
-    
+        return optimizations
+
+    def allocate_by_priority(self, compare_with_lp: bool = False) -> Dict:
+        """
+        Fast approximate alternative to optimize_supply_routes: demands are served
+        one at a time, highest priority first (ties in insertion order), each from
+        its cheapest suppliers that still have capacity. Each demand pops a heap of
+        (unit cost, supplier); suppliers used up by earlier demands are skipped
+        when popped rather than removed from every heap.
+
+        With compare_with_lp, the LP optimum for the same network is solved from
+        scratch (the warm route solver is left alone) and reported as
+        'lp_total_cost' / 'lp_unmet_volume'. 'gap' is the greedy plan's relative
+        excess cost, reported only when both plans serve every demand the same
+        volume; under a capacity shortage the greedy plan serves by priority and
+        the LP by cost, so their costs are not comparable and 'gap' is None.
+        """
+        supply_rows = self.facilities.supplier_rows(with_capacity=False)
+        supply_ids = self.facilities.ids_at(supply_rows)
+        demand_ids = list(self.demand_points)
+        demands = self.demand_points.unfulfilled_demand()
+        residual = self.facilities.available_capacity()[supply_rows].tolist()
+        costs = self.location_cost_matrix(
+            self.facilities.location_rows(supply_rows), self.demand_points.location_rows()
+        )
+
+        priority = self.demand_points.column('priority')
+        order = np.lexsort((np.arange(len(demand_ids)), -priority))
+        routes = []
+        unmet = {}
+        total_cost = 0.0
+        for j in order:
+            remaining = float(demands[j])
+            if remaining <= 0:
+                continue
+            heap = list(zip(costs[:, j].tolist(), range(len(supply_ids))))
+            heapq.heapify(heap)
+            while remaining > 1e-9 and heap:
+                unit_cost, i = heapq.heappop(heap)
+                if residual[i] <= 1e-9:
+                    continue  # Used up by an earlier demand
+                volume = min(residual[i], remaining)
+                residual[i] -= volume
+                remaining -= volume
+                total_cost += volume * unit_cost
+                routes.append({'from': supply_ids[i], 'to': demand_ids[j], 'volume': volume, 'cost': volume * unit_cost})
+            if remaining > 1e-9:
+                unmet[demand_ids[j]] = remaining
+
+        result = {
+            'method': 'priority_greedy',
+            'routes': routes,
+            'total_cost': total_cost,
+            'unmet_volume': float(sum(unmet.values())),
+            'unmet_by_demand': unmet
+        }
+        if compare_with_lp and supply_ids and demand_ids:
+            solution = TransportationSolver().solve(
+                supply_ids, demand_ids, costs, self.facilities.available_capacity()[supply_rows], demands
+            )
+            greedy_served = demands - np.array([unmet.get(demand_id, 0.0) for demand_id in demand_ids])
+            same_volumes = np.allclose(solution['flows'].sum(axis=0), greedy_served, atol=1e-6)
+            result['lp_total_cost'] = solution['total_cost']
+            result['lp_unmet_volume'] = solution['unmet']
+            if not same_volumes:
+                result['gap'] = None
+            elif solution['total_cost'] > 0:
+                result['gap'] = (total_cost - solution['total_cost']) / solution['total_cost']
+            else:
+                result['gap'] = 0.0
+        return result
+
     def add_new_facility(self, facility_type: str, location_id: str, capacity: float) -> str:
         """Add a new facility based on recommendation"""
         if location_id not in self.locations:
@@ -367,14 +614,17 @@ class SupplyChainOptimizer:
                           else capacity * 20 * location.cost_index
         )
         
-        self.facilities[new_id] = new_facility
+        self.facilities.add(new_facility)
+        self.distances.add(location)
+        self._facilities_version += 1
         return f"Successfully added {facility_type} facility at {location.name} with capacity {capacity}"
     
     def execute_fulfillment_plan(self, plan: List[Dict]) -> str:
         """Execute a fulfillment plan by updating facility utilizations"""
-        for allocation in plan:
-            if allocation['from_facility'] in self.facilities:
-                self.facilities[allocation['from_facility']].current_utilization += allocation['volume']
+        known = [a for a in plan if a['from_facility'] in self.facilities]
+        if known:
+            rows = self.facilities.rows_of([a['from_facility'] for a in known])
+            np.add.at(self.facilities.column('current_utilization'), rows, [a['volume'] for a in known])
                 
         return "Fulfillment plan executed successfully"
 
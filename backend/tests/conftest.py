@@ -0,0 +1,6 @@
+# In backend/tests/conftest.py
+import os
+import sys
+
+# The supply-chain modules are top-level scripts next to app/, imported by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,18 @@
+# In backend/tests/test_admission.py
+import pytest
+
+from app.services.admission import AdmissionRejected, plan_grid_request
+
+
+@pytest.mark.parametrize('max_pairs', [100_000, 1_234_567, 3_000_000])
+def test_coarsened_grid_step_fits_the_budget(max_pairs):
+    plan = plan_grid_request(0.5, 900, max_pairs, max_step=5.0)
+    assert plan['coarsened']
+    assert plan['step'] == round(plan['step'], 4)
+    assert plan['estimatedDistancePairs'] <= max_pairs
+
+
+def test_grid_step_over_the_limit_is_rejected():
+    with pytest.raises(AdmissionRejected) as excinfo:
+        plan_grid_request(0.5, 900, 100_000, max_step=1.0)
+    assert excinfo.value.status_code == 413
@@ -0,0 +1,38 @@
+# In backend/tests/test_api_validation.py
+import pytest
+
+from app import create_app
+from config import Config
+
+WEIGHTS = {'power': 0.4, 'market': 0.3, 'logistics': 0.3}
+RADIUS_BODY = {'weights': WEIGHTS, 'centerPoint': {'latitude': 21.0, 'longitude': 78.0}, 'radius': 50}
+
+
+@pytest.fixture
+def client():
+    return create_app(Config).test_client()
+
+
+@pytest.mark.parametrize('value', [True, False, 0, -5, '10'])
+def test_optimize_grid_rejects_bad_min_separation(client, value):
+    response = client.post('/api/optimize-grid', json={'weights': WEIGHTS, 'minSeparationKm': value})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('field', ['radius', 'stepKm', 'minSeparationKm'])
+@pytest.mark.parametrize('value', [True, 0, -1, 'far'])
+def test_optimize_radius_rejects_non_positive_numbers(client, field, value):
+    response = client.post('/api/optimize-radius', json=dict(RADIUS_BODY, **{field: value}))
+    assert response.status_code == 400
+    assert field in response.get_json()['error']
+
+
+def test_zones_use_the_grid_admission_plan():
+    app = create_app(Config)
+    app.config['SCORING_MAX_DISTANCE_PAIRS'] = 100_000  # Forces a coarser grid
+    client = app.test_client()
+    grid = client.post('/api/optimize-grid', json={'weights': WEIGHTS}).get_json()
+    zones = client.post('/api/optimize-grid/zones', json={'weights': WEIGHTS}).get_json()
+    assert grid['admission']['coarsened']
+    assert zones['admission'] == grid['admission']
+    assert zones['gridPoints'] == grid['admission']['estimatedGridPoints']
@@ -0,0 +1,45 @@
+# In backend/tests/test_batch_evaluation.py
+import numpy as np
+import pytest
+
+import batch_evaluation
+from supply_chain_optimizer import DemandPoint, Facility, FacilityType, Location, SupplyChainOptimizer
+
+
+def random_network(rng, n_suppliers=6):
+    optimizer = SupplyChainOptimizer()
+    for k in range(n_suppliers):
+        location = Location(f"loc{k}", f"Site {k}", rng.uniform(10, 30), rng.uniform(70, 88), rng.uniform(0.7, 1.3))
+        optimizer.add_location(location)
+        facility_type = FacilityType.PRODUCTION if k % 2 else FacilityType.STORAGE
+        capacity = rng.uniform(50, 200)
+        optimizer.add_facility(Facility(f"f{k}", optimizer.locations[f"loc{k}"], facility_type, capacity,
+                                        current_utilization=rng.uniform(0, capacity)))
+    return optimizer
+
+
+def random_demands(rng, n):
+    return [
+        DemandPoint(f"d{k}", Location(f"d{k}_location", f"Demand {k}", rng.uniform(10, 30), rng.uniform(70, 88),
+                                      rng.uniform(0.7, 1.3)), rng.uniform(0, 400))
+        for k in range(n)
+    ]
+
+
+@pytest.mark.parametrize('chunk_cells', [batch_evaluation.CHUNK_CELLS, 12])
+def test_batch_matches_evaluate_new_demand(monkeypatch, chunk_cells):
+    # The default bound keeps the whole batch in one chunk; 12 cells splits it into several
+    monkeypatch.setattr(batch_evaluation, 'CHUNK_CELLS', chunk_cells)
+    rng = np.random.default_rng(7)
+    optimizer = random_network(rng)
+    demands = random_demands(rng, 25)
+
+    batch = optimizer.evaluate_demand_batch(demands, workers=1)
+    assert [result['demand_id'] for result in batch] == [demand.id for demand in demands]
+    for demand, result in zip(demands, batch):
+        expected = optimizer.evaluate_new_demand(demand)
+        assert result['can_fulfill'] == expected['can_fulfill']
+        assert result['total_cost'] == pytest.approx(expected['total_cost'])
+        assert result['unfulfilled_volume'] == pytest.approx(max(expected['unfulfilled_volume'], 0.0))
+        assert [(a['from_facility'], a['volume']) for a in result['fulfillment_plan']] == \
+            [(a['from_facility'], pytest.approx(a['volume'])) for a in expected['fulfillment_plan']]
@@ -0,0 +1,52 @@
+# In backend/tests/test_cache.py
+import time
+
+import pytest
+
+from app.utils.cache import TieredCache
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    pytest.importorskip('diskcache')
+    return TieredCache(max_items=2, directory=str(tmp_path))
+
+
+def test_memory_miss_returns_default():
+    cache = TieredCache(max_items=2)
+    assert cache.get(('a',)) is None
+    assert cache.get(('a',), default='fallback') == 'fallback'
+
+
+def test_disk_miss_then_set(disk_cache):
+    assert disk_cache.get(('tile', 1, 2, 3)) is None
+    # The miss must not have been remembered as a value
+    assert len(disk_cache) == 0
+    disk_cache.set(('tile', 1, 2, 3), {'cells': [1, 2]})
+    assert disk_cache.get(('tile', 1, 2, 3)) == {'cells': [1, 2]}
+
+
+def test_disk_fallback_after_memory_eviction(disk_cache):
+    for i in range(3):
+        disk_cache.set(('k', i), i)
+    assert len(disk_cache) == 2  # ('k', 0) evicted from memory
+    assert disk_cache.get(('k', 0)) == 0
+    assert disk_cache.get(('k', 0), default='x') == 0
+
+
+def test_expired_entries_are_dropped(disk_cache):
+    disk_cache.set(('short',), 'value', ttl=0.05)
+    assert disk_cache.get(('short',)) == 'value'
+    time.sleep(0.1)
+    assert disk_cache.get(('short',)) is None
+    assert disk_cache.get(('short',), default='gone') == 'gone'
+
+
+def test_lru_order_in_memory():
+    cache = TieredCache(max_items=2)
+    cache.set(('a',), 1)
+    cache.set(('b',), 2)
+    cache.get(('a',))
+    cache.set(('c',), 3)
+    assert cache.get(('a',)) == 1
+    assert cache.get(('b',)) is None
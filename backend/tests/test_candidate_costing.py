@@ -0,0 +1,52 @@
+# In backend/tests/test_candidate_costing.py
+import numpy as np
+import pytest
+
+from supply_chain_optimizer import DemandPoint, Facility, FacilityType, Location, SupplyChainOptimizer
+
+
+def random_network(seed, n_locations=30, n_facilities=6):
+    rng = np.random.default_rng(seed)
+    optimizer = SupplyChainOptimizer()
+    for k in range(n_locations):
+        optimizer.add_location(Location(f"loc{k}", f"Site {k}", rng.uniform(8, 36), rng.uniform(68, 97),
+                                        rng.uniform(0.6, 1.4)))
+    for k in range(n_facilities):
+        facility_type = FacilityType.PRODUCTION if k % 3 else FacilityType.STORAGE
+        optimizer.add_facility(Facility(f"f{k}", optimizer.locations[f"loc{k}"], facility_type, 500.0))
+    demand = DemandPoint('new', Location('new_location', 'New', 21.0, 78.0, 1.1), 300.0)
+    return optimizer, demand
+
+
+def per_candidate_suggestions(optimizer, demand, required_volume):
+    """The original one-location-at-a-time costing, as a reference."""
+    facility_locations = {f.location.id for f in optimizer.facilities.values()}
+    productions = [f for f in optimizer.facilities.values() if f.type == FacilityType.PRODUCTION]
+    suggestions = []
+    for location_id, location in optimizer.locations.items():
+        if location_id in facility_locations:
+            continue
+        transport = optimizer.calculate_transportation_cost(
+            Facility('temp', location, FacilityType.PRODUCTION, required_volume), demand.location, required_volume
+        )
+        production = 10000 * location.cost_index + 50 * required_volume * location.cost_index + transport
+        storage = 5000 * location.cost_index + 20 * required_volume * location.cost_index + transport
+        if productions:
+            nearest = min(productions, key=lambda f: optimizer.calculate_distance(f.location, location))
+            storage += optimizer.calculate_transportation_cost(nearest, location, required_volume)
+        suggestions.append((location_id, production, storage))
+    suggestions.sort(key=lambda s: min(s[1], s[2]))
+    return suggestions[:5]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_vectorized_costing_matches_per_candidate_loop(seed):
+    optimizer, demand = random_network(seed)
+    suggestions = optimizer.suggest_new_facilities(demand, 120.0)
+    expected = per_candidate_suggestions(optimizer, demand, 120.0)
+
+    assert [s['location_id'] for s in suggestions] == [location_id for location_id, _, _ in expected]
+    for suggestion, (_, production, storage) in zip(suggestions, expected):
+        assert suggestion['production_facility_cost'] == pytest.approx(production)
+        assert suggestion['storage_facility_cost'] == pytest.approx(storage)
+        assert suggestion['recommended_type'] == ('production' if production < storage else 'storage')
@@ -0,0 +1,36 @@
+# In backend/tests/test_distance_matrix.py
+from types import SimpleNamespace
+
+import numpy as np
+
+from distance_matrix import DistanceMatrix, haversine_km
+
+
+def make_matrix(n, max_rows):
+    matrix = DistanceMatrix(max_bytes=max_rows * n * 8)
+    points = [SimpleNamespace(id=f"p{k}", lat=10.0 + k, lon=70.0 + 2 * k) for k in range(n)]
+    matrix.add_many(points)
+    return matrix, points
+
+
+def test_rows_are_evicted_least_recently_used_under_max_bytes():
+    matrix, _ = make_matrix(10, max_rows=3)
+    for idx in (0, 1, 2):
+        matrix.row(idx)
+    matrix.row(0)  # Now the most recently used
+    matrix.row(3)
+
+    assert list(matrix._rows) == [2, 0, 3]
+    assert matrix._row_bytes == 3 * 10 * 8 <= matrix.max_bytes
+
+
+def test_evicted_rows_are_recomputed_correctly():
+    matrix, points = make_matrix(10, max_rows=2)
+    for idx in range(10):
+        matrix.row(idx)
+    lat, lon = np.radians([[p.lat for p in points], [p.lon for p in points]])
+    expected = haversine_km(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+
+    for idx in range(10):
+        np.testing.assert_allclose(matrix.row(idx), expected[idx])
+        assert len(matrix._rows) <= 2
@@ -0,0 +1,44 @@
+# In backend/tests/test_diverse_selection.py
+import numpy as np
+import pytest
+
+from app.services.optimization_service import select_diverse_indices, haversine_distance
+
+
+def brute_force_selection(points, scores, num_results, min_separation_km):
+    selected = []
+    for i in np.argsort(-scores, kind='stable'):
+        if all(haversine_distance(points[i, 0], points[i, 1], points[j, 0], points[j, 1]) >= min_separation_km
+               for j in selected):
+            selected.append(i)
+            if len(selected) == num_results:
+                break
+    return selected
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('separation_km', [5.0, 50.0, 400.0])
+def test_matches_brute_force_greedy(seed, separation_km):
+    rng = np.random.default_rng(seed)
+    points = np.column_stack([rng.uniform(8, 37, 400), rng.uniform(68, 98, 400)])
+    scores = np.round(rng.uniform(0, 10, 400), 1)  # Rounded so ties occur
+    selected = select_diverse_indices(points, scores, 15, separation_km)
+    assert selected.tolist() == brute_force_selection(points, scores, 15, separation_km)
+
+
+def test_selected_points_respect_separation():
+    rng = np.random.default_rng(0)
+    points = np.column_stack([rng.uniform(20, 22, 2000), rng.uniform(72, 74, 2000)])
+    selected = select_diverse_indices(points, rng.uniform(0, 10, 2000), 10, 30.0)
+    for a in selected:
+        for b in selected:
+            if a != b:
+                assert haversine_distance(points[a, 0], points[a, 1], points[b, 0], points[b, 1]) >= 30.0
+
+
+def test_empty_and_zero_requests():
+    points = np.array([[20.0, 72.0], [20.001, 72.0]])
+    assert len(select_diverse_indices(points, np.array([1.0, 2.0]), 0, 10.0)) == 0
+    assert len(select_diverse_indices(np.zeros((0, 2)), np.array([]), 5, 10.0)) == 0
+    # Two points 100 m apart: only the better one survives a 1 km separation
+    assert select_diverse_indices(points, np.array([1.0, 2.0]), 5, 1.0).tolist() == [1]
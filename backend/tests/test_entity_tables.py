@@ -0,0 +1,71 @@
+# In backend/tests/test_entity_tables.py
+import pytest
+
+from entity_tables import (
+    DemandPoint, DemandTable, Facility, FacilityTable, FacilityType, Location, LocationTable
+)
+
+
+def make_location(k):
+    return Location(f"loc{k}", f"Location {k}", 20.0 + k, 78.0 + k, 1.0 + k / 10)
+
+
+def test_standalone_entity_becomes_a_view_after_add():
+    locations = LocationTable()
+    location = make_location(0)
+    assert location._table is None
+
+    locations.add(location)
+    assert location._table is locations
+    assert location._values is None
+    assert locations['loc0'] == location
+
+
+def test_writes_go_through_to_the_columns():
+    locations = LocationTable()
+    facilities = FacilityTable(locations)
+    facility = Facility('f0', make_location(0), FacilityType.STORAGE, 100.0)
+    facilities.add(facility)
+
+    facility.current_utilization = 40.0
+    facilities['f0'].capacity = 150.0
+    row = facilities.row_of('f0')
+    assert facilities.column('current_utilization')[row] == 40.0
+    assert facilities.column('capacity')[row] == 150.0
+    assert facility.capacity == 150.0
+    assert facilities.available_capacity()[row] == 110.0
+
+
+def test_columns_grow_past_initial_capacity():
+    locations = LocationTable(initial_capacity=2)
+    demands = DemandTable(locations, initial_capacity=2)
+    for k in range(9):
+        demands.add(DemandPoint(f"d{k}", make_location(k), 10.0 * k, priority=k))
+
+    assert len(demands) == 9
+    assert list(demands.column('demand_volume')) == [10.0 * k for k in range(9)]
+    assert [demands[f"d{k}"].location.lat for k in range(9)] == [20.0 + k for k in range(9)]
+
+
+def test_registered_locations_are_unlisted():
+    locations = LocationTable()
+    locations.add(make_location(0))
+    facilities = FacilityTable(locations)
+    facilities.add(Facility('f1', make_location(1), FacilityType.PRODUCTION, 50.0))
+
+    assert locations.row_count() == 2
+    assert len(locations) == 1
+    assert list(locations) == ['loc0']
+    assert 'loc1' not in locations
+    with pytest.raises(KeyError):
+        locations['loc1']
+    assert facilities['f1'].location.id == 'loc1'
+
+
+def test_ids_are_fixed_once_stored():
+    locations = LocationTable()
+    location = make_location(0)
+    locations.add(location)
+    with pytest.raises(AttributeError):
+        location.id = 'renamed'
+    assert list(locations) == ['loc0']
@@ -0,0 +1,58 @@
+# In backend/tests/test_facility_location.py
+import numpy as np
+import pytest
+
+from facility_location import solve_facility_location
+
+
+def random_instance(seed, n_candidates=8, n_existing=2, n_demand=10):
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(0, 100, size=(n_candidates + n_existing + n_demand, 2))
+    candidates, existing, demand = np.split(points, [n_candidates, n_candidates + n_existing])
+    distance = lambda a, b: np.linalg.norm(a[:, None, :] - b[None, :, :], axis=2)
+    demands = rng.uniform(10, 50, size=n_demand)
+    return {
+        'setup_costs': rng.uniform(200, 800, size=n_candidates),
+        'candidate_costs': distance(candidates, demand),
+        'candidate_capacity': rng.uniform(40, 120, size=n_candidates),
+        'existing_costs': distance(existing, demand),
+        'existing_capacity': rng.uniform(10, 60, size=n_existing),
+        'demands': demands,
+        'max_new': 3,
+    }
+
+
+def check_feasible(instance, result):
+    open_sites = list(result['open'])
+    assert len(open_sites) <= instance['max_new']
+    # One row of candidate_flows per open site
+    candidate_flows = np.asarray(result['candidate_flows']).reshape(len(open_sites), -1)
+    existing_flows = np.asarray(result['existing_flows'])
+    assert (candidate_flows >= -1e-7).all() and (existing_flows >= -1e-7).all()
+    assert (candidate_flows.sum(axis=1) <= instance['candidate_capacity'][open_sites] + 1e-6).all()
+    assert (existing_flows.sum(axis=1) <= instance['existing_capacity'] + 1e-6).all()
+    served = candidate_flows.sum(axis=0) + existing_flows.sum(axis=0)
+    assert (served <= instance['demands'] + 1e-6).all()
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_heuristic_matches_exact_on_small_instances(seed):
+    instance = random_instance(seed)
+    exact = solve_facility_location(**instance, method='exact')
+    heuristic = solve_facility_location(**instance, method='heuristic')
+    assert exact['method'] == 'exact' and heuristic['method'] == 'heuristic'
+
+    for result in (exact, heuristic):
+        check_feasible(instance, result)
+        assert result['lower_bound'] <= result['objective'] + 1e-6 * abs(result['objective'])
+        assert 0.0 <= result['gap'] <= 1.0
+
+    # The MILP optimum bounds every feasible plan, and every valid lower bound
+    assert exact['objective'] <= heuristic['objective'] + 1e-6 * abs(exact['objective'])
+    assert heuristic['lower_bound'] <= exact['objective'] + 1e-6 * abs(exact['objective'])
+    # On instances this small the local search finds the optimum or gets close
+    assert heuristic['objective'] <= 1.05 * exact['objective']
+
+
+def test_auto_picks_exact_for_small_models():
+    assert solve_facility_location(**random_instance(0), method='auto')['method'] == 'exact'
@@ -0,0 +1,69 @@
+# In backend/tests/test_job_queue.py
+import threading
+import time
+
+import pytest
+
+from app.services.job_queue import JobQueue, QueueFullError, CANCELLED, SUCCEEDED
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while not predicate():
+        if time.time() > deadline:
+            raise AssertionError("Timed out")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def blocked_queue():
+    """A queue with one worker and a job function that blocks until released."""
+    release = threading.Event()
+    queue = JobQueue(max_workers=1, max_pending=2, result_ttl=600)
+    yield queue, (lambda: release.wait(5) and 'done'), release
+    release.set()
+
+
+def test_job_result(blocked_queue):
+    queue, block, release = blocked_queue
+    job = queue.submit('test', block)
+    release.set()
+    wait_for(lambda: queue.get(job['jobId'])['status'] == SUCCEEDED)
+    assert queue.get(job['jobId'])['result'] == 'done'
+    assert queue.depth() == 0
+
+
+def test_queue_full(blocked_queue):
+    queue, block, _ = blocked_queue
+    queue.submit('test', block)
+    queue.submit('test', block)
+    with pytest.raises(QueueFullError):
+        queue.submit('test', block)
+
+
+def test_cancelled_queued_job_frees_its_slot(blocked_queue):
+    queue, block, _ = blocked_queue
+    queue.submit('test', block)
+    waiting = queue.submit('test', block)
+    assert queue.cancel(waiting['jobId'])
+    assert queue.get(waiting['jobId'])['status'] == CANCELLED
+    assert queue.depth() == 1
+    queue.submit('test', block)
+
+
+def test_cancelled_running_job_counts_until_its_worker_returns(blocked_queue):
+    queue, block, release = blocked_queue
+    running = queue.submit('test', block)
+    wait_for(lambda: queue.get(running['jobId'])['status'] == 'running')
+    assert queue.cancel(running['jobId'])
+    assert queue.get(running['jobId'])['status'] == CANCELLED
+    assert queue.depth() == 1
+
+    # Repeated submit + cancel cannot grow the backlog past max_pending
+    queue.cancel(queue.submit('test', block)['jobId'])
+    queue.submit('test', block)
+    with pytest.raises(QueueFullError):
+        queue.submit('test', block)
+
+    release.set()
+    wait_for(lambda: queue.depth() == 0)
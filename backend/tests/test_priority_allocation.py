@@ -0,0 +1,50 @@
+# In backend/tests/test_priority_allocation.py
+import pytest
+
+from supply_chain_optimizer import DemandPoint, Facility, FacilityType, Location, SupplyChainOptimizer
+
+
+def make_network(capacity):
+    """One plant at Pune; a low-priority demand nearby and a high-priority one far away."""
+    optimizer = SupplyChainOptimizer()
+    for location in (Location('pune', 'Pune', 18.52, 73.86, 1.0),
+                     Location('mumbai', 'Mumbai', 19.08, 72.88, 1.0),
+                     Location('nagpur', 'Nagpur', 21.15, 79.09, 1.0)):
+        optimizer.add_location(location)
+    optimizer.add_facility(Facility('plant', optimizer.locations['pune'], FacilityType.PRODUCTION, capacity))
+    optimizer.add_demand_point(DemandPoint('near', optimizer.locations['mumbai'], 40.0, priority=1))
+    optimizer.add_demand_point(DemandPoint('far', optimizer.locations['nagpur'], 40.0, priority=5))
+    return optimizer
+
+
+def served(result):
+    volumes = {}
+    for route in result['routes']:
+        volumes[route['to']] = volumes.get(route['to'], 0.0) + route['volume']
+    return volumes
+
+
+def test_higher_priority_is_served_first_under_shortage():
+    result = make_network(capacity=50.0).allocate_by_priority()
+    assert served(result) == pytest.approx({'far': 40.0, 'near': 10.0})
+    assert result['unmet_by_demand'] == pytest.approx({'near': 30.0})
+
+
+@pytest.mark.parametrize('capacity', [50.0, 80.0, 120.0])
+def test_total_volume_matches_the_lp(capacity):
+    optimizer = make_network(capacity)
+    result = optimizer.allocate_by_priority(compare_with_lp=True)
+    assert result['unmet_volume'] == pytest.approx(result['lp_unmet_volume'])
+    assert sum(route['volume'] for route in result['routes']) == pytest.approx(min(capacity, 80.0))
+
+
+def test_gap_is_none_when_served_volumes_differ():
+    # The LP serves the cheap nearby demand first, the greedy plan the high-priority one
+    result = make_network(capacity=50.0).allocate_by_priority(compare_with_lp=True)
+    assert result['gap'] is None
+
+
+def test_gap_is_reported_when_every_demand_is_served():
+    result = make_network(capacity=120.0).allocate_by_priority(compare_with_lp=True)
+    assert result['gap'] == pytest.approx(0.0)
+    assert result['total_cost'] == pytest.approx(result['lp_total_cost'])
@@ -0,0 +1,21 @@
+# In backend/tests/test_profile_imports.py
+from profile_imports import parse_importtime, top_level_total
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:        80 |        200 | io
+import time:        50 |         50 |     json.decoder
+import time:        30 |         80 |   json
+import time:        10 |        300 | app
+"""
+
+
+def test_parse_keeps_only_nested_indentation():
+    rows = parse_importtime(SAMPLE)
+    assert [name for _, _, name in rows] == ['  _io', 'io', '    json.decoder', '  json', 'app']
+    assert rows[1] == (200, 80, 'io')
+
+
+def test_top_level_total_counts_unindented_imports():
+    assert top_level_total(parse_importtime(SAMPLE)) == 500
@@ -0,0 +1,55 @@
+# In backend/tests/test_profiling.py
+import json
+
+import pytest
+
+from app import create_app
+from config import Config
+
+TOKEN = 'test-token'
+GRID_BODY = {'weights': {'power': 0.4, 'market': 0.3, 'logistics': 0.3}, 'numResults': 3}
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = create_app(Config)
+    app.config.update(PROFILING_TOKEN=TOKEN, PROFILING_DIR=str(tmp_path))
+    return app.test_client()
+
+
+def test_request_without_a_token_is_not_profiled(client):
+    response = client.post('/api/optimize-grid', json=GRID_BODY)
+    assert response.status_code == 200
+    assert 'X-Profile-Id' not in response.headers
+
+
+def test_wrong_token_is_rejected(client):
+    response = client.post('/api/optimize-grid', json=GRID_BODY, headers={'X-Profile-Token': 'wrong'})
+    assert response.status_code == 403
+    assert 'X-Profile-Id' not in response.headers
+
+
+def test_valid_token_stores_a_retrievable_profile(client):
+    response = client.post(f'/api/optimize-grid?profile={TOKEN}', json=GRID_BODY)
+    assert response.status_code == 200
+    assert response.headers['X-Profile-Status'] == 'stored'
+    profile_id = response.headers['X-Profile-Id']
+
+    report = client.get(f'/api/profiles/{profile_id}?format=json', headers={'X-Profile-Token': TOKEN})
+    assert report.status_code == 200
+    report = json.loads(report.data)
+    assert report['id'] == profile_id
+    assert report['endpoint'] == '/api/optimize-grid'
+    assert report['status'] == 200
+
+    folded = client.get(f'/api/profiles/{profile_id}', headers={'X-Profile-Token': TOKEN})
+    assert folded.status_code == 200
+    assert folded.mimetype == 'text/plain'
+
+
+@pytest.mark.parametrize('headers', [{}, {'X-Profile-Token': 'wrong'}])
+def test_profiles_need_a_valid_token(client, headers):
+    profile_id = client.post('/api/optimize-grid', json=GRID_BODY,
+                             headers={'X-Profile-Token': TOKEN}).headers['X-Profile-Id']
+    response = client.get(f'/api/profiles/{profile_id}', headers=headers)
+    assert response.status_code == 403
@@ -0,0 +1,71 @@
+# In backend/tests/test_reasoning_agent.py
+import json
+
+import pytest
+
+from app import create_app
+from app.services import reasoning_agent
+from app.services.stub_llm import StubLLM
+from app.utils.cache import TieredCache
+from config import Config
+
+WEIGHTS = {'power': 0.4, 'market': 0.3, 'logistics': 0.3}
+SCORES = {'overallScore': 7.2, 'subScores': {'power': 8.1, 'market': 6.4, 'logistics': 6.9}}
+
+
+class CountingStubLLM(StubLLM):
+    def __init__(self):
+        super().__init__(first_token_delay=0, chunk_delay=0)
+        self.streams = 0
+
+    def stream(self, messages):
+        self.streams += 1
+        yield from super().stream(messages)
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    llm = CountingStubLLM()
+    monkeypatch.setattr(reasoning_agent, '_llm_stack', {'llm': llm, 'analyst_agent': None, 'stub': True})
+    monkeypatch.setattr(reasoning_agent, '_reasoning_cache', TieredCache(max_items=16))
+    return llm
+
+
+def sse_events(response):
+    events = []
+    for block in response.get_data(as_text=True).strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event[len('event: '):], json.loads(data[len('data: '):])))
+    return events
+
+
+def test_reasoning_stream_sends_chunks_then_done_and_caches(stub_llm):
+    client = create_app(Config).test_client()
+    body = {'weights': WEIGHTS, 'scores': SCORES}
+
+    response = client.post('/api/analyze-reasoning/stream', json=body)
+    assert response.mimetype == 'text/event-stream'
+    events = sse_events(response)
+    names = [name for name, _ in events]
+    assert names[-1] == 'done' and set(names[:-1]) == {'chunk'} and len(names) > 2
+    text = "".join(payload['text'] for _, payload in events[:-1])
+    assert events[-1][1]['reasoning'] == text
+
+    # The repeat is served from the cache as a single chunk, without the LLM
+    repeat = sse_events(client.post('/api/analyze-reasoning/stream', json=body))
+    assert repeat == [('chunk', {'text': text}), ('done', {'reasoning': text})]
+    assert stub_llm.streams == 1
+
+
+def test_malformed_batch_reply_keeps_only_valid_sites():
+    raw = ("Here you go:\n```json\n"
+           '[{"site": 1, "reasoning": " Close to solar parks. "}, "not an object", {"site": "two"},'
+           ' {"site": 2, "reasoning": ""}, {"site": 9, "reasoning": "No such site"}, {"reasoning": "No number"}]'
+           "\n```")
+    assert reasoning_agent.parse_batch_reasoning(raw, num_sites=3) == {1: 'Close to solar parks.'}
+
+
+@pytest.mark.parametrize('raw', ["I cannot answer that.", "[Site 1: close to solar parks]"])
+def test_batch_reply_without_a_json_array_is_rejected(raw):
+    with pytest.raises(ValueError):
+        reasoning_agent.parse_batch_reasoning(raw, num_sites=2)
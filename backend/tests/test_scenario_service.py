@@ -0,0 +1,76 @@
+# In backend/tests/test_scenario_service.py
+import numpy as np
+import pytest
+
+from app import create_app
+from app.services.optimization_service import calculate_nearest, calculate_min_distances
+from app.services.scenario_service import REMOVE_MATCH_KM, apply_layer_delta, parse_scenario
+from config import Config
+
+WEIGHTS = {'power': 0.4, 'market': 0.3, 'logistics': 0.3}
+
+# A 1-degree grid over central India and three facilities on it
+GRID_RAD = np.radians([[lat, lon] for lat in range(18, 25) for lon in range(74, 82)])
+FACILITIES_RAD = np.radians([[19.0, 75.0], [22.0, 78.0], [24.0, 81.0]])
+
+
+def make_layer_base(points_rad=FACILITIES_RAD):
+    distances, nearest = calculate_nearest(GRID_RAD, points_rad)
+    return {'points_rad': points_rad, 'distances': distances, 'nearest': nearest,
+            'max_dist': float(distances.max())}
+
+
+def test_added_facility_only_lowers_cells_it_is_closer_to():
+    base = make_layer_base()
+    added = np.radians([21.0, 80.0])
+    distances, changed = apply_layer_delta(GRID_RAD, base, [added], set())
+
+    added_distances = calculate_min_distances(GRID_RAD, added[None, :])
+    closer = added_distances < base['distances']
+    assert closer.any() and not closer.all()
+    np.testing.assert_array_equal(changed, closer)
+    np.testing.assert_allclose(distances[closer], added_distances[closer])
+    np.testing.assert_array_equal(distances[~closer], base['distances'][~closer])
+
+
+def test_removal_recomputes_only_orphaned_cells():
+    base = make_layer_base()
+    distances, changed = apply_layer_delta(GRID_RAD, base, [], {1})
+
+    orphaned = base['nearest'] == 1
+    np.testing.assert_array_equal(changed, orphaned)
+    np.testing.assert_array_equal(distances[~orphaned], base['distances'][~orphaned])
+    # Orphaned cells match a full recompute without the removed facility
+    expected = calculate_min_distances(GRID_RAD, FACILITIES_RAD[[0, 2]])
+    np.testing.assert_allclose(distances, expected)
+
+
+def test_remove_without_a_nearby_facility_is_rejected():
+    base = {layer: make_layer_base() for layer in ('power', 'market', 'logistics')}
+    # ~0.05 degrees of latitude is well over REMOVE_MATCH_KM away
+    assert 0.05 * 111 > REMOVE_MATCH_KM
+    with pytest.raises(ValueError):
+        parse_scenario({'remove': [{'layer': 'power', 'latitude': 22.05, 'longitude': 78.0}]}, base)
+
+    delta = parse_scenario({'remove': [{'layer': 'power', 'latitude': 22.0, 'longitude': 78.0}]}, base)
+    assert delta['power']['removed'] == {1}
+
+
+@pytest.fixture
+def client():
+    return create_app(Config).test_client()
+
+
+def test_scenario_rejects_weights_missing_a_layer(client):
+    response = client.post('/api/optimize-grid/scenario', json={'weights': {'power': 1.0}})
+    assert response.status_code == 400
+
+
+def test_scenario_uses_the_grid_admission_plan():
+    app = create_app(Config)
+    app.config['SCORING_MAX_DISTANCE_PAIRS'] = 100_000  # Forces a coarser grid
+    client = app.test_client()
+    grid = client.post('/api/optimize-grid', json={'weights': WEIGHTS}).get_json()
+    scenario = client.post('/api/optimize-grid/scenario', json={'weights': WEIGHTS}).get_json()
+    assert grid['admission']['coarsened']
+    assert scenario['admission'] == grid['admission']
@@ -0,0 +1,92 @@
+# In backend/tests/test_session_service.py
+import time
+
+import pytest
+
+from app import create_app
+from app.services.session_service import SessionNotFound, SessionStore, add_entities, parse_plan, summary
+from config import Config
+
+NETWORK = {
+    'locations': [
+        {'id': 'pune', 'latitude': 18.52, 'longitude': 73.86},
+        {'id': 'nagpur', 'latitude': 21.15, 'longitude': 79.09},
+    ],
+    'facilities': [{'id': 'plant', 'locationId': 'pune', 'type': 'production', 'capacity': 100}],
+    'demands': [{'id': 'city', 'locationId': 'nagpur', 'volume': 40}],
+}
+
+
+def test_least_recently_used_session_is_evicted_over_the_count():
+    store = SessionStore(max_sessions=2)
+    first, second = store.create(), store.create()
+    with store.use(first):
+        pass
+    third = store.create()
+
+    with pytest.raises(SessionNotFound):
+        with store.use(second):
+            pass
+    for session_id in (first, third):
+        with store.use(session_id):
+            pass
+
+
+def test_idle_sessions_expire():
+    store = SessionStore(idle_ttl=60)
+    stale, fresh = store.create(), store.create()
+    store._sessions[stale].last_used = time.time() - 61
+
+    with store.use(fresh):
+        pass
+    with pytest.raises(SessionNotFound):
+        with store.use(stale):
+            pass
+
+
+def test_sessions_are_evicted_over_the_memory_cap():
+    store = SessionStore(max_bytes=10 ** 9)
+    large, small = store.create(), store.create()
+    store._sessions[large].memory_bytes = 10 ** 9
+    with store.use(small):
+        pass
+
+    assert list(store._sessions) == [small]
+
+
+def test_bad_entry_leaves_the_session_unchanged():
+    store = SessionStore()
+    session_id = store.create()
+    with store.use(session_id) as session:
+        add_entities(session, NETWORK)
+        before = summary(session)
+        bad = {
+            'locations': [{'id': 'nashik', 'latitude': 20.0, 'longitude': 73.8}],
+            'demands': [{'id': 'town', 'locationId': 'nashik', 'volume': 'lots'}],
+        }
+        with pytest.raises(ValueError):
+            add_entities(session, bad)
+        after = summary(session)
+
+    assert {k: after[k] for k in ('locations', 'facilities', 'demands')} == \
+        {k: before[k] for k in ('locations', 'facilities', 'demands')}
+    assert 'nashik' not in session.optimizer.locations
+
+
+def test_parse_plan_rejects_an_unknown_facility_and_coerces_volumes():
+    store = SessionStore()
+    with store.use(store.create()) as session:
+        add_entities(session, NETWORK)
+        with pytest.raises(ValueError):
+            parse_plan(session.optimizer, [{'from_facility': 'elsewhere', 'volume': 10}])
+        plan = parse_plan(session.optimizer, [{'from_facility': 'plant', 'volume': '10'}])
+
+    assert plan == [{'from_facility': 'plant', 'volume': 10.0}]
+
+
+def test_execute_accepts_a_numeric_string_volume():
+    client = create_app(Config).test_client()
+    session_id = client.post('/api/supply-chain/sessions', json=NETWORK).get_json()['sessionId']
+    response = client.post(f'/api/supply-chain/sessions/{session_id}/execute',
+                           json={'plan': [{'from_facility': 'plant', 'volume': '10'}]})
+    assert response.status_code == 200
@@ -0,0 +1,22 @@
+# In backend/tests/test_timing.py
+import pytest
+
+from app.utils.timing import record_stage, render_metrics
+
+
+def test_render_metrics_reports_cumulative_buckets():
+    for seconds in (0.004, 0.004, 0.2):
+        record_stage('test_render_metrics', seconds)
+    lines = [line for line in render_metrics().splitlines() if 'stage="test_render_metrics"' in line]
+
+    buckets = {line.split('le="')[1].split('"')[0]: int(line.rsplit(' ', 1)[1])
+               for line in lines if '_bucket{' in line}
+    assert buckets['0.0025'] == 0
+    assert buckets['0.005'] == 2
+    assert buckets['0.1'] == 2
+    assert buckets['0.25'] == 3
+    assert buckets['+Inf'] == 3
+    assert list(buckets.values()) == sorted(buckets.values())
+    assert 'app_stage_duration_seconds_count{stage="test_render_metrics"} 3' in lines
+    total = next(line for line in lines if line.startswith('app_stage_duration_seconds_sum'))
+    assert float(total.rsplit(' ', 1)[1]) == pytest.approx(0.208)
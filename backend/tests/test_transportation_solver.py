@@ -0,0 +1,90 @@
+# In backend/tests/test_transportation_solver.py
+import numpy as np
+import pytest
+from scipy.optimize import linprog
+
+from transportation_solver import TransportationSolver
+
+
+def reference_solution(costs, capacities, demands):
+    """Cheapest plan serving as much demand as capacity allows: (total_cost, unmet)."""
+    n_supply, n_demand = costs.shape
+    n_vars = n_supply * n_demand
+    rows = np.kron(np.eye(n_supply), np.ones(n_demand))
+    cols = np.tile(np.eye(n_demand), n_supply)
+    served = min(capacities.sum(), demands.sum())
+    result = linprog(costs.ravel(), A_ub=np.vstack([rows, cols]), b_ub=np.r_[capacities, demands],
+                     A_eq=np.ones((1, n_vars)), b_eq=[served], bounds=(0, None), method='highs')
+    assert result.success
+    return result.fun, demands.sum() - served
+
+
+def random_edits(rng, steps=8):
+    """A random network followed by edits; yields (supply_ids, demand_ids, costs, capacities, demands)."""
+    supplies = [f"s{k}" for k in range(rng.integers(2, 6))]
+    demands = [f"d{k}" for k in range(rng.integers(2, 6))]
+    position = {node: rng.uniform(0, 100, 2) for node in supplies + demands}
+    capacity = {s: rng.uniform(0, 50) for s in supplies}
+    volume = {d: rng.uniform(0, 40) for d in demands}
+    next_id = 100
+    for _ in range(steps):
+        costs = np.array([[np.linalg.norm(position[s] - position[d]) for d in demands] for s in supplies])
+        yield (list(supplies), list(demands), costs,
+               np.array([capacity[s] for s in supplies]), np.array([volume[d] for d in demands]))
+
+        edit = rng.integers(5)
+        if edit == 0:
+            capacity[supplies[rng.integers(len(supplies))]] = rng.uniform(0, 50)
+        elif edit == 1:
+            volume[demands[rng.integers(len(demands))]] = rng.uniform(0, 40)
+        elif edit == 2:
+            node = f"d{next_id}"
+            demands.append(node)
+            position[node], volume[node] = rng.uniform(0, 100, 2), rng.uniform(0, 40)
+        elif edit == 3:
+            node = f"s{next_id}"
+            supplies.append(node)
+            position[node], capacity[node] = rng.uniform(0, 100, 2), rng.uniform(0, 50)
+        elif len(demands) > 1:
+            demands.pop(rng.integers(len(demands)))
+        next_id += 1
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_warm_solves_match_cold_and_lp(seed):
+    rng = np.random.default_rng(seed)
+    warm = TransportationSolver()
+    for supply_ids, demand_ids, costs, capacities, demands in random_edits(rng):
+        result = warm.solve(supply_ids, demand_ids, costs, capacities, demands)
+        cold = TransportationSolver().solve(supply_ids, demand_ids, costs, capacities, demands)
+        expected_cost, expected_unmet = reference_solution(costs, capacities, demands)
+
+        flows = result['flows']
+        assert (flows.sum(axis=1) <= capacities + 1e-6).all()
+        assert (flows.sum(axis=0) <= demands + 1e-6).all()
+        assert result['unmet'] == pytest.approx(expected_unmet, abs=1e-6)
+        assert result['total_cost'] == pytest.approx(expected_cost, rel=1e-6, abs=1e-6)
+        assert result['total_cost'] == pytest.approx(cold['total_cost'], rel=1e-6, abs=1e-6)
+
+
+def test_edit_with_enough_capacity_is_warm():
+    costs = np.array([[1.0, 4.0], [3.0, 1.0]])
+    solver = TransportationSolver()
+    solver.solve(['a', 'b'], ['x', 'y'], costs, np.array([10.0, 10.0]), np.array([5.0, 5.0]))
+    assert solver.last_solve['mode'] == 'cold'
+    result = solver.solve(['a', 'b'], ['x', 'y'], costs, np.array([10.0, 10.0]), np.array([8.0, 5.0]))
+    assert solver.last_solve['mode'] == 'warm'
+    assert result['total_cost'] == pytest.approx(13.0)
+
+
+def test_capacity_shortage_is_solved_cold():
+    costs = np.array([[1.0, 4.0], [3.0, 1.0]])
+    capacities = np.array([6.0, 4.0])
+    solver = TransportationSolver()
+    solver.solve(['a', 'b'], ['x', 'y'], costs, capacities, np.array([5.0, 4.0]))
+    demands = np.array([9.0, 4.0])
+    result = solver.solve(['a', 'b'], ['x', 'y'], costs, capacities, demands)
+    assert solver.last_solve['mode'] == 'cold'
+    expected_cost, expected_unmet = reference_solution(costs, capacities, demands)
+    assert result['unmet'] == pytest.approx(expected_unmet)
+    assert result['total_cost'] == pytest.approx(expected_cost)
@@ -0,0 +1,354 @@
+"""
+Min-cost-flow solver for the supply -> demand transportation problem, with
+warm starts between solves.
+
+The network is a super source S feeding every supply node i (arc capacity =
+available capacity, cost 0), complete supply -> demand arcs (uncapacitated,
+cost c_ij), and demand nodes that must each receive d_j. The solver keeps the
+optimal flow and node potentials (dual prices) of the last solve. When
+capacities or demands change, or nodes are added or removed, the old solution
+stays dual feasible except on the few arcs touched by the edit. Those are
+repaired and the resulting excesses and deficits are routed with successive
+shortest paths (Dijkstra on reduced costs), which usually takes a handful of
+augmentations instead of a full re-solve. When total capacity is short of
+total demand, the solve is always cold.
+
+Cold solves go through HiGHS (the same LP as before), and its duals seed the
+potentials for later warm starts.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+
+class TransportationSolver:
+    """Warm-startable solver. One instance per network; not thread safe."""
+
+    def __init__(self, tol: float = 1e-7):
+        self.tol = tol
+        self._state: Optional[Dict] = None
+        self.last_solve: Dict = {}
+
+    def reset(self):
+        """Forget the previous solution; the next solve is a cold start."""
+        self._state = None
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the kept solution (flows, costs, potentials)."""
+        if self._state is None:
+            return 0
+        return sum(value.nbytes for value in self._state.values() if isinstance(value, np.ndarray))
+
+    def solve(self, supply_ids: List[str], demand_ids: List[str], costs: np.ndarray,
+              capacities: np.ndarray, demands: np.ndarray) -> Dict:
+        """
+        Minimizes sum(costs * flows) subject to row sums <= capacities and
+        column sums == demands (as far as capacity allows).
+
+        Returns {'flows': (n_supply, n_demand) array, 'total_cost', 'unmet'}, where
+        'unmet' is the demand volume that cannot be served with the capacity given.
+        """
+        costs = np.asarray(costs, dtype=float)
+        capacities = np.maximum(np.asarray(capacities, dtype=float), 0.0)
+        demands = np.maximum(np.asarray(demands, dtype=float), 0.0)
+
+        # Under a capacity shortage which demand goes unserved can shift
+        # anywhere in the network, so the previous solution is not a useful start
+        short = capacities.sum() + self.tol < demands.sum()
+        state = None if short else self._warm_state(supply_ids, demand_ids, costs, capacities, demands)
+        mode = 'warm'
+        if state is not None:
+            augmentations, settled = self._successive_shortest_paths(state)
+            if not settled:
+                state = None  # Should not happen with enough capacity; start over rather than return a bad plan
+        if state is None:
+            state = self._cold_state(supply_ids, demand_ids, costs, capacities, demands)
+            mode = 'cold'
+            augmentations, _ = self._successive_shortest_paths(state)
+        self._state = state
+
+        flows = state['flows']
+        unmet = float(np.maximum(state['demands'] - flows.sum(axis=0), 0).sum())
+        self.last_solve = {'mode': mode, 'augmentations': augmentations}
+        return {
+            'flows': flows,
+            'total_cost': float((flows * costs).sum()),
+            'unmet': unmet
+        }
+
+    def demand_prices(self) -> np.ndarray:
+        """
+        Marginal cost of delivering one more unit to each demand node in the
+        last solution (the demand constraints' dual prices).
+        """
+        if self._state is None:
+            raise ValueError("No solution yet")
+        return self._state['pot_demand'] - self._state['pot_source']
+
+    # --- Starting points -------------------------------------------------
+
+    def _cold_state(self, supply_ids, demand_ids, costs, capacities, demands):
+        n_supply, n_demand = costs.shape
+        state = {
+            'supply_ids': list(supply_ids),
+            'demand_ids': list(demand_ids),
+            'costs': costs,
+            'capacities': capacities,
+            'demands': demands,
+            'flows': np.zeros((n_supply, n_demand)),
+            'source_flows': np.zeros(n_supply),
+            'pot_source': 0.0,
+            'pot_supply': np.zeros(n_supply),
+            'pot_demand': np.zeros(n_demand),
+        }
+        if n_supply == 0 or n_demand == 0 or capacities.sum() + self.tol < demands.sum():
+            # Infeasible as an LP: successive shortest paths from zero flow
+            # still returns the cheapest plan serving as much demand as possible
+            return state
+
+        n_vars = n_supply * n_demand
+        variables = np.arange(n_vars)
+        A_ub = sparse.csr_matrix(
+            (np.ones(n_vars), (np.repeat(np.arange(n_supply), n_demand), variables)), shape=(n_supply, n_vars)
+        )
+        A_eq = sparse.csr_matrix(
+            (np.ones(n_vars), (np.tile(np.arange(n_demand), n_supply), variables)), shape=(n_demand, n_vars)
+        )
+        result = linprog(costs.ravel(), A_ub=A_ub, b_ub=capacities, A_eq=A_eq, b_eq=demands,
+                         bounds=(0, None), method='highs')
+        if not result.success:
+            return state
+
+        flows = np.where(result.x > self.tol, result.x, 0.0).reshape(n_supply, n_demand)
+        state['flows'] = flows
+        state['source_flows'] = flows.sum(axis=1)
+        # LP duals as node potentials: reduced cost c_ij - u_i - v_j >= 0
+        state['pot_supply'] = -np.asarray(result.ineqlin.marginals, dtype=float)
+        state['pot_demand'] = np.asarray(result.eqlin.marginals, dtype=float)
+        return state
+
+    def _warm_state(self, supply_ids, demand_ids, costs, capacities, demands):
+        """Maps the previous solution onto the edited network, or None if a cold start is needed."""
+        prev = self._state
+        if prev is None:
+            return None
+
+        old_supply = {sid: k for k, sid in enumerate(prev['supply_ids'])}
+        old_demand = {did: k for k, did in enumerate(prev['demand_ids'])}
+        if len(old_supply) != len(prev['supply_ids']) or len(set(supply_ids)) != len(supply_ids) \
+                or len(set(demand_ids)) != len(demand_ids):
+            return None
+
+        new_rows = np.array([old_supply.get(sid, -1) for sid in supply_ids], dtype=int)
+        new_cols = np.array([old_demand.get(did, -1) for did in demand_ids], dtype=int)
+        kept_rows = np.flatnonzero(new_rows >= 0)
+        kept_cols = np.flatnonzero(new_cols >= 0)
+        if len(kept_rows) == 0 or len(kept_cols) == 0:
+            return None
+
+        # Arc costs between surviving nodes must be unchanged (potentials depend on them)
+        old_costs = prev['costs'][np.ix_(new_rows[kept_rows], new_cols[kept_cols])]
+        if not np.allclose(old_costs, costs[np.ix_(kept_rows, kept_cols)], rtol=1e-12, atol=1e-12):
+            return None
+
+        n_supply, n_demand = costs.shape
+        flows = np.zeros((n_supply, n_demand))
+        flows[np.ix_(kept_rows, kept_cols)] = prev['flows'][np.ix_(new_rows[kept_rows], new_cols[kept_cols])]
+
+        pot_supply = np.full(n_supply, np.nan)
+        pot_supply[kept_rows] = prev['pot_supply'][new_rows[kept_rows]]
+        pot_demand = np.full(n_demand, np.nan)
+        pot_demand[kept_cols] = prev['pot_demand'][new_cols[kept_cols]]
+
+        # New demand nodes: the cheapest price at which any supply can reach them,
+        # so every arc into them has a non-negative reduced cost
+        added_cols = np.flatnonzero(new_cols < 0)
+        if len(added_cols):
+            pot_demand[added_cols] = (costs[np.ix_(kept_rows, added_cols)] + pot_supply[kept_rows, None]).min(axis=0)
+        # New supply nodes: high enough that no arc out of them has a negative reduced cost
+        added_rows = np.flatnonzero(new_rows < 0)
+        if len(added_rows):
+            pot_supply[added_rows] = (pot_demand[None, :] - costs[added_rows]).max(axis=1)
+
+        state = {
+            'supply_ids': list(supply_ids),
+            'demand_ids': list(demand_ids),
+            'costs': costs,
+            'capacities': capacities,
+            'demands': demands,
+            'flows': flows,
+            'source_flows': np.zeros(n_supply),
+            'pot_source': prev['pot_source'],
+            'pot_supply': pot_supply,
+            'pot_demand': pot_demand,
+        }
+        kept_source = np.zeros(n_supply)
+        kept_source[kept_rows] = prev['source_flows'][new_rows[kept_rows]]
+
+        # Source arcs: clip to the new capacity, and saturate any whose reduced
+        # cost became negative (new or enlarged capacity at a valuable supply)
+        source_reduced = state['pot_source'] - pot_supply
+        source_flows = np.minimum(kept_source, capacities)
+        saturate = (source_flows < capacities) & (source_reduced < 0)
+        source_flows[saturate] = capacities[saturate]
+        state['source_flows'] = source_flows
+        return state
+
+    # --- Successive shortest paths ---------------------------------------
+
+    @staticmethod
+    def _excesses(state):
+        flows = state['flows']
+        source_excess = state['demands'].sum() - state['source_flows'].sum()
+        supply_excess = state['source_flows'] - flows.sum(axis=1)
+        demand_excess = flows.sum(axis=0) - state['demands']
+        return source_excess, supply_excess, demand_excess
+
+    def _successive_shortest_paths(self, state):
+        """
+        Routes excesses to deficits until none are left or none can be reached.
+        Returns (augmentations, settled), where settled means no excess is left.
+        """
+        augmentations = 0
+        max_augmentations = 4 * (len(state['supply_ids']) + len(state['demand_ids']) + 1) ** 2
+        while augmentations < max_augmentations:
+            source_excess, supply_excess, demand_excess = self._excesses(state)
+            if not (source_excess > self.tol or (supply_excess > self.tol).any() or (demand_excess > self.tol).any()):
+                return augmentations, True
+            if not self._augment(state, source_excess, supply_excess, demand_excess):
+                break  # Remaining deficits cannot be reached: capacity is exhausted
+            augmentations += 1
+        return augmentations, False
+
+    def _augment(self, state, source_excess, supply_excess, demand_excess):
+        """
+        One multi-source Dijkstra from every excess node to the nearest deficit
+        node on reduced costs, then pushes flow along that path and updates the
+        potentials. Returns False if no deficit node is reachable.
+
+        Nodes are ('s', 0) for the source, ('i', i) for supplies and ('j', j) for demands.
+        """
+        tol = self.tol
+        costs, flows = state['costs'], state['flows']
+        capacities, source_flows = state['capacities'], state['source_flows']
+        pot_s, pot_i, pot_j = state['pot_source'], state['pot_supply'], state['pot_demand']
+        n_supply, n_demand = costs.shape
+
+        dist_s = 0.0 if source_excess > tol else np.inf
+        dist_i = np.where(supply_excess > tol, 0.0, np.inf)
+        dist_j = np.where(demand_excess > tol, 0.0, np.inf)
+        done_s = False
+        done_i = np.zeros(n_supply, dtype=bool)
+        done_j = np.zeros(n_demand, dtype=bool)
+        pred_s = None            # Supply index the source was reached from
+        pred_i = np.full(n_supply, -2, dtype=int)   # -1: from the source, j >= 0: from demand j
+        pred_j = np.full(n_demand, -1, dtype=int)   # Supply index
+
+        target = None
+        while True:
+            open_i = np.where(done_i, np.inf, dist_i)
+            open_j = np.where(done_j, np.inf, dist_j)
+            best_i = int(open_i.argmin()) if n_supply else -1
+            best_j = int(open_j.argmin()) if n_demand else -1
+            candidates = [
+                (np.inf if done_s else dist_s, 's', 0),
+                (open_i[best_i] if n_supply else np.inf, 'i', best_i),
+                (open_j[best_j] if n_demand else np.inf, 'j', best_j),
+            ]
+            d, kind, u = min(candidates, key=lambda c: c[0])
+            if not np.isfinite(d):
+                return False
+
+            if kind == 's':
+                done_s = True
+                if source_excess < -tol:
+                    target = ('s', 0)
+                    break
+                # S -> i where the source arc has spare capacity
+                residual = (source_flows < capacities - tol) & ~done_i
+                cand = d + np.maximum(pot_s - pot_i, 0.0)
+                better = residual & (cand < dist_i)
+                dist_i[better] = cand[better]
+                pred_i[better] = -1
+            elif kind == 'i':
+                done_i[u] = True
+                if supply_excess[u] < -tol:
+                    target = ('i', u)
+                    break
+                # i -> j is always open (uncapacitated)
+                cand = d + np.maximum(costs[u] + pot_i[u] - pot_j, 0.0)
+                better = ~done_j & (cand < dist_j)
+                dist_j[better] = cand[better]
+                pred_j[better] = u
+                # i -> S undoes flow on the source arc
+                if not done_s and source_flows[u] > tol:
+                    cand_s = d + max(pot_i[u] - pot_s, 0.0)
+                    if cand_s < dist_s:
+                        dist_s = cand_s
+                        pred_s = u
+            else:
+                done_j[u] = True
+                if demand_excess[u] < -tol:
+                    target = ('j', u)
+                    break
+                # j -> i undoes flow on an existing route
+                residual = (flows[:, u] > tol) & ~done_i
+                cand = d + np.maximum(-costs[:, u] + pot_j[u] - pot_i, 0.0)
+                better = residual & (cand < dist_i)
+                dist_i[better] = cand[better]
+                pred_i[better] = u
+
+        # Walk the path back to its excess node, collecting the bottleneck
+        path = []
+        amount = {'s': -source_excess, 'i': -supply_excess[target[1]] if target[0] == 'i' else 0,
+                  'j': -demand_excess[target[1]] if target[0] == 'j' else 0}[target[0]]
+        node = target
+        while True:
+            kind, u = node
+            if kind == 's':
+                if pred_s is None:
+                    amount = min(amount, source_excess)
+                    break
+                prev = ('i', pred_s)
+                amount = min(amount, source_flows[pred_s])
+            elif kind == 'i':
+                if pred_i[u] == -2:
+                    amount = min(amount, supply_excess[u])
+                    break
+                if pred_i[u] == -1:
+                    prev = ('s', 0)
+                    amount = min(amount, capacities[u] - source_flows[u])
+                else:
+                    prev = ('j', int(pred_i[u]))
+                    amount = min(amount, flows[u, pred_i[u]])
+            else:
+                if pred_j[u] == -1:
+                    amount = min(amount, demand_excess[u])
+                    break
+                prev = ('i', int(pred_j[u]))
+            path.append((prev, node))
+            node = prev
+
+        for (from_kind, a), (to_kind, b) in path:
+            if from_kind == 's':
+                source_flows[b] += amount
+            elif to_kind == 's':
+                source_flows[a] -= amount
+            elif from_kind == 'i':
+                flows[a, b] += amount
+            else:
+                flows[b, a] -= amount
+        np.maximum(flows, 0.0, out=flows)
+        np.maximum(source_flows, 0.0, out=source_flows)
+
+        # Potential update keeps every residual arc's reduced cost non-negative
+        d_target = {'s': dist_s, 'i': dist_i[target[1]] if target[0] == 'i' else 0,
+                    'j': dist_j[target[1]] if target[0] == 'j' else 0}[target[0]]
+        state['pot_source'] = pot_s + min(dist_s, d_target)
+        state['pot_supply'] = pot_i + np.minimum(dist_i, d_target)
+        state['pot_demand'] = pot_j + np.minimum(dist_j, d_target)
+        return True
@@ -49,6 +49,26 @@ export const optimizePoint = async (coordinate, weights) => {
     return response.json();
 };
 
+/**
+ * Polls a background job (AI reasoning) until it finishes and returns its result.
+ */
+const waitForJob = async (job, errorMessage, intervalMs = 1000) => {
+    while (true) {
+        if (job.status === 'succeeded') {
+            return job.result;
+        }
+        if (job.status === 'failed' || job.status === 'cancelled') {
+            throw new Error(job.error || errorMessage);
+        }
+        await new Promise((resolve) => setTimeout(resolve, intervalMs));
+        const response = await fetch(`${BASE_URL}/jobs/${job.jobId}`);
+        if (!response.ok) {
+            throw new Error(errorMessage);
+        }
+        job = await response.json();
+    }
+};
+
 /**
  * Sends the score and weights to the AI agent for analysis.
  */
@@ -61,7 +81,7 @@ export const getReasoning = async (scores, weights) => {
     if (!response.ok) {
         throw new Error('Failed to get AI reasoning');
     }
-    return response.json();
+    return waitForJob(await response.json(), 'Failed to get AI reasoning');
 };
 
 /**
@@ -100,5 +120,5 @@ export const analyzePowerSupply = async (coordinate, requiredCapacity) => {
     if (!response.ok) {
         throw new Error('Failed to analyze power supply');
     }
-    return response.json();
+    return waitForJob(await response.json(), 'Failed to analyze power supply');
 };
\ No newline at end of file